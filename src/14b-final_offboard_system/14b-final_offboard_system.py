@@ -1,12 +1,14 @@
-from datetime import datetime # used to give files a unique name
-import os.path # for finding relative file path
-import serial # for serial port comms
+import argparse # for choosing the serial port
+import asyncio # runs the ingest service
+import ingest # receives files from the serial port
+import os.path # for finding the post-processing system
 import signal, sys # used to safely exit script
 
 def keyboardInterruptHandler(signal, frame):
     """
-    Handler for stopping execution of code via ctrl+C. Ensures open files and
-    Serial ports are closed safely. Call this function via the line:
+    Handler for stopping execution of code via ctrl+C. The ingest service
+    closes any open file and the serial port as the script exits. Call this
+    function via the line:
         signal.signal(signal.SIGINT, keyboardInterruptHandler)
 
     Parameters
@@ -24,22 +26,6 @@ def keyboardInterruptHandler(signal, frame):
     print("KeyboardInterrupt (ID: {}) has been caught. Cleaning up..."
         .format(signal))
     
-    #if file is open, close it
-    try:
-        f.close()
-    except:
-        print("No file is open")
-    else:
-        print("Closing file")
-
-    #if serial port is open, close it
-    try:
-        serialPort.close()
-    except:
-        print("Serial port not open")
-    else:
-        print("Closing serial port")
-        
     print("Script terminated successfully")
     sys.exit(0)
 
@@ -59,110 +45,55 @@ def waitForInput():
         print("Script terminated successfully")
         sys.exit(0)
 
-def openSerial():
-    """
-    Opens the serial port
-
-    Returns
-    -------
-    serialPort : serial port object
-        This is the object that accesses the serial port throughout the script.
-    """
-    serialPort = serial.Serial(port = "COM3",
-                               baudrate = 9600,
-                               bytesize = 8,
-                               timeout = 2,
-                               stopbits = serial.STOPBITS_ONE)
-    return serialPort
-
-def readSerial(serialPort):
-    """
-    Read contents from the serial port.
-
-    Parameters
-    ----------
-    serialPort : serial port object
-        This is the object that accesses the serial port throughout the script.
-
-    Returns
-    -------
-    serialString : string
-        The contents of one line of serial.
-
-    """
-    serialString = ""
-
-    #wait until there is data waiting in the serial buffer
-    if(serialPort.in_waiting > 0):
-
-        #read data out of the buffer until a new line is found
-        serialString = serialPort.readline().decode('Ascii')
-        return serialString
-
-def createFile():
-    """
-    Opens a file for writing. Each file will have a unique name
-
-    Returns
-    -------
-    f : file object
-        The file open for writing.
-
-    """
-    #find path to 'data' folder
-    my_path = os.path.abspath(os.path.dirname(__file__))
-    path = os.path.join(my_path, "..\\..\\data\\") 
-    
-    #use current date and time to generate unique file name
-    now = datetime.now()
-    filename = now.strftime("RAW-%Y.%m.%d-%H.%M.%S")
-    
-    ext = ".csv"
-    
-    fullName = path + filename + ext
-    f = open(fullName, "w")
-    return f
-
 #event handler for if ctrl+c is pressed at any point during the script
 signal.signal(signal.SIGINT, keyboardInterruptHandler)
 
-receivingData = False #tracks state of loop below
-waitForInput() # wait until user is ready to start script
-serialPort = openSerial()
-
-while True:
-
-    # read from serial port if available
-    if (serialPort.isOpen()):
-        serialString = readSerial(serialPort)
-    else:
-        print("waiting to open serial port...")
+parser = argparse.ArgumentParser(description="Receive raw data files over serial")
+parser.add_argument("--port", nargs="+", default=[ingest.DEFAULT_PORT],
+                    help="serial port(s), e.g. COM3 or /dev/ttyUSB0. Give several to "
+                         "receive from several balls at once, optionally with the ID of "
+                         "each ball, e.g. ball1=COM3 ball2=COM4")
+parser.add_argument("--baudrate", type=int, default=ingest.DEFAULT_BAUDRATE)
+parser.add_argument("--directory", default=None,
+                    help="folder to write files to (default: the 'data' folder)")
+parser.add_argument("--quiet", action="store_true",
+                    help="report throughput instead of printing each line")
+parser.add_argument("--process", action="store_true",
+                    help="health check and process each file as it arrives")
+parser.add_argument("--binary", action="store_true",
+                    help="the ball sends binary records rather than text")
+args = parser.parse_args()
+
+processor = None
+if args.process:
+    # the post-processing system checks and processes each file while it's received
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                    "..", "14c-post_processing"))
+    from obj import const, stream
+    processor = stream.StreamingThrow
+    if args.directory == None: # files must be in the post-processing data directory
+        args.directory = const.DATA_DIRECTORY
+
+# ID of the device on each port, if they're given or there are several ports
+ports = {}
+for port in args.port:
+    deviceId, _, port = port.rpartition("=")
+    deviceId = ingest.deviceId(deviceId or port)
+    if deviceId in ports:
+        parser.error("{} and {} are both given the ID '{}'".format(ports[deviceId], port,
+                                                                   deviceId))
+    ports[deviceId] = port
 
-    # if there is content in serialString
-    if serialString != None:
-        # print(serialString)
-
-        if serialString[0] == "s": # start of file
-            # close any file if one already exists
-            try:
-                f.close()
-                print("Starting new file")
-            except:
-                pass
-            f = createFile()
-            serialString = serialString[1:] # remove 's' from beginning of string
-            receivingData = True
-            continue
-        elif serialString == "e": # end of transmission
-            print("end")
-            f.close() # close csv file for writing
-            serialPort.close()
-            receivingData = False
-            break
+waitForInput() # wait until user is ready to start script
 
-        # normal data transmission
-        if receivingData:
-            print(serialString.strip('\n'))
-            f.write(serialString.strip('\n')) # write string to file without new line
-        else: # if starting flag ('s') has not been read:
-            print("Waiting to begin")
\ No newline at end of file
+if len(ports) == 1 and "=" not in args.port[0]:
+    files = asyncio.run(ingest.ingest(args.port[0], args.baudrate, args.directory,
+                                      args.quiet, processor=processor,
+                                      binary=args.binary))
+else:
+    files = asyncio.run(ingest.ingestMany(ports, args.baudrate, args.directory,
+                                          args.quiet, processor, args.binary))
+    files = [fullName for deviceFiles in files.values() for fullName in deviceFiles]
+
+for fullName in files:
+    print("Written", fullName)
@@ -0,0 +1,153 @@
+"""
+Measures how fast the receiver can take in raw data files, by replaying them
+with the simulator at several baud rates. For each baud rate it reports:
+    - lines and bytes received per second
+    - latency from the last byte being sent to the last file being closed
+    - CPU time used by the receiver, as a share of the time it ran for
+The simulator runs in its own process, so only the receiver's CPU time is
+counted.
+
+    python benchmark.py --baudrates 115200 1000000 0
+"""
+
+import argparse # for choosing the files and baud rates
+import asyncio # runs the ingest service
+import contextlib # for hiding the receiver's output
+import glob # for finding raw data files
+import ingest # the receiver being measured
+import io # for hiding the receiver's output
+import multiprocessing # runs the simulator alongside the receiver
+import os # for the data folder
+import records # for counting binary records
+import shutil # for removing the received files
+import simulator # replays the files
+import sys # for exiting where there are no pseudo-terminals
+import tempfile # somewhere to put the received files
+import time # for timing
+
+class _Timer:
+    """
+    Processor for the receiver that records when each file is closed.
+
+    Methods
+    -------
+    add_line(line)
+        Does nothing.
+    finish()
+        Records the time.
+    """
+
+    closed = [] # time.monotonic() when each file was closed
+
+    def __init__(self, filePath):
+        pass
+
+    def add_line(self, line):
+        pass
+
+    def finish(self):
+        _Timer.closed.append(time.monotonic())
+
+def _replay(master, data, baudrate, connection):
+    """
+    Replays the bytes, then sends back the time the last byte was sent. Runs
+    in the simulator's process.
+
+    """
+    connection.send(simulator.replay(master, data, baudrate))
+
+def runOnce(data, baudrate, binary=False):
+    """
+    Replays a transmission at one baud rate and measures the receiver.
+
+    Parameters
+    ----------
+    data : bytes
+        The bytes of the transmission.
+    baudrate : int
+        Baud rate to send at, or 0 to send as fast as the receiver reads.
+    binary : bool, optional
+        Set True if the transmission is binary records. The default is False.
+
+    Returns
+    -------
+    result : dict
+        Lines, bytes, time taken, lines/s, bytes/s, latency and CPU use.
+
+    """
+    directory = tempfile.mkdtemp()
+    master, port = simulator.openPty()
+    serialPort = ingest.openSerial(port, baudrate or ingest.DEFAULT_BAUDRATE)
+
+    receiving, sending = multiprocessing.Pipe(duplex=False)
+    sender = multiprocessing.Process(target=_replay, args=(master, data, baudrate, sending))
+    _Timer.closed = []
+
+    try:
+        wallStart = time.monotonic()
+        cpuStart = time.process_time()
+        sender.start()
+        with contextlib.redirect_stdout(io.StringIO()): # only show the results
+            files = asyncio.run(ingest.ingest(directory=directory, quiet=True,
+                                              serialPort=serialPort, processor=_Timer,
+                                              binary=binary))
+        cpu = time.process_time() - cpuStart
+        wall = time.monotonic() - wallStart
+        lastByteTime = receiving.recv()
+        sender.join()
+
+        lines = 0
+        nBytes = 0
+        for filePath in files:
+            with open(filePath, "rb") as f:
+                contents = f.read()
+            if binary:
+                lines += len(contents) // records.RECORD.size
+            else:
+                lines += contents.count(b"\n")
+            nBytes += len(contents)
+    finally:
+        os.close(master)
+        shutil.rmtree(directory)
+
+    return {
+        "lines": lines,
+        "bytes": nBytes,
+        "time": wall,
+        "lines/s": lines / wall,
+        "bytes/s": nBytes / wall,
+        "latency": _Timer.closed[-1] - lastByteTime if len(_Timer.closed) else float("nan"),
+        "cpu": cpu / wall
+    }
+
+if __name__ == "__main__":
+    if not hasattr(os, "openpty"):
+        print("Pseudo-terminals aren't available on this system")
+        sys.exit(1)
+
+    parser = argparse.ArgumentParser(description="Measure the throughput of the receiver")
+    parser.add_argument("files", nargs="*",
+                        help="raw data files to send (default: every one in the 'data' folder)")
+    parser.add_argument("--baudrates", type=int, nargs="+", default=[115200, 1000000, 0],
+                        help="baud rates to test, 0 to send as fast as the receiver reads")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="number of times to send the files in each run")
+    parser.add_argument("--drop", type=float, default=0, help="chance of dropping each byte")
+    parser.add_argument("--garble", type=float, default=0, help="chance of garbling each byte")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--binary", action="store_true", help="send binary records rather than text")
+    args = parser.parse_args()
+
+    filePaths = args.files or sorted(glob.glob(os.path.join(ingest.dataDirectory(), "RAW-*.csv")))
+    data = simulator.buildStream(filePaths * args.repeat, args.binary)
+    data = simulator.corrupt(data, args.drop, args.garble, args.seed)
+    print("Sending {} file(s), {} bytes\n".format(len(filePaths) * args.repeat, len(data)))
+
+    print("{:>9} {:>9} {:>10} {:>8} {:>10} {:>12} {:>11} {:>5}".format(
+        "baud", "lines", "bytes", "time/s", "lines/s", "bytes/s", "latency/ms", "cpu"))
+    for baudrate in args.baudrates:
+        result = runOnce(data, baudrate, args.binary)
+        print("{:>9} {:>9} {:>10} {:>8.2f} {:>10.0f} {:>12.0f} {:>11.1f} {:>4.0%}".format(
+            baudrate or "max", result["lines"], result["bytes"], result["time"],
+            result["lines/s"], result["bytes/s"], result["latency"] * 1000,
+            result["cpu"]))
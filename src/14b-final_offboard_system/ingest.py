@@ -0,0 +1,756 @@
+"""
+Receives raw data files from the off-board system over serial and writes them
+to the data directory.
+
+The off-board system forwards every character sent by the ball. A file starts
+with an "s", followed by the lines of the file, and the transmission ends with
+an "e". The lines can be sent as text, or as binary records (see records.py),
+which are written to files of records. The serial port is read in large
+chunks by a background thread, which hands them to an asyncio task that splits
+them into files and lines and writes them through a large buffer.
+"""
+
+import asyncio # runs the reader, writer and reports together
+import concurrent.futures # finishes processing files away from the writer
+from datetime import datetime # used to give files a unique name
+import os.path # for finding relative file path
+import records # for receiving binary records instead of text
+import serial # for serial port comms
+import threading # reads the serial port without blocking the writer
+import time # for measuring throughput
+
+DEFAULT_PORT = "COM3"
+DEFAULT_BAUDRATE = 9600
+READ_SIZE = 4096 # most bytes taken from the serial port at once
+READ_TIMEOUT = 0.1 # seconds - how often the reader checks if it should stop
+WRITE_BUFFER_SIZE = 1024 * 1024 # bytes held in memory before being written
+FLUSH_INTERVAL = 1 # seconds between writes of the buffer to the file
+REPORT_INTERVAL = 5 # seconds between throughput reports in quiet mode
+
+START_FLAG = b"s"
+END_FLAG = b"e"
+DATA_CHARACTERS = b"0123456789.,-" # everything a line of a raw data file is made of
+DEVICE_SEPARATOR = "#" # files from a device are named 'RAW-...#device.csv' - must match const.py in the post-processing system
+
+def dataDirectory():
+    """
+    Finds the 'data' folder of the repository.
+
+    Returns
+    -------
+    path : string
+        Path to the 'data' folder.
+
+    """
+    my_path = os.path.abspath(os.path.dirname(__file__))
+    return os.path.join(my_path, "..", "..", "data")
+
+def deviceId(name):
+    """
+    Makes a device ID from a name, such as the name of a serial port, for
+    when several ports are read at once, e.g. "COM3" or "/dev/ttyUSB0" ->
+    "ttyUSB0".
+
+    Parameters
+    ----------
+    name : string
+        The name, e.g. of the serial port.
+
+    Returns
+    -------
+    deviceId : string
+        The device ID, made of letters, numbers and underscores only.
+
+    """
+    name = os.path.basename(name)
+    return "".join(c if c.isalnum() else "_" for c in name)
+
+def openSerial(port=DEFAULT_PORT, baudrate=DEFAULT_BAUDRATE):
+    """
+    Opens the serial port
+
+    Parameters
+    ----------
+    port : string, optional
+        Name of the serial port, e.g. "COM3" or "/dev/ttyUSB0". The default is
+        DEFAULT_PORT.
+    baudrate : int, optional
+        Baud rate of the serial port. The default is DEFAULT_BAUDRATE.
+
+    Returns
+    -------
+    serialPort : serial port object
+        This is the object that accesses the serial port throughout the script.
+    """
+    serialPort = serial.Serial(port = port,
+                               baudrate = baudrate,
+                               bytesize = 8,
+                               timeout = READ_TIMEOUT,
+                               stopbits = serial.STOPBITS_ONE)
+    return serialPort
+
+class FrameParser:
+    """
+    Splits the bytes received from the serial port into files and lines.
+    Bytes can be fed in chunks of any size - a line split across two chunks
+    is held back until the rest of it arrives.
+
+    Methods
+    -------
+    feed(chunk)
+        Splits a chunk of bytes into events.
+    """
+
+    def __init__(self):
+        self.__pending = b"" # start of a line that hasn't finished yet
+
+    def feed(self, chunk):
+        """
+        Splits a chunk of bytes into events, in the order they were received.
+        Each event is one of:
+            ("start", None) - a new file has started
+            ("line", line) - a line of the current file, without its ending
+            ("end", None) - the transmission has finished
+
+        Parameters
+        ----------
+        chunk : bytes
+            Bytes read from the serial port.
+
+        Returns
+        -------
+        events : list of tuples
+            Events found in the chunk.
+
+        """
+        # lines end in "\r\n", but older files end them in "\r" only
+        lines = (self.__pending + chunk.replace(b"\r", b"\n")).split(b"\n")
+        self.__pending = lines.pop()
+
+        # the end flag isn't followed by a new line, and may be straight after 
+        # the last line of the last file
+        if self.__pending.endswith(END_FLAG):
+            lastLine = self.__pending[:-len(END_FLAG)]
+            if len(lastLine.strip(DATA_CHARACTERS + START_FLAG)) == 0:
+                lines += [lastLine, END_FLAG]
+                self.__pending = b""
+
+        events = []
+        for line in lines:
+            line = line.strip()
+
+            # the start flag comes straight before the first line of a file,
+            # which may be straight after the last line of the file before
+            # (anything else, e.g. the name the off-board system prints when it
+            # starts, isn't data so can't have a start flag after it)
+            parts = line.split(START_FLAG)
+            if len(parts) > 1 and len(parts[0].strip(DATA_CHARACTERS)) > 0:
+                parts = [line]
+
+            for i, part in enumerate(parts):
+                if i > 0:
+                    events.append(("start", None))
+
+                if part == END_FLAG:
+                    events.append(("end", None))
+                elif len(part) > 0:
+                    events.append(("line", part))
+
+        return events
+
+class RecordParser:
+    """
+    Splits the bytes received from the serial port into files and records, in
+    place of a FrameParser when the ball sends records rather than text.
+    Records with the wrong CRC, and any other bytes between records, are
+    skipped, and the next record is found from its sync bytes.
+
+    Attributes
+    ----------
+    skipped : int
+        Bytes skipped since the first file started.
+    lost : int
+        Records missing from the sequence numbers.
+
+    Methods
+    -------
+    feed(chunk)
+        Splits a chunk of bytes into events.
+    """
+
+    def __init__(self):
+        self.skipped = 0
+        self.lost = 0
+        self.__pending = b"" # start of a record that hasn't finished yet
+        self.__inSync = False # whether the last byte ended a record or flag
+        self.__started = False # whether the first file has started
+        self.__sequence = -1 # sequence number of the last record
+
+    def feed(self, chunk):
+        """
+        Splits a chunk of bytes into events, in the order they were received.
+        Each event is one of:
+            ("start", None) - a new file has started
+            ("record", record) - a record of the current file
+            ("end", None) - the transmission has finished
+
+        Parameters
+        ----------
+        chunk : bytes
+            Bytes read from the serial port.
+
+        Returns
+        -------
+        events : list of tuples
+            Events found in the chunk.
+
+        """
+        data = self.__pending + chunk
+        position = 0
+        events = []
+
+        while position < len(data):
+            if data.startswith(records.SYNC, position):
+                if len(data) - position < records.RECORD.size: # wait for the rest of it
+                    break
+                record = data[position:position+records.RECORD.size]
+                if records.crc(record) == int.from_bytes(record[-2:], "little"):
+                    sequence = int.from_bytes(record[2:4], "little")
+                    # each file is numbered from 0, so if the numbers go back, 
+                    # a new file has started even if its start flag was lost
+                    if sequence <= self.__sequence:
+                        events.append(("start", None))
+                        self.__sequence = -1
+                    self.lost += sequence - self.__sequence - 1
+                    self.__sequence = sequence
+                    events.append(("record", record))
+                    position += records.RECORD.size
+                    self.__inSync = True
+                    continue
+
+            # a start flag found out of sync must have the first record of a 
+            # file after it
+            elif data.startswith(START_FLAG, position):
+                if not self.__inSync and len(data) - position <= records.RECORD.size:
+                    break # wait for the record after it
+                record = data[position+1:position+1+records.RECORD.size]
+                if self.__inSync or (record.startswith(records.SYNC) and
+                                     records.crc(record) == int.from_bytes(record[-2:], "little")
+                                     and record[2:4] == b"\x00\x00"):
+                    events.append(("start", None))
+                    position += 1
+                    self.__inSync = True
+                    self.__started = True
+                    self.__sequence = -1
+                    continue
+
+            elif data.startswith(END_FLAG, position) and self.__inSync:
+                events.append(("end", None))
+                position += 1
+                continue
+
+            elif records.SYNC.startswith(data[position:]): # wait for the rest of the sync bytes
+                break
+
+            # not part of a record
+            if self.__started:
+                self.skipped += 1
+            self.__inSync = False
+            position += 1
+
+        self.__pending = data[position:]
+        return events
+
+class FileWriter:
+    """
+    Writes the lines of one raw data file through a large buffer, so the file
+    is written in a few large pieces rather than line by line.
+
+    Methods
+    -------
+    write(line)
+        Adds a line to the file.
+    flush()
+        Writes the buffer to the file.
+    close()
+        Writes the buffer to the file and closes it.
+    """
+
+    def __init__(self, directory, bufferSize=WRITE_BUFFER_SIZE, deviceId=None,
+                 binary=False):
+        """
+        Opens a file for writing. Each file will have a unique name
+
+        Parameters
+        ----------
+        directory : string
+            Folder to create the file in.
+        bufferSize : int, optional
+            Bytes held in memory before being written. The default is
+            WRITE_BUFFER_SIZE.
+        deviceId : string, optional
+            ID of the device the file came from, added to the end of the name.
+            The default is None, which leaves it out.
+        binary : bool, optional
+            Set True to write binary records rather than lines of text. The
+            default is False.
+
+        """
+        #use current date and time to generate unique file name
+        now = datetime.now()
+        filename = now.strftime("RAW-%Y.%m.%d-%H.%M.%S")
+
+        ext = records.BINARY_FILE_TYPE if binary else ".csv"
+        if deviceId != None:
+            ext = DEVICE_SEPARATOR + deviceId + ext
+
+        #several files can arrive in the same second
+        self.path = os.path.join(directory, filename + ext)
+        copy = 1
+        while os.path.exists(self.path):
+            copy += 1
+            self.path = os.path.join(directory, "{}-{}{}".format(filename, copy, ext))
+
+        self.lines = 0
+        self.__ending = b"" if binary else b"\n"
+        self.__file = open(self.path, "wb", buffering=bufferSize)
+
+    def write(self, line):
+        """
+        Adds a line to the file.
+
+        Parameters
+        ----------
+        line : bytes
+            The line, without its ending, or a record.
+
+        """
+        self.__file.write(line + self.__ending)
+        self.lines += 1
+
+    def flush(self):
+        """
+        Writes the buffer to the file.
+
+        """
+        self.__file.flush()
+
+    def close(self):
+        """
+        Writes the buffer to the file and closes it.
+
+        Returns
+        -------
+        path : string
+            Path to the file.
+
+        """
+        self.__file.close()
+        return self.path
+
+class Throughput:
+    """
+    Counts the lines and bytes received, to report the rate they arrive at.
+
+    Methods
+    -------
+    add(lines, nBytes)
+        Counts lines and bytes that have been received.
+    report()
+        Returns a summary of the rates since the last report, and overall.
+    """
+
+    def __init__(self):
+        self.lines = 0
+        self.bytes = 0
+        self.__start = time.perf_counter()
+        self.__lastReport = (self.__start, 0, 0)
+
+    def add(self, lines, nBytes):
+        """
+        Counts lines and bytes that have been received.
+
+        Parameters
+        ----------
+        lines : int
+            Number of lines received.
+        nBytes : int
+            Number of bytes received.
+
+        """
+        self.lines += lines
+        self.bytes += nBytes
+
+    def report(self):
+        """
+        Returns a summary of the rates since the last report, and overall.
+
+        Returns
+        -------
+        summary : string
+            The summary.
+
+        """
+        now = time.perf_counter()
+        last, lastLines, lastBytes = self.__lastReport
+        self.__lastReport = (now, self.lines, self.bytes)
+
+        interval = max(now - last, 1e-9)
+        total = max(now - self.__start, 1e-9)
+        return "{} lines, {} bytes ({:.0f} lines/s, {:.0f} bytes/s now, " \
+               "{:.0f} lines/s overall)".format(
+                   self.lines, self.bytes, (self.lines - lastLines)/interval,
+                   (self.bytes - lastBytes)/interval, self.lines/total)
+
+def readerThread(serialPort, loop, queue, stop):
+    """
+    Reads the serial port in chunks and puts them on an asyncio queue. Puts
+    None on the queue when it stops, after 'stop' is set or if the serial
+    port fails.
+
+    Parameters
+    ----------
+    serialPort : serial port object
+        The serial port to read.
+    loop : asyncio event loop
+        The loop the queue belongs to.
+    queue : asyncio.Queue
+        Queue for the chunks.
+    stop : threading.Event
+        Set to stop reading.
+
+    Returns
+    -------
+    None.
+
+    """
+    try:
+        while not stop.is_set():
+            # wait for a byte, then take everything else that's waiting with it
+            chunk = serialPort.read(1)
+            if len(chunk) == 0:
+                continue
+            waiting = serialPort.in_waiting
+            if waiting > 0:
+                chunk += serialPort.read(min(waiting, READ_SIZE))
+            loop.call_soon_threadsafe(queue.put_nowait, chunk)
+    except (serial.SerialException, OSError) as e:
+        print("Serial port could not be read:", e)
+    finally:
+        loop.call_soon_threadsafe(queue.put_nowait, None)
+
+class Receiver:
+    """
+    Turns the events from a FrameParser into raw data files. Each line can
+    also be passed on to a processor as it is written, which is finished once
+    the file is closed. Finishing a file can take a while, so it is done by an
+    executor while the event loop carries on receiving; the receiver must be
+    used from a running event loop if it has a processor.
+
+    Methods
+    -------
+    handle(event, payload)
+        Acts on one event.
+    flush()
+        Writes the buffer of the current file to it.
+    close()
+        Closes the current file, if there is one.
+    finish()
+        Closes the current file, and waits for every file to be processed.
+    """
+
+    def __init__(self, directory, quiet=False, processor=None, deviceId=None,
+                 binary=False, executor=None):
+        """
+        Parameters
+        ----------
+        directory : string
+            Folder to create files in.
+        quiet : bool, optional
+            Set True to not print each line as it arrives. The default is
+            False.
+        processor : callable, optional
+            Called with the path of each new file, returning an object with an
+            'add_line(line)' method, called with each line of the file as a
+            string, and a 'finish()' method, called once the file is closed.
+            The default is None, which just writes the files.
+        deviceId : string, optional
+            ID of the device the files come from, added to their names and to
+            everything printed. The default is None, which leaves it out.
+        binary : bool, optional
+            Set True if the events come from a RecordParser, to write files of
+            records. The processor is still given each line as text. The
+            default is False.
+        executor : concurrent.futures.Executor, optional
+            Runs the 'finish()' method of each processor. Give it one worker
+            so files are finished one at a time, in the order they arrived.
+            The default is None, which uses the event loop's default executor.
+
+        """
+        self.directory = directory
+        self.quiet = quiet
+        self.processor = processor
+        self.deviceId = deviceId
+        self.binary = binary
+        self.prefix = "" if deviceId == None else "[{}] ".format(deviceId)
+        self.files = [] # paths to the files that have been finished
+        self.finished = False # whether the end flag has been received
+        self.throughput = Throughput()
+        self.executor = executor
+        self.__finishing = [] # processors being finished, as futures
+        self.__writer = None
+        self.__stream = None # processor of the current file
+
+    def handle(self, event, payload):
+        """
+        Acts on one event.
+
+        Parameters
+        ----------
+        event : string
+            "start", "line", "record" or "end".
+        payload : bytes or None
+            The line, for "line" events, or the record, for "record" events.
+
+        Returns
+        -------
+        None.
+
+        """
+        if event == "start": # start of file
+            # close any file if one already exists
+            if self.__writer != None:
+                print(self.prefix + "Starting new file")
+            self.close()
+            self.__writer = FileWriter(self.directory, deviceId=self.deviceId,
+                                       binary=self.binary)
+            if self.processor != None:
+                self.__stream = self.processor(self.__writer.path)
+        elif event == "end": # end of transmission
+            print(self.prefix + "end")
+            self.close()
+            self.finished = True
+        elif self.__writer != None: # normal data transmission
+            self.__writer.write(payload)
+            self.throughput.add(1, len(payload) + (event == "line"))
+            if self.quiet and self.__stream == None:
+                return
+
+            line = payload if event == "line" else records.toLine(payload)
+            if not self.quiet:
+                print(self.prefix + line.decode("ascii", "replace"))
+            if self.__stream != None:
+                self.__stream.add_line(line.decode("ascii", "replace"))
+        else: # if starting flag ('s') has not been read:
+            if not self.quiet:
+                print(self.prefix + "Waiting to begin")
+
+    def flush(self):
+        """
+        Writes the buffer of the current file to it.
+
+        Returns
+        -------
+        None.
+
+        """
+        if self.__writer != None:
+            self.__writer.flush()
+
+    def close(self):
+        """
+        Closes the current file, if there is one, and starts finishing
+        processing it on the executor.
+
+        Returns
+        -------
+        None.
+
+        """
+        if self.__writer != None:
+            self.files.append(self.__writer.close())
+            self.__writer = None
+        if self.__stream != None:
+            loop = asyncio.get_running_loop()
+            self.__finishing.append(loop.run_in_executor(self.executor,
+                                                         self.__stream.finish))
+            self.__stream = None
+
+    async def finish(self):
+        """
+        Closes the current file, if there is one, and waits for every file to
+        finish processing. A file that can't be processed is reported, rather
+        than stopping the others.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.close()
+        results = await asyncio.gather(*self.__finishing, return_exceptions=True)
+        self.__finishing = []
+        for result in results:
+            if isinstance(result, Exception):
+                print(self.prefix + "File could not be processed:", result)
+
+async def flushPeriodically(receiver):
+    """
+    Writes the buffer of the current file every FLUSH_INTERVAL seconds, and
+    reports throughput every REPORT_INTERVAL seconds in quiet mode.
+
+    Parameters
+    ----------
+    receiver : Receiver
+        The receiver writing the files.
+
+    Returns
+    -------
+    None.
+
+    """
+    lastReport = time.perf_counter()
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL)
+        receiver.flush()
+
+        if receiver.quiet and time.perf_counter() - lastReport >= REPORT_INTERVAL:
+            lastReport = time.perf_counter()
+            print(receiver.prefix + receiver.throughput.report())
+
+async def ingest(port=DEFAULT_PORT, baudrate=DEFAULT_BAUDRATE, directory=None,
+                 quiet=False, serialPort=None, processor=None, deviceId=None,
+                 binary=False, executor=None):
+    """
+    Receives raw data files over serial until the end flag arrives, or the
+    serial port closes.
+
+    Parameters
+    ----------
+    port : string, optional
+        Name of the serial port. The default is DEFAULT_PORT.
+    baudrate : int, optional
+        Baud rate of the serial port. The default is DEFAULT_BAUDRATE.
+    directory : string, optional
+        Folder to write the files to. The default is the 'data' folder.
+    quiet : bool, optional
+        Set True to report throughput instead of printing each line. The
+        default is False.
+    serialPort : serial port object, optional
+        An open serial port to read instead of opening 'port'.
+    processor : callable, optional
+        Creates a processor for each file as it is received (see Receiver).
+        The default is None.
+    deviceId : string, optional
+        ID of the device, added to the names of the files. The default is
+        None, which leaves it out.
+    binary : bool, optional
+        Set True if the ball sends binary records rather than text. The
+        default is False.
+    executor : concurrent.futures.Executor, optional
+        Finishes processing each file (see Receiver). The default is None,
+        which finishes them one at a time on a thread of their own.
+
+    Returns
+    -------
+    files : list of strings
+        Paths to the files that were written.
+
+    """
+    if directory == None:
+        directory = dataDirectory()
+    if serialPort == None:
+        serialPort = openSerial(port, baudrate)
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    stop = threading.Event()
+    reader = threading.Thread(target=readerThread,
+                              args=(serialPort, loop, queue, stop), daemon=True)
+    parser = RecordParser() if binary else FrameParser()
+    ownExecutor = executor == None
+    if ownExecutor:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    receiver = Receiver(directory, quiet, processor, deviceId, binary, executor)
+
+    reader.start()
+    flusher = asyncio.create_task(flushPeriodically(receiver))
+    try:
+        while not receiver.finished:
+            chunk = await queue.get()
+            if chunk == None: # reader has stopped
+                break
+            for event, payload in parser.feed(chunk):
+                receiver.handle(event, payload)
+                if receiver.finished:
+                    break
+    finally:
+        flusher.cancel()
+        stop.set()
+        await receiver.finish()
+        await loop.run_in_executor(None, reader.join)
+        serialPort.close()
+        if ownExecutor:
+            executor.shutdown()
+
+    if quiet:
+        print(receiver.prefix + receiver.throughput.report())
+    if binary and (parser.lost > 0 or parser.skipped > 0):
+        print(receiver.prefix + "{} record(s) lost, {} byte(s) skipped"
+              .format(parser.lost, parser.skipped))
+    return receiver.files
+
+async def ingestMany(ports, baudrate=DEFAULT_BAUDRATE, directory=None,
+                     quiet=False, processor=None, binary=False):
+    """
+    Receives raw data files from several serial ports at once, e.g. from
+    several balls, until each has sent its end flag or closed.
+
+    Each port has its own reader thread, parser, files and throughput
+    counters, and the files from each are named with the ID of its device.
+    The reader threads keep taking data from their ports while files from
+    other ports are being written or processed, so no data is lost. Files are
+    processed by one worker shared by every port, away from the event loop,
+    as they all update the same tracker. If a port fails, e.g. it can't be
+    opened, it is reported and the other ports carry on.
+
+    Parameters
+    ----------
+    ports : dict
+        Name of each serial port, keyed by the ID of its device.
+    baudrate : int, optional
+        Baud rate of the serial ports. The default is DEFAULT_BAUDRATE.
+    directory : string, optional
+        Folder to write the files to. The default is the 'data' folder.
+    quiet : bool, optional
+        Set True to report throughput instead of printing each line. The
+        default is False.
+    processor : callable, optional
+        Creates a processor for each file as it is received (see Receiver).
+        The default is None.
+    binary : bool, optional
+        Set True if the balls send binary records rather than text. The
+        default is False.
+
+    Returns
+    -------
+    files : dict
+        Paths to the files that were written from each device, keyed by its
+        ID. Devices whose port failed are left out.
+
+    """
+    deviceIds = list(ports.keys())
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        results = await asyncio.gather(*[ingest(ports[deviceId], baudrate, directory, quiet,
+                                                processor=processor, deviceId=deviceId,
+                                                binary=binary, executor=executor)
+                                         for deviceId in deviceIds],
+                                       return_exceptions=True)
+
+    files = {}
+    for deviceId, result in zip(deviceIds, results):
+        if isinstance(result, Exception):
+            print("[{}] Stopped receiving from {}: {}".format(deviceId, ports[deviceId], result))
+        else:
+            files[deviceId] = result
+    return files
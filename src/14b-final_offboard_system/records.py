@@ -0,0 +1,119 @@
+"""
+Compact binary records for raw data, as an alternative to lines of text. Each
+record is one line of a raw data file in 28 bytes, rather than about 60:
+    - two sync bytes, 0xAA 0x55
+    - sequence number (uint16), counting from 0 at the start of each file
+    - time in ms (uint32)
+    - the other nine values (int16), each multiplied by its scale, which is the
+      resolution of the sensor: 0.01 m/s^2, 1/16 deg/s and 1/16 deg
+    - CRC-16/CCITT of everything after the sync bytes (uint16)
+all little-endian. Files are framed with the same start and end flags as
+text, which are only looked for between records (see ingest.RecordParser).
+
+The layout must match const.py in the post-processing system, which reads
+files of these records (with the extension BINARY_FILE_TYPE) as raw data.
+"""
+
+import binascii # for the CRC
+import struct # for packing the records
+
+SYNC = b"\xaa\x55"
+RECORD = struct.Struct("<2sHI9hH")
+SCALES = (1, 100, 100, 100, 16, 16, 16, 16, 16, 16)
+BINARY_FILE_TYPE = ".bin"
+
+def crc(record):
+    """
+    Calculates the CRC of a record.
+
+    Parameters
+    ----------
+    record : bytes
+        The record. Its CRC is ignored.
+
+    Returns
+    -------
+    crc : int
+        The CRC.
+
+    """
+    return binascii.crc_hqx(record[len(SYNC):RECORD.size-2], 0xFFFF)
+
+def encode(values, sequence):
+    """
+    Encodes one line of raw data as a record.
+
+    Parameters
+    ----------
+    values : list of floats
+        The ten values of the line.
+    sequence : int
+        Sequence number of the record in its file.
+
+    Returns
+    -------
+    record : bytes
+        The record.
+
+    """
+    scaled = [int(round(value * scale)) for value, scale in zip(values, SCALES)]
+    record = RECORD.pack(SYNC, sequence % 65536, *scaled, 0)
+    return record[:-2] + crc(record).to_bytes(2, "little")
+
+def encodeLines(lines):
+    """
+    Encodes the lines of a raw data file as records, numbered from 0.
+
+    Parameters
+    ----------
+    lines : list of bytes
+        The lines of the file. Blank lines are skipped.
+
+    Returns
+    -------
+    records : bytes
+        The records.
+
+    """
+    lines = [line for line in lines if len(line.strip()) > 0]
+    return b"".join(encode([float(value) for value in line.split(b",")], sequence)
+                    for sequence, line in enumerate(lines))
+
+def decode(record):
+    """
+    Decodes a record.
+
+    Parameters
+    ----------
+    record : bytes
+        The record.
+
+    Returns
+    -------
+    sequence : int
+        Sequence number of the record.
+    values : list of floats
+        The ten values of the line.
+
+    """
+    _, sequence, *scaled, _ = RECORD.unpack(record)
+    return sequence, [value / scale for value, scale in zip(scaled, SCALES)]
+
+def toLine(record):
+    """
+    Decodes a record into a line of text, as it would be in a CSV raw data
+    file.
+
+    Parameters
+    ----------
+    record : bytes
+        The record.
+
+    Returns
+    -------
+    line : bytes
+        The line, without its ending.
+
+    """
+    _, values = decode(record)
+    return ",".join([str(int(values[0]))] + [repr(value) for value in values[1:]]).encode()
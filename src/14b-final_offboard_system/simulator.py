@@ -0,0 +1,174 @@
+"""
+Stands in for the off-board system, by replaying raw data files over a
+pseudo-terminal, so the receiver can be tested (and load tested) without a
+ball. Only works where pseudo-terminals do (Linux and macOS).
+
+The files are framed as the ball sends them - an "s" before each file and an
+"e" at the end of the transmission - and sent at the rate a serial port with
+the given baud rate would. Bytes can be dropped or garbled at random, to test
+how the receiver copes with a poor link. The files can also be sent as binary
+records (see records.py).
+
+Run this script, then point the receiver at the port it prints, e.g.
+    python simulator.py --baudrate 115200 ../../data/RAW-TEST1.csv
+    python 14b-final_offboard_system.py --port /dev/pts/3
+"""
+
+import argparse # for choosing the files and baud rate
+import glob # for finding raw data files
+import ingest # for the framing flags and the data folder
+import numpy as np # for corrupting bytes
+import os # for the pseudo-terminal
+import records # for sending binary records
+import sys # for exiting where there are no pseudo-terminals
+import time # for pacing the bytes
+
+BITS_PER_BYTE = 10 # 8 data bits, a start bit and a stop bit
+SEND_INTERVAL = 0.01 # seconds between writes to the pseudo-terminal
+
+def buildStream(filePaths, binary=False):
+    """
+    Frames raw data files as the ball sends them. The lines end in "\\r\\n",
+    as they are written to the SD card.
+
+    Parameters
+    ----------
+    filePaths : list of strings
+        Paths to the raw data files.
+    binary : bool, optional
+        Set True to send each line as a binary record. The default is False.
+
+    Returns
+    -------
+    data : bytes
+        The bytes of the transmission.
+
+    """
+    data = b""
+    for filePath in filePaths:
+        with open(filePath, "rb") as f:
+            lines = f.read().replace(b"\r", b"\n").split(b"\n")
+        if binary:
+            data += ingest.START_FLAG + records.encodeLines(lines)
+        else:
+            data += ingest.START_FLAG + b"".join(line + b"\r\n" for line in lines
+                                                 if len(line) > 0)
+    return data + ingest.END_FLAG
+
+def corrupt(data, dropRate=0, garbleRate=0, seed=None):
+    """
+    Drops and garbles bytes of a transmission at random. The start and end
+    flags are left alone (in binary records, so are any bytes with the same
+    value).
+
+    Parameters
+    ----------
+    data : bytes
+        The bytes of the transmission.
+    dropRate : float, optional
+        Chance of each byte being dropped. The default is 0.
+    garbleRate : float, optional
+        Chance of each byte being replaced by another. The default is 0.
+    seed : int, optional
+        Seed for the random numbers, to repeat a run. The default is None.
+
+    Returns
+    -------
+    data : bytes
+        The corrupted bytes.
+
+    """
+    rng = np.random.default_rng(seed)
+    values = np.frombuffer(data, dtype=np.uint8).copy()
+    isFlag = np.isin(values, list(ingest.START_FLAG + ingest.END_FLAG))
+
+    garbled = ~isFlag & (rng.random(len(values)) < garbleRate)
+    values[garbled] = rng.integers(0, 256, np.count_nonzero(garbled))
+    # a garbled byte mustn't become a flag
+    values[garbled & np.isin(values, list(ingest.START_FLAG + ingest.END_FLAG))] = ord("?")
+
+    dropped = ~isFlag & (rng.random(len(values)) < dropRate)
+    return values[~dropped].tobytes()
+
+def openPty():
+    """
+    Opens a pseudo-terminal pair that passes bytes through unchanged.
+
+    Returns
+    -------
+    master : int
+        File descriptor to write the bytes to.
+    port : string
+        Name of the other end, to open as a serial port.
+
+    """
+    import tty # only on Linux and macOS, with the pseudo-terminals
+
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    return master, os.ttyname(slave)
+
+def replay(master, data, baudrate=0):
+    """
+    Writes bytes to a pseudo-terminal at the rate a serial port would send
+    them.
+
+    Parameters
+    ----------
+    master : int
+        File descriptor of the pseudo-terminal.
+    data : bytes
+        The bytes to send.
+    baudrate : int, optional
+        Baud rate to send at. The default is 0, which sends as fast as the
+        receiver reads.
+
+    Returns
+    -------
+    lastByteTime : float
+        time.monotonic() once the last byte was written.
+
+    """
+    if baudrate > 0:
+        chunkSize = max(1, int(baudrate / BITS_PER_BYTE * SEND_INTERVAL))
+    else:
+        chunkSize = 4096
+
+    start = time.monotonic()
+    sent = 0
+    while True:
+        sent += os.write(master, data[sent:sent+chunkSize])
+        if sent >= len(data):
+            return time.monotonic()
+
+        # wait until the bytes would have been sent at this baud rate
+        if baudrate > 0:
+            delay = start + sent * BITS_PER_BYTE / baudrate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+if __name__ == "__main__":
+    if not hasattr(os, "openpty"):
+        print("Pseudo-terminals aren't available on this system")
+        sys.exit(1)
+
+    parser = argparse.ArgumentParser(description="Replay raw data files over a pseudo-terminal")
+    parser.add_argument("files", nargs="*",
+                        help="raw data files to send (default: every one in the 'data' folder)")
+    parser.add_argument("--baudrate", type=int, default=ingest.DEFAULT_BAUDRATE,
+                        help="0 to send as fast as the receiver reads")
+    parser.add_argument("--drop", type=float, default=0, help="chance of dropping each byte")
+    parser.add_argument("--garble", type=float, default=0, help="chance of garbling each byte")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--binary", action="store_true", help="send binary records rather than text")
+    args = parser.parse_args()
+
+    filePaths = args.files or sorted(glob.glob(os.path.join(ingest.dataDirectory(), "RAW-*.csv")))
+    data = corrupt(buildStream(filePaths, args.binary), args.drop, args.garble, args.seed)
+
+    master, port = openPty()
+    input("Open the receiver on {}, then press enter to send {} file(s) ({} bytes)"
+          .format(port, len(filePaths), len(data)))
+    replay(master, data, args.baudrate)
+    input("Sent. Press enter to close the port")
+    os.close(master)
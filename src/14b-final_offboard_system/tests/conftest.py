@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the tests import the modules in the same way as '14b-final_offboard_system.py'
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,188 @@
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import ingest
+import records
+import simulator
+
+FILES = [[b"10,0.01,0.02,0.03,1.0,2.0,3.0,4.0,5.0,6.0",
+          b"20,0.04,0.05,0.06,1.5,2.5,3.5,4.5,5.5,6.5"],
+         [b"5,-0.01,-0.02,-0.03,-1.0,-2.0,-3.0,-4.0,-5.0,-6.0",
+          b"15,1.01,1.02,1.03,7.0,8.0,9.0,10.0,11.0,12.0",
+          b"25,2.01,2.02,2.03,13.0,14.0,15.0,16.0,17.0,18.0"]]
+
+def feed(parser, stream, chunkSize):
+    """Feeds a stream to a parser in chunks of the given size, and returns 
+    every event.
+    """
+
+    events = []
+    for i in range(0, len(stream), chunkSize):
+        events += parser.feed(stream[i:i+chunkSize])
+    return events
+
+
+class SlowProcessor:
+    """Stands in for a StreamingThrow that takes a while to finish, until 
+    'release' is set. Files starting with a line in 'failing' can't be 
+    processed.
+    """
+
+    release = threading.Event()
+    failing = []
+    finished = []
+
+    def __init__(self, filePath):
+        self.filePath = filePath
+        self.lines = []
+
+    def add_line(self, line):
+        self.lines.append(line)
+
+    def finish(self):
+        if self.lines[0] in self.failing:
+            raise RuntimeError("bad file")
+        # on the event loop, this would time out before the next file arrives
+        assert self.release.wait(5)
+        self.finished.append((self.filePath, self.lines))
+
+
+@pytest.mark.parametrize("chunkSize", [1, 3, 64, 4096])
+def test_frame_parser_splits_files_and_lines(chunkSize):
+    # the name the off-board system prints when it starts, the files with 
+    # lines ending in "\r\n" and "\r", and the end flag straight after a line
+    stream = b"offboard system\r\n" + \
+                b"s" + b"\r\n".join(FILES[0]) + b"\r\n" + \
+                b"s" + b"\r".join(FILES[1]) + b"e"
+
+    events = feed(ingest.FrameParser(), stream, chunkSize)
+
+    assert events == [("line", b"offboard system"), ("start", None)] + \
+                        [("line", line) for line in FILES[0]] + [("start", None)] + \
+                        [("line", line) for line in FILES[1]] + [("end", None)]
+
+@pytest.mark.parametrize("chunkSize", [1, 3, 64, 4096])
+def test_frame_parser_resynchronises_after_garbled_line(chunkSize):
+    # a garbled line with an "s" in it isn't taken as a start flag, and the 
+    # next file starts straight after the last line of the one before
+    stream = b"s" + FILES[0][0] + b"\r\n" + b"#?s!!" + b"\r\n" + \
+                FILES[0][1] + b"s" + FILES[1][0] + b"\r\ne"
+
+    events = feed(ingest.FrameParser(), stream, chunkSize)
+
+    assert events == [("start", None), ("line", FILES[0][0]), ("line", b"#?s!!"),
+                        ("line", FILES[0][1]), ("start", None), ("line", FILES[1][0]),
+                        ("end", None)]
+
+@pytest.mark.parametrize("chunkSize", [1, 5, 29, 4096])
+def test_record_parser_splits_files_and_records(chunkSize):
+    encoded = [records.encodeLines(lines) for lines in FILES]
+    stream = b"offboard system\r\n" + b"s" + encoded[0] + b"s" + encoded[1] + b"e"
+
+    parser = ingest.RecordParser()
+    events = feed(parser, stream, chunkSize)
+
+    assert [records.toLine(record) for event, record in events if event == "record"] == \
+            [records.toLine(record) for lines in encoded
+                for record in [lines[i:i+records.RECORD.size]
+                                for i in range(0, len(lines), records.RECORD.size)]]
+    assert [event for event, _ in events] == ["start"] + ["record"]*2 + \
+                                                ["start"] + ["record"]*3 + ["end"]
+    assert parser.skipped == 0 and parser.lost == 0
+
+@pytest.mark.parametrize("chunkSize", [1, 5, 29, 4096])
+def test_record_parser_resynchronises_after_corruption(chunkSize):
+    size = records.RECORD.size
+    first, second = [records.encodeLines(lines) for lines in FILES]
+
+    # noise with a false sync in it between the records of the first file, 
+    # a garbled record in the second, and the second file's start flag lost
+    garbled = bytearray(second[size:2*size])
+    garbled[8] ^= 0xFF
+    stream = b"s" + first[:size] + b"\x01\xaa\x55\x02" + first[size:] + \
+                second[:size] + bytes(garbled) + second[2*size:] + b"e"
+
+    parser = ingest.RecordParser()
+    events = feed(parser, stream, chunkSize)
+
+    assert events == [("start", None), ("record", first[:size]), ("record", first[size:]),
+                        ("start", None), ("record", second[:size]),
+                        ("record", second[2*size:]), ("end", None)]
+    assert parser.skipped == 4 + size
+    assert parser.lost == 1
+
+def receive(directory, deviceId=None):
+    """Receives the files with a receiver that has a SlowProcessor, and checks 
+    that the first file is still being finished while the rest are received.
+    """
+
+    async def run():
+        receiver = ingest.Receiver(directory, quiet=True, processor=SlowProcessor,
+                                   deviceId=deviceId)
+        for lines in FILES:
+            receiver.handle("start", None)
+            for line in lines:
+                receiver.handle("line", line)
+            await asyncio.sleep(0.05)
+        assert SlowProcessor.finished == []
+        SlowProcessor.release.set()
+        receiver.handle("end", None)
+        await receiver.finish()
+        return receiver.files
+
+    return asyncio.run(run())
+
+@pytest.fixture
+def slow_processor(monkeypatch):
+    """Resets the SlowProcessor for each test."""
+
+    monkeypatch.setattr(SlowProcessor, "release", threading.Event())
+    monkeypatch.setattr(SlowProcessor, "failing", [])
+    monkeypatch.setattr(SlowProcessor, "finished", [])
+
+def test_receiver_finishes_files_off_the_event_loop(tmp_path, slow_processor):
+    files = receive(str(tmp_path))
+
+    assert SlowProcessor.finished == [(filePath, [line.decode() for line in lines])
+                                        for filePath, lines in zip(files, FILES)]
+
+def test_receiver_reports_file_that_cannot_be_processed(tmp_path, slow_processor, capsys):
+    SlowProcessor.failing.append(FILES[0][0].decode())
+    files = receive(str(tmp_path), deviceId="ball1")
+
+    # the other file is still processed
+    assert SlowProcessor.finished == [(files[1], [line.decode() for line in FILES[1]])]
+    assert "[ball1] File could not be processed: bad file" in capsys.readouterr().out
+
+@pytest.mark.skipif(not hasattr(os, "openpty"), reason="needs pseudo-terminals")
+def test_ingest_many_keeps_receiving_when_a_port_fails(tmp_path, capsys):
+    master, port = simulator.openPty()
+    stream = b"s" + b"\r\n".join(FILES[0]) + b"\r\ne"
+    sender = threading.Timer(0.2, os.write, (master, stream))
+    sender.start()
+
+    try:
+        files = asyncio.run(ingest.ingestMany({"ball1": port,
+                                               "ball2": str(tmp_path / "missing")},
+                                              directory=str(tmp_path), quiet=True))
+    finally:
+        sender.join()
+        os.close(master)
+
+    assert list(files.keys()) == ["ball1"]
+    with open(files["ball1"][0], "rb") as f:
+        assert f.read() == b"\n".join(FILES[0]) + b"\n"
+    assert "[ball2] Stopped receiving from" in capsys.readouterr().out
+
+def test_ports_with_the_same_device_id_are_rejected():
+    script = os.path.join(os.path.dirname(__file__), "..", "14b-final_offboard_system.py")
+    result = subprocess.run([sys.executable, script, "--port", "ball1=COM3", "ball1=COM4"],
+                            capture_output=True, text=True, stdin=subprocess.DEVNULL)
+
+    assert result.returncode == 2
+    assert "COM3 and COM4 are both given the ID 'ball1'" in result.stderr
@@ -3,6 +3,8 @@ from obj import global_tracker
 from obj import functions
 from obj import processed_data
 from obj import raw_data
+from obj import records
+from obj import storage
 
 def get_prompt(level):
     """Prints out the current level of menu and receives user input about their 
@@ -87,6 +89,9 @@ def sanitise_file_name(addDataDirectory=False):
     # remove file extension if already included, and add it (back) on in lower case
     if userinput[-len(const.RAW_DATA_FILE_TYPE):].lower() == const.RAW_DATA_FILE_TYPE:
         fileName = userinput[:-len(const.RAW_DATA_FILE_TYPE)].upper() + const.RAW_DATA_FILE_TYPE
+    elif userinput[-len(const.RAW_DATA_BINARY_FILE_TYPE):].lower() == const.RAW_DATA_BINARY_FILE_TYPE:
+        fileName = userinput[:-len(const.RAW_DATA_BINARY_FILE_TYPE)].upper() + \
+                    const.RAW_DATA_BINARY_FILE_TYPE
     else:
         fileName = userinput.upper() + const.RAW_DATA_FILE_TYPE
     
@@ -181,16 +186,23 @@ def set_parameters_health(overwrite=True, showWarnings=True):
     return overwrite, showWarnings
     
 # 1ca
-def set_parameters_processed(overwrite=False):
+def set_parameters_processed(overwrite=False, workers=const.DEFAULT_WORKERS,
+                                integrationMethods=None):
     """Allows the user to set parameters to initialise the 'P.health' 
     object.
 
     Args:
         overwrite (bool, optional): value for class. Defaults to True.
-        showWarnings (bool, optional): value for class. Defaults to True.
+        workers (int, optional): value for class. Defaults to 
+            const.DEFAULT_WORKERS.
+        integrationMethods (dict[str, str], optional): value for class. 
+            Defaults to None, which uses const.DEFAULT_INTEGRATION_METHOD for 
+            every calculation.
 
     Returns:
         bool: value of overwrite.
+        int: value of workers.
+        dict[str, str]: value of integrationMethods.
     """
     
     # set possible values for overwrite
@@ -213,10 +225,75 @@ def set_parameters_processed(overwrite=False):
         else:
             print("Invalid input")
 
+    print("Set 'workers' (default is '{}')".format(workers))
+    
+    while True:
+        choice = input().strip()
+        if choice == "": # if blank, don't change value
+            break
+        elif choice.isdigit() and int(choice) > 0:
+            workers = int(choice)
+            break
+        else:
+            print("Invalid input")
+
+    # set possible values for the integration method of each calculation
+    integrationMethods = dict(integrationMethods or {})
+    options = {str(i): method for i, method in enumerate(const.INTEGRATION_METHODS)}
+
+    for calculation in integratingCalculations:
+        method = integrationMethods.get(calculation, const.DEFAULT_INTEGRATION_METHOD)
+        print("Set integration method for '{}' (default is '{}')".format(calculation, method))
+        for (key, val) in options.items():
+            print(str(key) + ") " + str(val))
+
+        while True:
+            choice = input().lower()
+            if choice == "": # if blank, don't change value
+                break
+            elif choice in options.keys():
+                integrationMethods[calculation] = options[choice]
+                break
+            else:
+                print("Invalid input")
+
     print("Parameters chosen:")
     print("  - overwrite = {}".format(overwrite))
+    print("  - workers = {}".format(workers))
+    for calculation in integratingCalculations:
+        print("  - integration method ({}) = {}".format(calculation,
+                integrationMethods.get(calculation, const.DEFAULT_INTEGRATION_METHOD)))
+
+    return overwrite, workers, integrationMethods
+
+# 1d
+def set_parameters_tracker(workers=const.DEFAULT_WORKERS):
+    """Allows the user to set parameters to open the global tracker.
+
+    Args:
+        workers (int, optional): value for class. Defaults to 
+            const.DEFAULT_WORKERS.
+
+    Returns:
+        int: value of workers.
+    """
+
+    print("Set 'workers' (default is '{}')".format(workers))
+    
+    while True:
+        choice = input().strip()
+        if choice == "": # if blank, don't change value
+            break
+        elif choice.isdigit() and int(choice) > 0:
+            workers = int(choice)
+            break
+        else:
+            print("Invalid input")
+
+    print("Parameters chosen:")
+    print("  - workers = {}".format(workers))
 
-    return overwrite
+    return workers
 
 # 1eab
 def set_parameters_graph_sensor_data(filtered=True, unfiltered=False):
@@ -313,13 +390,17 @@ def main():
             level = level[:-1]
         elif level == "1c": # processed files
             print("Set parameters:") # set parameters before creating objects
-            overwrite = set_parameters_processed()
-            P = processed_data.ProcessedData(overwrite)
+            overwrite, workers, integrationMethods = set_parameters_processed()
+            P = processed_data.ProcessedData(overwrite, workers=workers,
+                                                integrationMethods=integrationMethods)
         elif level == "1ca": # set parameters
             print("Set parameters:") # set parameters before creating objects
-            overwrite = set_parameters_processed(overwrite)
+            overwrite, workers, integrationMethods = set_parameters_processed(
+                                                        overwrite, workers, integrationMethods)
             # update class attributes
             P.overwrite = overwrite
+            P.workers = workers
+            P.integrationMethods = integrationMethods
             level = level[:-1]
         elif level == "1cb": # create processed data files for all raw data files
             if P.create_all_processed_data_files():
@@ -352,20 +433,38 @@ def main():
                 for entry in P.get_all_processed_files():
                     I.set_file_name(entry)
                     print("File: " + entry)
-                    for key in calculations.keys():
-                        if key == "all" or key == "q":
-                            continue
-                        print("  Calculating '{}'...".format(key))
-                        I.add_column(calculations[key])
+                    # each calculation is run once, after the ones it depends on
+                    I.calculate([name for name in calculations.values() if name != None])
             else:
-                print("  Calculating '{}'...".format(column_header))
                 for entry in P.get_all_processed_files():
                     I.set_file_name(entry)
                     print("File: " + entry)
-                    I.add_column(calculations[column_header])
+                    I.calculate([calculations[column_header]])
+            level = level[:-1]
+        elif level == "1ce": # export processed data files to CSV
+            P.export_processed_data_files()
+            level = level[:-1]
+        elif level == "1cf": # split raw data files into one entry per throw
+            if P.split_all_raw_data_files():
+                print("Create processed data files for the throws now? (y/n)")
+                if input().lower() == "y":
+                    level = "1cb"
+                    continue
+            level = level[:-1]
+        elif level == "1cg": # convert CSV raw data files to binary records
+            print("Each CSV raw data file will be replaced by its binary records. Continue? (y/n)")
+            if input().lower() == "y":
+                records.convert_all_files()
+            level = level[:-1]
+        elif level == "1ch": # recompress data files in the background
+            print("Recompressing data files ({}) in the background..."
+                    .format(const.DATA_COMPRESSION or "uncompressed"))
+            storage.start_recompression(const.DATA_COMPRESSION)
             level = level[:-1]
         elif level == "1d": # tracker
-            G = global_tracker.GlobalFile(True)
+            print("Set parameters:") # set parameters before creating objects
+            workers = set_parameters_tracker()
+            G = global_tracker.get_tracker(True, workers)
         elif level == "1da": # add raw data file to tracker
             fileName = sanitise_file_name(True)
             if G.add_file(fileName):
@@ -390,11 +489,10 @@ def main():
             if column_header == "q":
                 pass
             elif column_header == "all":
-                for key in metrics.keys():
-                    if key == "all" or key == "q":
-                        continue
-                    print("Calculating '{}'...".format(key))
-                    G.add_metric(metrics[key])
+                # calculate every metric in one pass over the files
+                keys = [key for key in metrics.keys() if key != "all" and key != "q"]
+                print("Calculating {}...".format(", ".join("'{}'".format(key) for key in keys)))
+                G.add_metrics([metrics[key] for key in keys])
             else:
                 G.add_metric(metrics[column_header])
             
@@ -416,6 +514,9 @@ def main():
                 if G.remove_metric(column_header):
                     print("Removed column '{}'".format(column_header))
             level = level[:-1]
+        elif level == "1df": # export the tracker to CSV
+            print("Tracker written to", G.export_csv())
+            level = level[:-1]
         elif level == "1e": # analysis
             filtered = True
             unfiltered = False
@@ -493,7 +594,7 @@ def main():
 
             level = level[:-1]
         elif level == "1eb": # population analysis
-            G = global_tracker.GlobalFile(True)
+            G = global_tracker.get_tracker(True)
 
         print("\n")
         level = get_prompt(level)
@@ -536,6 +637,10 @@ level1c = {
     "b": "Create processed data files for all raw data files",
     "c": "Create a processed data file for a specific raw data file",
     "d": "Add/update an operation for all files",
+    "e": "Export processed data files to CSV",
+    "f": "Split raw data files holding several throws",
+    "g": "Convert CSV raw data files to binary records",
+    "h": "Recompress data files with the codec set in const.py",
     "q": "Quit 'Processed files'"
 }
 
@@ -545,6 +650,7 @@ level1d = {
     "c": "Remove deleted files from tracker",
     "d": "Add/update a metric in tracker",
     "e": "Remove a metric from the tracker",
+    "f": "Export tracker to CSV",
     "q": "Quit 'Tracker'"
 }
 
@@ -568,22 +674,27 @@ level1eb = {
 }
 
 
-# calculations
+# calculations (names in the calculations registry)
 calculations = {
     "all": None,
-    "smooth": processed_data.ProcessedData().individual.calculations.smooth,
-    "ball centred velocities": processed_data.ProcessedData().individual.calculations.ball_centred_velocities,
-    "cartesian acceleration": processed_data.ProcessedData().individual.calculations.cartesian_acceleration,
-    "cartesian velocities": processed_data.ProcessedData().individual.calculations.cartesian_velocities,
-    "cartesian positions": processed_data.ProcessedData().individual.calculations.cartesian_positions,
+    "smooth": "smooth",
+    "ball centred velocities": "ball centred velocities",
+    "cartesian acceleration": "cartesian acceleration",
+    "cartesian velocities": "cartesian velocities",
+    "cartesian positions": "cartesian positions",
     "q": None
 }
 
+# calculations that integrate, so can use any of const.INTEGRATION_METHODS
+integratingCalculations = ["ball centred velocities", "cartesian velocities",
+                            "cartesian positions"]
+
 # metric
 metrics = {
     "all": None,
     "time of throw": processed_data.ProcessedData().metrics.total_time,
     "spiral rate": processed_data.ProcessedData().metrics.spiral_rate,
+    "device": processed_data.ProcessedData().metrics.device,
     "q": None
 }
 
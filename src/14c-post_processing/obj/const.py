@@ -10,11 +10,22 @@ DATA_DIRECTORY = os.path.join(__currentPath, __relativeToDataDirectory) # full a
 LENGTH_OF_DATA_DIR = len(__dataDirectory)
 PATH_LENGTH_TO_DATA_DIR = len(DATA_DIRECTORY)-LENGTH_OF_DATA_DIR # relative to project folder
 
+# compression of the raw and processed data files in the data directory - 
+# files are still named without the suffix everywhere else (e.g. in the 
+# tracker), and files stored with any of the codecs can be read
+DATA_COMPRESSION = None # None to store files uncompressed, or "gzip", "lzma" or "bz2"
+COMPRESSED_FILE_TYPES = {"gzip": ".gz", "lzma": ".xz", "bz2": ".bz2"} # suffix added to the name of a compressed file
+
 # for the global tracker file
 TRACKER_FILENAME = "globalTracker.csv"
 TRACKER_FILEPATH = os.path.join(DATA_DIRECTORY, TRACKER_FILENAME) # full file path
 TRACKER_BARE_MINIMUM = "name,health status,processed file" # bare minimum content of the tracker file (just the header)
 TRACKER_BARE_MINIMUM_LENGTH = len(TRACKER_BARE_MINIMUM.split(","))
+TRACKER_JOURNAL_FILE_TYPE = ".journal" # changes to the tracker file are appended to a journal with this suffix
+TRACKER_JOURNAL_COMPACTION_SIZE = 64 * 1024 # bytes - the journal is merged into the tracker file once it is larger than this
+TRACKER_BACKEND = "csv" # "csv" to store the tracker as a CSV file, or "sqlite" for a database
+TRACKER_DATABASE_FILENAME = "globalTracker.db"
+TRACKER_DATABASE_FILEPATH = os.path.join(DATA_DIRECTORY, TRACKER_DATABASE_FILENAME) # full file path
 
 # for all data files
 COLUMN_HEADERS = ["time", "acc (e_r)", "acc (e_theta)", "acc (e_phi)", 
@@ -40,13 +51,56 @@ assert len(SENSOR_OFFSETS) == NUMBER_OF_COLUMNS, \
 RAW_DATA_PREFIX = "RAW-"
 RAW_DATA_TITLE_FORMAT = RAW_DATA_PREFIX + "yyyy.mm.dd-hh.mm.ss"
 RAW_DATA_FILE_TYPE = ".csv"
+SEGMENT_SEPARATOR = "@" # a throw within a raw data file is named 'RAW-...@start-end.csv', after its lines
+DEVICE_SEPARATOR = "#" # a raw data file from one of several balls is named 'RAW-...#device.csv'
+
+# for raw data files stored as binary records, rather than CSV - each record 
+# is one line of a CSV raw data file: two sync bytes, a sequence number 
+# (uint16), the time in ms (uint32), the other nine values (int16, each 
+# multiplied by its scale, which is the resolution of the sensor) and a 
+# CRC-16/CCITT of everything after the sync bytes (uint16), little-endian
+RAW_DATA_BINARY_FILE_TYPE = ".bin"
+RECORD_SYNC = b"\xaa\x55"
+RECORD_SCALES = [1, 100, 100, 100, # ms, 0.01 m/s^2
+                    16, 16, 16, # 1/16 deg/s
+                    16, 16, 16] # 1/16 deg
+RECORD_SIZE = 28 # bytes
 
 # for processed data files
 PROCESSED_DATA_PREFIX = "PRO-"
 PROCESSED_DATA_FILE_TYPE = ".csv"
+PROCESSED_DATA_BINARY_FILE_TYPE = ".npz" # columns stored as NumPy arrays
+
+# numerical integration methods for calculations, and the one used by default
+INTEGRATION_METHODS = ["simpson", "trapezoid"]
+DEFAULT_INTEGRATION_METHOD = "simpson"
+
+# segmentation of a throw into the time before launch, the flight and the time 
+# after landing - the ball is moving if its acceleration differs from when it 
+# was at rest, or if it is spinning
+SEGMENT_REST_SAMPLES = 5 # samples after the sensors initialise used to measure the acceleration at rest
+SEGMENT_ACCELERATION_THRESHOLD = 2.0 # m/s^2 - change in acceleration magnitude from rest
+SEGMENT_SPIN_THRESHOLD = 1.0 # rad/s - angular velocity about e_r
+SEGMENT_MARGIN_SAMPLES = 5 # samples kept either side of the flight
+TRIM_TO_FLIGHT = True # set 'False' to keep every sample in the processed data files
+SPLIT_MINIMUM_GAP_SAMPLES = 25 # samples at rest needed between two throws in the same raw data file
+SPLIT_MINIMUM_THROW_SAMPLES = 5 # samples of movement needed to count as a throw
+
+# number of processes used to create processed data files in parallel
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+# watching the data directory for new raw data files (see 'watcher.py')
+WATCH_POLL_INTERVAL = 1.0 # s - time between scans of the data directory
+WATCH_SETTLE_TIME = 3.0 # s - a file must be unchanged for this long before it's processed, longer than the receiver takes to flush its files
+WATCH_LATENCY_SAMPLES = 100 # number of files the latency of each stage is averaged over
 
 # health check values
 untested = 0
 failed = 1
 passedWithWarnings = 2
-passed = 3
\ No newline at end of file
+passed = 3
+
+# health check warnings
+THROW_TIME_WARNING_THRESHOLD = 25000 # ms
+ACCELEROMETER_WARNING_THRESHOLD = 150 # accelerometer set to 16G
+GYRO_WARNING_THRESHOLD = 1900 # gyro set to 2000dps
\ No newline at end of file
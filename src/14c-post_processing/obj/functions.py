@@ -1,5 +1,7 @@
 from . import const
+from . import storage
 import numpy as np
+import os
 import scipy.ndimage
 
 def isFloat(value):
@@ -43,12 +45,21 @@ def raw_to_processed(fileName):
         str: name of equivalent processed data file.
     """
 
-    return fileName.replace(const.RAW_DATA_PREFIX, const.PROCESSED_DATA_PREFIX)
+    fileName = fileName.replace(const.RAW_DATA_PREFIX, const.PROCESSED_DATA_PREFIX)
+
+    # processed data files are the same whichever way the raw data is stored
+    if fileName.endswith(const.RAW_DATA_BINARY_FILE_TYPE):
+        fileName = fileName[:-len(const.RAW_DATA_BINARY_FILE_TYPE)] + \
+                        const.PROCESSED_DATA_FILE_TYPE
+    return fileName
 
 def processed_to_raw(fileName):
     """Takes a processed data file name (according to definition in 
     functions.py) and finds the name of the equivalent raw data file.
 
+    The raw data file is taken to be stored as CSV, unless it's only in the 
+    data directory as binary records.
+
     Args:
         fileName (str): name of processed data file.
 
@@ -56,7 +67,261 @@ def processed_to_raw(fileName):
         str: name of equivalent raw data file.
     """
     
-    return fileName.replace(const.PROCESSED_DATA_PREFIX, const.RAW_DATA_PREFIX)
+    fileName = fileName.replace(const.PROCESSED_DATA_PREFIX, const.RAW_DATA_PREFIX)
+
+    if fileName.endswith(const.RAW_DATA_FILE_TYPE):
+        binaryFileName = fileName[:-len(const.RAW_DATA_FILE_TYPE)] + \
+                            const.RAW_DATA_BINARY_FILE_TYPE
+        filePath = const.DATA_DIRECTORY + \
+                    parse_segment_file_name(fileName)[0].split("\\")[-1]
+        binaryFilePath = const.DATA_DIRECTORY + \
+                            parse_segment_file_name(binaryFileName)[0].split("\\")[-1]
+        if not storage.exists(filePath) and storage.exists(binaryFilePath):
+            return binaryFileName
+    return fileName
+
+def segment_file_name(fileName, start, end):
+    """Names a segment of a raw data file, made up of some of its lines. The 
+    segment has no file of its own - the name points to the lines of the raw 
+    data file.
+
+    Args:
+        fileName (str): name of raw data file.
+        start (int): index of the first line of the segment, from 0.
+        end (int): index of the line after the last line of the segment.
+
+    Returns:
+        str: name of the segment.
+    """
+
+    fileName, extension = os.path.splitext(fileName) # CSV or binary records
+    return "{}{}{}-{}{}".format(fileName, const.SEGMENT_SEPARATOR, start, end,
+                                    extension or const.RAW_DATA_FILE_TYPE)
+
+def parse_segment_file_name(fileName):
+    """Splits the name of a segment of a raw (or processed) data file into the 
+    name of the whole file and the lines of the segment.
+
+    Args:
+        fileName (str): name of a segment, or of a whole file.
+
+    Returns:
+        tuple: name of the whole file, index of the first line of the segment 
+            and index of the line after the last. The indices are None if the 
+            name is not the name of a segment.
+    """
+
+    if const.SEGMENT_SEPARATOR not in fileName:
+        return fileName, None, None
+
+    base, lines = fileName.rsplit(const.SEGMENT_SEPARATOR, 1)
+    extension = ""
+    if "." in lines:
+        lines, extension = lines.split(".", 1)
+        extension = "." + extension
+
+    try:
+        start, end = [int(line) for line in lines.split("-")]
+    except ValueError: # not a segment, just a name with the separator in it
+        return fileName, None, None
+
+    return base + extension, start, end
+
+def parse_device_id(fileName):
+    """Finds the ID of the device (ball) a raw (or processed) data file came 
+    from, if it was received from one of several at once.
+
+    Args:
+        fileName (str): name of the file, or of a segment of it.
+
+    Returns:
+        str: the device ID, or None if the name doesn't have one.
+    """
+
+    fileName = parse_segment_file_name(fileName)[0]
+    name = os.path.splitext(fileName)[0]
+    if const.DEVICE_SEPARATOR not in name:
+        return None
+    return name.rsplit(const.DEVICE_SEPARATOR, 1)[1]
+
+def read_last_line(filePath, blockSize=4096):
+    """Reads the last line of a text file without reading the rest of it.
+
+    Reads blocks backwards from the end of the file until the start of the 
+    last line has been found, so the time taken doesn't depend on the length 
+    of the file. Blank lines at the end of the file are ignored. A compressed 
+    file has to be decompressed first, though (see 'storage.open_file').
+
+    Args:
+        filePath (str): path to the file.
+        blockSize (int, optional): number of bytes read at a time. Defaults to 
+            4096.
+
+    Returns:
+        str: the last line, without the line break, or "" if the file is empty.
+    """
+
+    with storage.open_file(filePath, "rb") as f:
+        position = f.seek(0, 2) # end of file
+        tail = b""
+
+        while position > 0:
+            step = min(blockSize, position)
+            position -= step
+            f.seek(position)
+            tail = f.read(step) + tail
+
+            # stop once there is a line break before the last line
+            if tail.rstrip(b"\r\n").rfind(b"\n") != -1:
+                break
+
+    return tail.rstrip(b"\r\n").split(b"\n")[-1].rstrip(b"\r").decode()
+
+def processed_to_binary(fileName):
+    """Takes a processed data file name (according to definition in 
+    functions.py) and finds the name of the equivalent binary processed data 
+    file.
+
+    Args:
+        fileName (str): name of processed data file.
+
+    Returns:
+        str: name of equivalent binary processed data file.
+    """
+
+    if fileName.endswith(const.PROCESSED_DATA_FILE_TYPE):
+        fileName = fileName[:-len(const.PROCESSED_DATA_FILE_TYPE)]
+    return fileName + const.PROCESSED_DATA_BINARY_FILE_TYPE
+
+def find_sensors_initialised(data, initialised=None):
+    """Finds whether each of the three sensors had initialised at each line 
+    of raw data, and therefore if it is outputting values. A sensor has 
+    initialised once any of its readings on that line or any before it are 
+    non-zero.
+
+    Used on a whole raw data file by 'ProcessedData', and on each line as it's 
+    received by 'stream.StreamingThrow', so both give the same results.
+
+    Args:
+        data (np.ndarray): data read from the raw data file, with one row per 
+            line.
+        initialised (np.ndarray, optional): whether each sensor had 
+            initialised by the line before the first row. Defaults to None, 
+            for the start of a file.
+
+    Returns:
+        np.ndarray: whether each sensor had initialised, with one row per line.
+    """
+
+    readings = data[:, 1:].reshape(len(data), 3, 3)
+    sensorsInitialised = np.logical_or.accumulate(np.any(readings != 0, axis=2), axis=0)
+    if initialised is not None:
+        sensorsInitialised |= initialised
+
+    return sensorsInitialised
+
+def convert_units(data, sensorsInitialised):
+    """Converts lines of raw data to the units of the processed data file, 
+    which are more appropriate for the usage. Any offset from the sensors is 
+    removed, and sensors that haven't initialised are ignored.
+
+    Used on a whole raw data file by 'ProcessedData', and on each line as it's 
+    received by 'stream.StreamingThrow', so both give the same results.
+
+    Args:
+        data (np.ndarray): data read from the raw data file, with one row per 
+            line.
+        sensorsInitialised (np.ndarray): whether each of the three sensors had 
+            initialised at each line (see 'find_sensors_initialised').
+
+    Returns:
+        np.ndarray: the data in the units of the processed data file.
+    """
+
+    # subtract offsets, and ignore sensors that haven't initialised
+    newData = data - const.SENSOR_OFFSETS
+    for i in range(0, 3):
+        newData[~sensorsInitialised[:, i], 3*i+1:3*i+4] = 0
+
+    # change the units
+    newData[:, 0] /= 1000 # time changes from milliseconds to seconds
+    # linear acceleration stays in m/s^2
+    newData[:, 4:7] = np.deg2rad(newData[:, 4:7]) # angular velocity changes from deg/s to rad/s
+    newData[:, 7:] = np.deg2rad(newData[:, 7:]) % (2*np.pi) # euler angles change from degrees to radians
+
+    return newData
+
+def cumulative_simpson(data, times, initialValue=0.0):
+    """Calculates the integral of the data up to every sample, using Simpson's 
+    rule, in one vectorised pass.
+
+    Gives the same values as integrating the first 'i' samples with 
+    'scipy.integrate.simpson(..., even="last")' for every 'i'. That is, when 
+    there is an even number of intervals, Simpson's rule is used on each pair 
+    of intervals from the first sample. When there is an odd number, the 
+    trapezium rule is used on the first interval, and Simpson's rule on each 
+    pair after it. The area of each pair is calculated once, for both sets of 
+    pairs, and summed cumulatively. Samples do not need to be evenly spaced.
+
+    Args:
+        data (list[float]): data to be integrated.
+        times (list[float]): time of each sample of 'data'.
+        initialValue (float, optional): initial offset for integration. 
+            Defaults to 0.
+
+    Returns:
+        np.ndarray: integrated values, of the same dimension as the input data.
+    """
+
+    y = np.asarray(data, dtype=float)
+    h = np.diff(np.asarray(times, dtype=float))
+    n = len(y)
+
+    output = np.full(n, float(initialValue))
+    if n < 2:
+        return output
+
+    # area under each pair of intervals, for pairs starting at sample 0 and 1
+    areas = []
+    for start in range(0, 2):
+        pairs = (n-1-start) // 2
+        end = start + 2*pairs
+        h0 = h[start:end:2]
+        h1 = h[start+1:end:2]
+        hsum = h0 + h1
+        areas.append(hsum/6 * (y[start:end:2] * (2 - h1/h0)
+                                + y[start+1:end+1:2] * hsum*hsum/(h0*h1)
+                                + y[start+2:end+1:2] * (2 - h0/h1)))
+
+    # even number of intervals - Simpson's rule from the first sample
+    output[2::2] += np.cumsum(areas[0])
+    # odd number of intervals - trapezium rule on the first interval
+    output[1::2] += h[0] * (y[0]+y[1]) / 2
+    output[3::2] += np.cumsum(areas[1])
+
+    return output
+
+def cumulative_trapezoid(data, times, initialValue=0.0):
+    """Calculates the integral of the data up to every sample, using the 
+    trapezium rule, in one vectorised pass.
+
+    Args:
+        data (list[float]): data to be integrated.
+        times (list[float]): time of each sample of 'data'.
+        initialValue (float, optional): initial offset for integration. 
+            Defaults to 0.
+
+    Returns:
+        np.ndarray: integrated values, of the same dimension as the input data.
+    """
+
+    y = np.asarray(data, dtype=float)
+    h = np.diff(np.asarray(times, dtype=float))
+
+    output = np.full(len(y), float(initialValue))
+    output[1:] += np.cumsum(h * (y[1:]+y[:-1]) / 2)
+
+    return output
 
 def moving_average(data, window_size):
     """Calculates a moving average using the given parameters.
@@ -75,16 +340,47 @@ def moving_average(data, window_size):
     smoothed = np.convolve(data, np.ones(window_size), 'valid') / window_size
     return list(smoothed)
 
-def gaussian_smooth(data, sigma):
+def padded_moving_average(data, window_size):
+    """Calculates a moving average of each column of a 2D array, in one pass.
+
+    Each value is the mean of itself and the previous 'window_size'-1 values, 
+    calculated from a running total. The first 'window_size'-1 rows, where the 
+    window isn't full, are zero, so the output has the same dimension as the 
+    input.
+
+    Args:
+        data (np.ndarray): the data to be smoothed, with one column per signal.
+        window_size (int): how many terms to include in the moving average.
+
+    Returns:
+        np.ndarray: smoothed data of same dimension as input.
+    """
+
+    data = np.asarray(data, dtype=float)
+
+    # running total, starting from zero
+    totals = np.cumsum(data, axis=0)
+    totals = np.concatenate([np.zeros((1,) + data.shape[1:]), totals])
+
+    smoothed = np.zeros_like(data)
+    smoothed[window_size-1:] = (totals[window_size:] - totals[:-window_size]) / window_size
+    return smoothed
+
+def gaussian_smooth(data, sigma, axis=None):
     """Smoothes the signal by convolving with a Gaussian.
 
     Args:
         data (list[float]): signal to be smoothed
         sigma (float): standard deviation of gaussian kernel
+        axis (int, optional): axis to smooth along, so that each column of a 
+            2D array is smoothed separately. Defaults to None, which smooths 
+            along every axis.
 
     Returns:
         list[float]: smoothed signal of same dimension as input
     """
+    if axis != None:
+        return scipy.ndimage.gaussian_filter1d(input=data, sigma=sigma, axis=axis)
     return scipy.ndimage.gaussian_filter(input=data, sigma=sigma)
 
 def generate_dcm(yaw, pitch, roll):
@@ -122,3 +418,57 @@ def generate_dcm(yaw, pitch, roll):
     dcm[2,2] = cos_p*cos_r
 
     return dcm
+
+def generate_dcm_stack(yaw, pitch, roll):
+    """Generates a direction cosine matrix for every set of Euler angles 
+    provided as parameters, in one vectorised pass.
+
+    Element by element, each matrix is the same as the one produced by 
+    'generate_dcm' for the same angles.
+
+    Args:
+        yaw (list[float]): yaw angle of each Euler set.
+        pitch (list[float]): pitch angle of each Euler set.
+        roll (list[float]): roll angle of each Euler set.
+
+    Returns:
+        np.ndarray: stack of direction cosine matrices, of shape (N, 3, 3).
+    """
+
+    sin_y = np.sin(yaw)
+    cos_y = np.cos(yaw)
+    sin_p = np.sin(pitch)
+    cos_p = np.cos(pitch)
+    sin_r = np.sin(roll)
+    cos_r = np.cos(roll)
+
+    dcm = np.zeros((len(sin_y), 3, 3))
+    dcm[:,0,0] = cos_y*cos_p
+    dcm[:,0,1] = cos_y*sin_p*sin_r - sin_y*cos_r
+    dcm[:,0,2] = cos_y*sin_p*cos_r + sin_y*sin_r
+    dcm[:,1,0] = sin_y*cos_p
+    dcm[:,1,1] = sin_y*sin_p*sin_r + cos_y*cos_r
+    dcm[:,1,2] = sin_y*sin_p*cos_r - cos_y*sin_r
+    dcm[:,2,0] = -sin_p
+    dcm[:,2,1] = cos_p*sin_r
+    dcm[:,2,2] = cos_p*cos_r
+
+    return dcm
+
+def rotate_vectors(vectors, dcm):
+    """Rotates every vector by its corresponding direction cosine matrix, in 
+    one call.
+
+    Each row vector is multiplied by its matrix (i.e. 'vector.dot(dcm)'), as 
+    is done for a single vector.
+
+    Args:
+        vectors (np.ndarray): vectors to rotate, of shape (N, 3).
+        dcm (np.ndarray): stack of direction cosine matrices, of shape 
+            (N, 3, 3).
+
+    Returns:
+        np.ndarray: rotated vectors, of shape (N, 3).
+    """
+
+    return np.einsum("ni,nij->nj", vectors, dcm)
@@ -1,7 +1,13 @@
 from . import const
+from . import functions
 from . import processed_data
 from . import raw_data
+from . import storage
+import concurrent.futures
 import csv
+import os
+import shutil
+import sqlite3
 import sys
 
 class GlobalFile:
@@ -13,6 +19,7 @@ class GlobalFile:
         __TRACKER_COUNT_ROWS (int): the number of rows in the tracker file.
         __TRACKER_COUNT_COLUMNS (int): the number of columns in the tracker 
             file.
+        workers (int): number of processes used to calculate metrics.
 
     Methods:
         __init__ : class constructor.
@@ -26,13 +33,20 @@ class GlobalFile:
         set_TRACKER_COUNT_ROWS : setter for attribute of the same name.
         set_TRACKER_COUNT_COLUMNS : setter for attribute of the same name.
         add_file : lists a raw data file in the global tracker.
+        add_files : lists several raw data files in the global tracker at once.
         add_metric : adds a new column to the global tracker file.
+        add_metrics : adds/ updates several metric columns in the global tracker 
+            file at once.
+        export_csv : writes a copy of the tracker file.
         get_column_number : returns the column number of a given heading.
+        get_file_names : returns the names of every file in the tracker.
         populate_metric : populates/ updates an existing column in the global 
             tracker file.
         remove_deleted : removes a file from the tracker if the file has been 
             deleted.
+        remove_files : removes several files from the tracker file.
         remove_metric : removes a column from the tracker file.
+        rename_files : renames several files in the tracker file.
         change_health_status : change the health status of an entry already 
             logged.
         get_health_status : checks if a file is marked as healthy in the global 
@@ -41,6 +55,8 @@ class GlobalFile:
             tracker already.
         write_to_file : overwrites a metric for an entry already listed in the 
             file.
+        write_many_to_file : overwrites several cells of the tracker file at 
+            once.
         __check_tracker_full : sets up the tracker fully - required for in-depth 
             processing.
         __check_tracker_partial : partially sets uo the tracker - less 
@@ -48,8 +64,11 @@ class GlobalFile:
         __add_row : adds a row to the bottom of the tracker.
     """
 
+    # state of the data directory and tracker the last time 'remove_deleted' 
+    # found nothing to remove - shared by every object in the process
+    __deletedCheckState = None
 
-    def __init__(self, fullInitialisation = True):
+    def __init__(self, fullInitialisation = True, workers=1):
         """Constructor for class. Sets the class parameters.
 
         Initialisation of class can be full, or partial. When in doubt, use 
@@ -59,12 +78,15 @@ class GlobalFile:
         Args:
             fullInitialisation (bool, optional): controls whether initialisation 
                 is full or partial. Defaults to True.
+            workers (int, optional): number of processes used to calculate 
+                metrics. Defaults to 1.
         """
 
         # define class attributes
         self.__TRACKER_EXISTS = False
         self.__TRACKER_COUNT_ROWS = 0
         self.__TRACKER_COUNT_COLUMNS = 0
+        self.workers = workers
 
         if fullInitialisation:
             self.__check_tracker_full()
@@ -169,15 +191,39 @@ class GlobalFile:
             return True
         return False
 
+    def add_files(self, healthStatuses):
+        """Adds several files with their health statuses to the tracker file at 
+        once.
+
+        Files that haven't been recorded yet get added to the bottom of the 
+        tracker, and then the health status of every file is written in one go.
+
+        Args:
+            healthStatuses (dict[str, int]): health status of each file, keyed 
+                by the name of the file.
+
+        Returns:
+            int: number of files added to the tracker.
+        """
+
+        newRows = []
+        for fileName in healthStatuses.keys():
+            if not self.is_file_recorded(fileName):
+                dataToWrite = [""] * self.TRACKER_COUNT_COLUMNS # one item for each column in file
+                dataToWrite[0] = fileName # first element of list is first column of file
+                newRows.append(dataToWrite)
+
+        _trackerCache.append_rows(newRows)
+        self.set_TRACKER_COUNT_ROWS(self.TRACKER_COUNT_ROWS + len(newRows))
+
+        self.write_many_to_file([(fileName, 1, healthStatus)
+                                    for fileName, healthStatus in healthStatuses.items()])
+        return len(newRows)
+
     def add_metric(self, operation):
         """Adds a column to the global tracker file and populates it with values 
         returned from the 'operation' method.
 
-        Iterates through each line and saves the data in a list. For the header, 
-        the name of the new heading gets appended, and for every other row, the 
-        value of the metric gets appended. Then the data get written back to the 
-        tracker file.
-
         Args:
             operation (method (str)): the method that calculates the metric for 
                 the entry.
@@ -186,44 +232,84 @@ class GlobalFile:
             int: 1 to signify completion of method.
         """
 
-        with open(const.TRACKER_FILEPATH) as f: # read only
-            tracker_file = csv.reader(f)
+        return self.add_metrics([operation])
 
-            # if heading not in top row, add heading
-            if operation(heading=True) not in f.read():
-                f.seek(0)
+    def add_metrics(self, operations):
+        """Adds columns to the global tracker file for several metrics, and 
+        populates them with the values returned from the 'operations' methods.
+
+        The tracker file is read once, and any headings that are missing are 
+        added to the data in memory. Every metric is then calculated for each 
+        file in a single pass over the files, and all the values are written 
+        back to the tracker file in one go. Columns that already exist are 
+        updated rather than added again. The files are shared out between 
+        'workers' processes if there is more than one.
 
-                # for tracking during loop
-                fileData = []
+        Args:
+            operations (list[method (str)]): the methods that calculate the 
+                metrics for each entry.
+
+        Returns:
+            int: 1 to signify completion of method.
+        """
+
+        self.remove_deleted()
+
+        fileData = _trackerCache.copy_rows()
+        headers = fileData[0]
+
+        # find the column of each metric, adding a heading if there isn't one
+        columnNumbers = []
+        for operation in operations:
+            columnHeading = operation(heading=True)
+            if columnHeading not in headers:
+                headers.append(columnHeading)
+            columnNumbers.append(headers.index(columnHeading))
+
+        values = _calculate_metrics_for_files([row[0] for row in fileData[1:]],
+                                                operations, self.workers)
+
+        for row in fileData[1:]:
+            # add another empty column for each new heading
+            row.extend([""] * (len(headers) - len(row)))
+
+            for columnNumber, value in zip(columnNumbers, values[row[0]]):
+                if value != None:
+                    row[columnNumber] = value
+
+        _trackerCache.write_rows(fileData)
+        self.set_TRACKER_COUNT_COLUMNS(len(headers))
+
+        return 1
 
-                # store first line of file in list - remove line break and split into a list
-                fileData.append(f.readline()[:-1].split(","))
-                fileData[0].append(operation(heading=True))
+    def export_csv(self, filePath=None):
+        """Writes a copy of the tracker file, so that it can be used in the same 
+        way as 'GlobalDatabase.export_csv'.
 
-                for row in tracker_file:
+        Any changes in the journal are merged into the tracker file first.
 
-                    # ignore blank rows
-                    if len(row) < const.TRACKER_BARE_MINIMUM_LENGTH:
-                        continue
+        Args:
+            filePath (str, optional): path of the CSV file to write. Defaults 
+                to None, in which case only the journal is merged.
 
-                    # add another empty column
-                    fileData.append(list(row))
-                    fileData[-1].append("")
+        Returns:
+            str: path of the CSV file.
+        """
 
-                with open(const.TRACKER_FILEPATH, "w", newline="") as f: # writeable
-                    tracker_file = csv.writer(f)
-                    tracker_file.writerows(fileData) # write amended data to tracker file
+        _trackerCache.compact()
 
-                self.set_TRACKER_COUNT_COLUMNS(self.TRACKER_COUNT_COLUMNS + 1)
+        if filePath == None or os.path.abspath(filePath) == \
+                os.path.abspath(const.TRACKER_FILEPATH):
+            return const.TRACKER_FILEPATH
 
-        return self.populate_metric(operation)
+        shutil.copyfile(const.TRACKER_FILEPATH, filePath)
+        return filePath
 
     def get_column_number(self, columnHeading):
         """Returns the column number associated with a given heading.
 
-        Opens the tracker file, and iterates through the first row to find a 
-        match. If found, the index of the column is returned. Else, a 
-        ValueError is raised.
+        Searches the header of the tracker file for a match. If found, the 
+        index of the column is returned. Else, a ValueError is raised.
 
         Args:
             columnHeading (str): name of column to be found.
@@ -235,26 +321,28 @@ class GlobalFile:
             int: index of column.
         """
 
-        with open(const.TRACKER_FILEPATH) as f:
-            tracker_file = csv.reader(f)
+        try:
+            return _trackerCache.rows[0].index(columnHeading)
+        except ValueError:
+            raise ValueError("Column heading not found")
+
+    def get_file_names(self):
+        """Returns the names of every file listed in the tracker file, in 
+        order.
+
+        Returns:
+            list[str]: names of the files.
+        """
 
-            # find column number
-            columnNumber = 0
-            for row in tracker_file:
-                for heading in row:
-                    if heading == columnHeading:
-                        return columnNumber # stop when heading is found
-                    else:
-                        columnNumber += 1
-                raise ValueError("Column heading not found")
+        return [row[0] for row in _trackerCache.rows[1:]]
 
     def populate_metric(self, operation):
         """Populates/updates an existing metric column in the global tracker 
         file with values returned from the 'operation' method.
 
-        First determines which column needs to be updated by reading the header. 
-        Then iterates through each line and overwrites the data in the relevant 
-        column.
+        First checks that the column exists by reading the header. Then the 
+        metric is calculated for every file, and all the values are written to 
+        the tracker file in one go.
 
         Args:
             operation (method (str)): the method that calculates the metric for 
@@ -264,91 +352,90 @@ class GlobalFile:
             int: 1 to signify completion of method, 0 otherwise.
         """
 
-        self.remove_deleted()
-
-        with open(const.TRACKER_FILEPATH) as f: # read only
-            tracker_file = csv.reader(f)
-
-            columnHeading = operation(heading=True)
-            
-            # get column number of given header
-            try:
-                columnNumber = self.get_column_number(columnHeading)
-            except ValueError as e: # if column not found
-                print(e)
-                return 0
-
-            next(f)
-
-            for row in tracker_file:
-
-                # ignore blank rows
-                if len(row) < const.TRACKER_BARE_MINIMUM_LENGTH:
-                    continue
-
-                self.write_to_file(row[0], columnNumber, operation(row[0]))
+        # check column exists
+        try:
+            self.get_column_number(operation(heading=True))
+        except ValueError as e: # if column not found
+            print(e)
+            return 0
 
-        return 1
+        return self.add_metrics([operation])
 
     def remove_deleted(self):
         """Removes any files from the tracker file if they have been deleted 
         from the data directory.
 
-        Iterates through the tracker file, and for each file recorded in the 
-        global tracker, attempts to find it within the data directory. If 
-        successful, the row in the tracker file gets appended to a list. At the 
-        end, the list gets written back to the file.
+        Lists the data directory once, and any file recorded in the global 
+        tracker that isn't in the listing has been deleted. The rows of those 
+        files are removed from the tracker file in one write, and their 
+        processed data files are deleted together.
+
+        Nothing has been deleted if no files have been added to or removed from 
+        the data directory or the tracker since the last time this was run, so 
+        in that case the directory isn't listed at all.
 
         Returns:
             bool: signifies completion of method.
         """
 
-        with open(const.TRACKER_FILEPATH) as f: # read only
-            tracker_file = csv.reader(f)
+        state = (const.DATA_DIRECTORY, os.stat(const.DATA_DIRECTORY).st_mtime_ns,
+                    _trackerCache.version)
+        if state == GlobalFile.__deletedCheckState:
+            return True
+
+        entries = _list_data_directory()
+        rows = _trackerCache.rows
+
+        # files in the tracker but not the data directory - segments of a raw 
+        # data file are deleted with the file
+        deleted = [row[0] for row in rows[1:]
+                    if functions.parse_segment_file_name(row[0])[0] \
+                        [const.LENGTH_OF_DATA_DIR:] not in entries]
 
-            # for tracking during loop
-            fileData = []
-            deletedRaw = 0
-            deletedProcessed = 0
-
-            for row in tracker_file:
-                # skip blank lines
-                if len(row) < const.TRACKER_BARE_MINIMUM_LENGTH:
-                        continue
-
-                if tracker_file.line_num > 1: # don't try to locate header
-
-                    # get file name from row
-                    fileName = row[0]
-                    filePath = const.DATA_DIRECTORY + fileName[const.LENGTH_OF_DATA_DIR:]
-
-                    # try to open file
-                    try:
-                        g = open(filePath)
-                    except FileNotFoundError:
-                        print("Deleted: ", fileName)
-                        deletedRaw += 1
-                        I = processed_data.ProcessedData().individual
-                        # delete processed data file if it exists and tally
-                        deletedProcessed += I.delete_file(filePath)
-                    else:
-                        g.close()
-                        fileData.append(list(row)) # if found, add it to list
-                else:
-                    fileData.append(list(row)) # add header to list
-
-        if deletedRaw > 0:
-            with open(const.TRACKER_FILEPATH, "w", newline="") as f: # writeable
-                tracker_file = csv.writer(f)
-                tracker_file.writerows(fileData) # rewrite data to tracker file
+        if len(deleted) > 0:
+            for fileName in deleted:
+                print("Deleted: ", fileName)
+
+            deletedSet = set(deleted)
+            fileData = [list(row) for row in rows if row[0] not in deletedSet]
+            _trackerCache.write_rows(fileData) # rewrite data to tracker file
             
-            self.set_TRACKER_COUNT_ROWS(self.TRACKER_COUNT_ROWS-deletedRaw)
+            self.set_TRACKER_COUNT_ROWS(self.TRACKER_COUNT_ROWS-len(deleted))
+
+            # delete processed data files if they exist and tally
+            deletedProcessed = processed_data.ProcessedData() \
+                                    .delete_processed_data_files(deleted, entries)
 
             print("Deleted {} raw data files and {} processed data files"
-                .format(deletedRaw, deletedProcessed))
+                .format(len(deleted), deletedProcessed))
+        else:
+            # only skip next time if the tracker hasn't been changed here
+            GlobalFile.__deletedCheckState = state
 
         return True
 
+    def remove_files(self, fileNames):
+        """Removes several files from the tracker file, in one write. Their 
+        processed data files are left alone.
+
+        Args:
+            fileNames (list[str]): names of the files to remove.
+
+        Returns:
+            int: number of files removed.
+        """
+
+        fileNames = set(fileNames)
+        rows = _trackerCache.rows
+        fileData = [list(row) for row in rows if row[0] not in fileNames]
+
+        removed = len(rows) - len(fileData)
+        if removed > 0:
+            _trackerCache.write_rows(fileData)
+            self.set_TRACKER_COUNT_ROWS(self.TRACKER_COUNT_ROWS-removed)
+
+        return removed
+
     def remove_metric(self, columnHeading):
         """Removes a column from the tracker file.
 
@@ -370,26 +457,11 @@ class GlobalFile:
             print(e)
             return False
 
-        with open(const.TRACKER_FILEPATH) as f: # read only
-            tracker_file = csv.reader(f)
-
-            # for tracking during loop
-            fileData = []
-
-            for row in tracker_file:
-                # skip blank lines
-                if len(row) < const.TRACKER_BARE_MINIMUM_LENGTH:
-                        continue
+        fileData = _trackerCache.copy_rows()
+        for rowData in fileData:
+            del rowData[columnNumber]
 
-                rowData = list(row)
-                del rowData[columnNumber]
-                
-                fileData.append(rowData)
-
-
-        with open(const.TRACKER_FILEPATH, "w", newline="") as f: # writeable
-            tracker_file = csv.writer(f)
-            tracker_file.writerows(fileData) # rewrite data to tracker file
+        _trackerCache.write_rows(fileData) # rewrite data to tracker file
         
         self.set_TRACKER_COUNT_COLUMNS(self.TRACKER_COUNT_COLUMNS-1)
 
@@ -397,6 +469,30 @@ class GlobalFile:
 
         return True
 
+    def rename_files(self, fileNames):
+        """Renames several files in the tracker file, in one write, keeping 
+        the rest of their entries.
+
+        Args:
+            fileNames (dict[str, str]): new name of each file, keyed by its 
+                current name.
+
+        Returns:
+            int: number of files renamed.
+        """
+
+        fileData = _trackerCache.copy_rows()
+        renamed = 0
+        for rowData in fileData[1:]:
+            if rowData[0] in fileNames:
+                rowData[0] = fileNames[rowData[0]]
+                renamed += 1
+
+        if renamed > 0:
+            _trackerCache.write_rows(fileData)
+
+        return renamed
+
     def change_health_status(self, fileName, healthStatus):
         """Changes the health status of a given file in the tracker.
 
@@ -423,23 +519,18 @@ class GlobalFile:
             int: value of health status, or -1 if file not found.
         """
     
-        with open(const.TRACKER_FILEPATH) as f: 
-            tracker_file = csv.reader(f)
+        row = _trackerCache.get_row(fileName)
             
-            # check each line of tracker file to find file - stops when the file has been found
-            for row in tracker_file:
-                if row[0] == fileName:
-                    return int(row[1]) # get the health status of the file
-                    
+        if row == None:
             print("File '{}' not found in tracker".format(fileName))
             return -1
+        return int(row[1]) # get the health status of the file
     
     def is_file_recorded(self, fileName):
         """Checks if a given file is recorded in the tracker file.
 
-        Iterates through each row of the file and checks if any pf the file 
-        names passed to this method matches any of the ones passed to this 
-        method.
+        Looks the file name up in the index of the rows of the tracker file, 
+        which is kept in memory.
 
         Args:
             fileName (str): name of file to find in tracker file.
@@ -448,13 +539,7 @@ class GlobalFile:
             bool: 'True' if the file is listed, 'False' otherwise.
         """
         
-        with open(const.TRACKER_FILEPATH) as f:
-            tracker_file = csv.reader(f)
-            
-            for row in tracker_file:
-                if row[0] == fileName:
-                    return True # stop looking when you find the correct file
-            return False
+        return _trackerCache.get_row(fileName) != None
 
     def write_to_file(self, fileName, columnNumber, data):
         """Overwrites a given cell in the tracker file with data passed to the 
@@ -476,29 +561,37 @@ class GlobalFile:
         if data == None:
             return
 
-        with open(const.TRACKER_FILEPATH, "r") as f: # read only
-            tracker_file = csv.reader(f)
+        return self.write_many_to_file([(fileName, columnNumber, data)])
 
-            # for tracking during loop
-            rowNumber = 0
-            fileData = []
-            
-            for row in tracker_file:
-                # ignore blank rows
-                if len(row) < const.TRACKER_BARE_MINIMUM_LENGTH:
-                    continue
+    def write_many_to_file(self, updates):
+        """Overwrites several cells in the tracker file at once.
+
+        Rather than rewriting the tracker file, the changes are appended to the 
+        tracker's journal, which is replayed onto the tracker file whenever it 
+        is read. Once the journal gets large enough, it is merged back into the 
+        tracker file.
+
+        Args:
+            updates (list[tuple]): changes to make, each as (file name, column 
+                number, data). Changes where the data is None are ignored.
+
+        Returns:
+            bool: signifies complete execution of method.
+        """
 
-                fileData.append(list(row))
+        headers = _trackerCache.rows[0]
+        records = [] # changes to append to the journal
                 
-                # count non-blank rows until match is found
-                if fileData[rowNumber][0] != fileName:
-                    rowNumber += 1
+        for fileName, columnNumber, data in updates:
+            if data == None:
+                continue
+            if not self.is_file_recorded(fileName):
+                print("File '{}' not found in tracker".format(fileName))
+                continue
+            records.append((fileName, headers[columnNumber], data))
 
-            fileData[rowNumber][columnNumber] = data
+        _trackerCache.append_to_journal(records)
 
-        with open(const.TRACKER_FILEPATH, "w", newline="") as f: # writeable
-            tracker_file = csv.writer(f)
-            tracker_file.writerows(fileData) # write amended data to tracker file
         return True
 
 
@@ -518,9 +611,7 @@ class GlobalFile:
         dataToWrite = [""] * self.TRACKER_COUNT_COLUMNS # one item for each column in file
         dataToWrite[0] = fileName # first element of list is first column of file
         # append data to file
-        with open(const.TRACKER_FILEPATH, "a") as f:
-            f.write("\n")
-            f.write(", ".join(dataToWrite))
+        _trackerCache.append_rows([dataToWrite])
 
         self.set_TRACKER_COUNT_ROWS(self.TRACKER_COUNT_ROWS + 1)
 
@@ -531,56 +622,23 @@ class GlobalFile:
         it has the correct header. Measures properties of tracker.
 
         Only use this method if significant processing will be done on the 
-        tracker file. Otherwise, it is a waste of resources, and so the short 
-        version is more appropriate.
+        tracker file. Otherwise, the short version is more appropriate.
         
-        First, tries to open the tracker file. If unsuccessful, it kills the 
-        script. If successful, it counts the number of rows and columns. If the 
-        file is empty, it adds a header row. If the file is not empty, it checks 
-        that the header row includes the right headings.
+        First, sets up the tracker as in the short version, which kills the 
+        script if the file can't be opened. Then it counts the number of rows, 
+        and checks that the header row includes the right headings.
         """
 
-        try:
-            f = open(const.TRACKER_FILEPATH)
-        except FileNotFoundError as e:
-            print("\n\nFatal (global tracker file does not exist):", e)
-            print("Code exited with status 1")
-            sys.exit(1)
-        else:
-            # print("Found global tracker file", const.TRACKER_FILENAME)
-            self.set_TRACKER_EXISTS(True)
+        self.__check_tracker_partial()
             
-            tracker_file = csv.reader(f)
-
-            # count the number of rows in the tracker file
-            self.set_TRACKER_COUNT_ROWS(sum(1 for row in tracker_file))
-
-            # if no data in file, add the bare minimum header row
-            if self.TRACKER_COUNT_ROWS == 0:
-                print("Global tracker file has no header row.")
-                
-                f.close()
-                
-                f = open(const.TRACKER_FILEPATH, "w")
-                f.write(const.TRACKER_BARE_MINIMUM)
-                f.close()
-                
-                print("Header row added.")
-                f = open(const.TRACKER_FILEPATH)
-                tracker_file = csv.reader(f)
-
-            f.seek(0) # return to start of file
+        rows = _trackerCache.rows
 
-            # output warning if bare minimum header is not in the first line of the file
-            if const.TRACKER_BARE_MINIMUM not in f.read():
-                print("Warning: global tracker file does not have correct header.")
+        # count the number of rows in the tracker file
+        self.set_TRACKER_COUNT_ROWS(len(rows))
 
-            f.seek(0)
-
-            # count the number of columns in the tracker file
-            self.set_TRACKER_COUNT_COLUMNS(len(next(tracker_file)))
-                
-            f.close()
+        # output warning if bare minimum header is not in the first line of the file
+        if const.TRACKER_BARE_MINIMUM not in ",".join(rows[0]):
+            print("Warning: global tracker file does not have correct header.")
 
     def __check_tracker_partial(self):
         """Checks that the global tracker file can be found and opened, and that 
@@ -590,42 +648,1068 @@ class GlobalFile:
         tracker file. Otherwise, it does not set up the file properly, and so 
         the long version is more appropriate.
         
-        First, tries to open the tracker file. If unsuccessful, it kills the 
+        First, tries to read the tracker file. If unsuccessful, it kills the 
         script. If successful, if the file is empty, it adds a header row. Then 
         counts the columns of the file.
         """
 
         try:
-            f = open(const.TRACKER_FILEPATH)
+            rows = _trackerCache.rows
         except FileNotFoundError as e:
             print("\n\nFatal (global tracker file does not exist):", e)
             print("Code exited with status 1")
             sys.exit(1)
-        else:
-            # print("Found global tracker file", const.TRACKER_FILENAME)
-            self.set_TRACKER_EXISTS(True)
             
-            tracker_file = csv.reader(f)
-
-            # if no data in file, add the bare minimum header row
-            try:
-                next(tracker_file)
-            except:
-                print("Global tracker file has no header row.")
-                
-                f.close()
-                
-                f = open(const.TRACKER_FILEPATH, "w")
-                f.write(const.TRACKER_BARE_MINIMUM)
-                f.close()
+        # print("Found global tracker file", const.TRACKER_FILENAME)
+        self.set_TRACKER_EXISTS(True)
+
+        # if no data in file, add the bare minimum header row
+        if len(rows) == 0:
+            print("Global tracker file has no header row.")
+            _trackerCache.write_rows([const.TRACKER_BARE_MINIMUM.split(",")])
+            print("Header row added.")
+            rows = _trackerCache.rows
                 
-                print("Header row added.")
-                f = open(const.TRACKER_FILEPATH)
-                tracker_file = csv.reader(f)
-                 
-            f.seek(0)
-            
-            # count the number of columns in the tracker file
-            self.set_TRACKER_COUNT_COLUMNS(len(next(tracker_file)))
+        # count the number of columns in the tracker file
+        self.set_TRACKER_COUNT_COLUMNS(len(rows[0]))
+
+
+class GlobalDatabase:
+    """Global tracker stored in an SQLite database rather than a CSV file.
+
+    Has the same public methods as 'GlobalFile', so either can be used. Each 
+    row of the 'tracker' table is one row of the tracker, and the table is 
+    indexed on the file name, so looking up or changing the entry for one file 
+    doesn't require reading or writing every other entry. The CSV file can 
+    still be used to import data into the database, or to export it.
+
+    Attributes:
+        __TRACKER_EXISTS (bool): 'True' if the database has been found and 
+            opened since the object was constructed.
+        __connection (sqlite3.Connection): connection to the database.
+        workers (int): number of processes used to calculate metrics.
+
+    Methods:
+        __init__ : class constructor.
+        __del__ : class destructor.
+        TRACKER_EXISTS (property) : getter for the attribute of the same name.
+        TRACKER_COUNT_ROWS (property) : getter for the number of rows in the 
+            tracker, including the header.
+        TRACKER_COUNT_COLUMNS (property) : getter for the number of columns in 
+            the tracker.
+        add_file : lists a raw data file in the global tracker.
+        add_files : lists several raw data files in the global tracker at once.
+        add_metric : adds a new column to the global tracker.
+        add_metrics : adds/ updates several metric columns in the global tracker 
+            at once.
+        export_csv : writes the contents of the tracker to a CSV file.
+        get_column_number : returns the column number of a given heading.
+        get_file_names : returns the names of every file in the tracker.
+        import_csv : replaces the contents of the tracker with a CSV file.
+        populate_metric : populates/ updates an existing column in the global 
+            tracker.
+        remove_deleted : removes a file from the tracker if the file has been 
+            deleted.
+        remove_files : removes several files from the tracker.
+        remove_metric : removes a column from the tracker.
+        rename_files : renames several files in the tracker.
+        change_health_status : change the health status of an entry already 
+            logged.
+        get_health_status : checks if a file is marked as healthy in the global 
+            tracker.
+        is_file_recorded : checks if a given file has been recorded in the 
+            tracker already.
+        write_to_file : overwrites a metric for an entry already listed in the 
+            tracker.
+        write_many_to_file : overwrites several cells of the tracker at once.
+        __get_headers : returns the column headers of the tracker.
+    """
+
+    # state of the data directory and database the last time 'remove_deleted' 
+    # found nothing to remove - shared by every object in the process
+    __deletedCheckState = None
+
+    def __init__(self, fullInitialisation = True, workers=1):
+        """Constructor for class. Opens the database, creating it if it doesn't 
+        exist yet.
+
+        If the database has to be created and the CSV tracker file exists, its 
+        contents are imported into the new database.
+
+        Args:
+            fullInitialisation (bool, optional): not used, only accepted so the 
+                class can be used in place of 'GlobalFile'. Defaults to True.
+            workers (int, optional): number of processes used to calculate 
+                metrics. Defaults to 1.
+        """
+
+        self.__TRACKER_EXISTS = False
+        self.workers = workers
+
+        newDatabase = not os.path.exists(const.TRACKER_DATABASE_FILEPATH)
+
+        try:
+            self.__connection = sqlite3.connect(const.TRACKER_DATABASE_FILEPATH)
+        except sqlite3.Error as e:
+            print("\n\nFatal (global tracker database could not be opened):", e)
+            print("Code exited with status 1")
+            sys.exit(1)
+
+        self.__TRACKER_EXISTS = True
+
+        # name is the primary key, so the table is indexed on it
+        headers = const.TRACKER_BARE_MINIMUM.split(",")
+        with self.__connection:
+            self.__connection.execute(
+                'CREATE TABLE IF NOT EXISTS tracker ("{}" TEXT PRIMARY KEY, {})'
+                .format(headers[0], ", ".join('"{}" DEFAULT \'\''.format(heading)
+                                                for heading in headers[1:])))
+
+        if newDatabase and os.path.exists(const.TRACKER_FILEPATH):
+            print("Importing global tracker file into database")
+            self.import_csv()
+
+    def __del__(self):
+        """Destructor for class. Closes the connection to the database.
+        """
+
+        try:
+            self.__connection.close()
+        except AttributeError: # connection was never opened
+            pass
+
+    @property
+    def TRACKER_EXISTS(self):
+        """Getter for attribute of the same name. Checks if tracker exists.
+
+        Returns:
+            bool: 'True' if tracker database has been open since the 
+                initialisation of this object.
+        """
+
+        return self.__TRACKER_EXISTS
+
+    @property
+    def TRACKER_COUNT_ROWS(self):
+        """Getter for the number of rows in the tracker, counting the header 
+        like 'GlobalFile' does.
+
+        Returns:
+            int: the number of rows in the global tracker.
+        """
+
+        count = self.__connection.execute("SELECT COUNT(*) FROM tracker").fetchone()[0]
+        return count + 1
+
+    @property
+    def TRACKER_COUNT_COLUMNS(self):
+        """Getter for the number of columns in the tracker.
+
+        Returns:
+            int: the number of columns in the global tracker.
+        """
+
+        return len(self.__get_headers())
+
+
+    def add_file(self, fileName, healthStatus=const.untested):
+        """Adds a given file with an health status to the tracker.
+
+        Checks if the file has already been recorded. If not then the file gets 
+        added. If it has already been recorded, the entry is updated.
+
+        Args:
+            fileName (str): name of file to be added to the tracker.
+            healthStatus (int, optional): health status associated with the 
+                file. Defaults to const.untested.
+
+        Returns:
+            bool: 'True' if file has been added successfully. 'False' otherwise.
+        """
+
+        if self.is_file_recorded(fileName):
+            print("File has already been recorded, repeated entry not added: ",
+                    fileName)
+            self.change_health_status(fileName, healthStatus)
+            return False
+
+        with self.__connection:
+            self.__connection.execute(
+                'INSERT INTO tracker (name, "health status") VALUES (?, ?)',
+                (fileName, str(healthStatus)))
+        return True
+
+    def add_files(self, healthStatuses):
+        """Adds several files with their health statuses to the tracker at once.
+
+        Files that haven't been recorded yet get added, and the health status 
+        of every file is written, in a single transaction.
+
+        Args:
+            healthStatuses (dict[str, int]): health status of each file, keyed 
+                by the name of the file.
+
+        Returns:
+            int: number of files added to the tracker.
+        """
+
+        before = self.TRACKER_COUNT_ROWS
+
+        with self.__connection:
+            self.__connection.executemany(
+                'INSERT OR IGNORE INTO tracker (name) VALUES (?)',
+                [(fileName,) for fileName in healthStatuses.keys()])
+            self.__connection.executemany(
+                'UPDATE tracker SET "health status" = ? WHERE name = ?',
+                [(str(healthStatus), fileName)
+                    for fileName, healthStatus in healthStatuses.items()])
+
+        return self.TRACKER_COUNT_ROWS - before
+
+    def add_metric(self, operation):
+        """Adds a column to the global tracker and populates it with values 
+        returned from the 'operation' method.
+
+        Args:
+            operation (method (str)): the method that calculates the metric for 
+                the entry.
+
+        Returns:
+            int: 1 to signify completion of method.
+        """
+
+        return self.add_metrics([operation])
+
+    def add_metrics(self, operations):
+        """Adds columns to the global tracker for several metrics, and 
+        populates them with the values returned from the 'operations' methods.
+
+        Every metric is calculated for each file in a single pass over the 
+        files, shared out between 'workers' processes if there is more than 
+        one, and then all the values are written in a single transaction.
+
+        Args:
+            operations (list[method (str)]): the methods that calculate the 
+                metrics for each entry.
+
+        Returns:
+            int: 1 to signify completion of method.
+        """
+
+        headers = self.__get_headers()
+
+        with self.__connection:
+            for operation in operations:
+                columnHeading = operation(heading=True)
+                if columnHeading not in headers:
+                    self.__connection.execute(
+                        'ALTER TABLE tracker ADD COLUMN "{}" DEFAULT \'\''
+                        .format(columnHeading))
+                    headers.append(columnHeading)
+
+        self.remove_deleted()
+
+        columnNumbers = [headers.index(operation(heading=True))
+                            for operation in operations]
+        fileNames = [row[0] for row in
+                        self.__connection.execute("SELECT name FROM tracker ORDER BY rowid")]
+
+        values = _calculate_metrics_for_files(fileNames, operations, self.workers)
+
+        self.write_many_to_file([(fileName, columnNumber, value)
+                                    for fileName in fileNames
+                                    for columnNumber, value in
+                                        zip(columnNumbers, values[fileName])])
+
+        return 1
+
+    def export_csv(self, filePath=None):
+        """Writes the contents of the tracker to a CSV file, in the same format 
+        as the CSV global tracker file.
+
+        The CSV global tracker file is replaced in the same way as it is by 
+        'GlobalFile' (see '_TrackerCache.write_rows'), so its journal is 
+        deleted and can't be replayed over the exported values later.
+
+        Args:
+            filePath (str, optional): path of the CSV file to write. Defaults 
+                to None, which writes to the CSV global tracker file.
+
+        Returns:
+            str: path of the CSV file.
+        """
+
+        if filePath == None:
+            filePath = const.TRACKER_FILEPATH
+
+        rows = self.__connection.execute("SELECT * FROM tracker ORDER BY rowid")
+
+        if os.path.abspath(filePath) == os.path.abspath(const.TRACKER_FILEPATH):
+            _trackerCache.write_rows([self.__get_headers()] +
+                                        [["" if cell == None else cell for cell in row]
+                                            for row in rows])
+            return filePath
+
+        with open(filePath, "w", newline="") as f: # writeable
+            tracker_file = csv.writer(f)
+            tracker_file.writerow(self.__get_headers())
+            tracker_file.writerows(rows)
+
+        return filePath
+
+    def get_column_number(self, columnHeading):
+        """Returns the column number associated with a given heading.
+
+        Args:
+            columnHeading (str): name of column to be found.
+
+        Raises:
+            ValueError: raised if the column is not found in the header.
+
+        Returns:
+            int: index of column.
+        """
+
+        try:
+            return self.__get_headers().index(columnHeading)
+        except ValueError:
+            raise ValueError("Column heading not found")
+
+    def get_file_names(self):
+        """Returns the names of every file listed in the tracker, in order.
+
+        Returns:
+            list[str]: names of the files.
+        """
+
+        return [row[0] for row in
+                    self.__connection.execute("SELECT name FROM tracker ORDER BY rowid")]
+
+    def import_csv(self, filePath=None):
+        """Replaces the contents of the tracker with the contents of a CSV 
+        file, in the same format as the CSV global tracker file.
+
+        Args:
+            filePath (str, optional): path of the CSV file to read. Defaults to 
+                None, which reads the CSV global tracker file.
+
+        Returns:
+            int: number of files imported.
+        """
+
+        if filePath == None:
+            filePath = const.TRACKER_FILEPATH
+
+        # make sure changes in the CSV tracker's journal are included
+        if os.path.abspath(filePath) == os.path.abspath(const.TRACKER_FILEPATH):
+            _trackerCache.compact()
+
+        with open(filePath) as f: # read only
+            tracker_file = csv.reader(f)
+            headers = next(tracker_file, const.TRACKER_BARE_MINIMUM.split(","))
+            rows = [row for row in tracker_file
+                        if len(row) >= const.TRACKER_BARE_MINIMUM_LENGTH]
+
+        with self.__connection:
+            self.__connection.execute("DROP TABLE tracker")
+            self.__connection.execute(
+                'CREATE TABLE tracker ("{}" TEXT PRIMARY KEY, {})'
+                .format(headers[0], ", ".join('"{}" DEFAULT \'\''.format(heading)
+                                                for heading in headers[1:])))
+            self.__connection.executemany(
+                "INSERT OR REPLACE INTO tracker VALUES ({})"
+                .format(", ".join("?" * len(headers))),
+                [(row + [""] * len(headers))[:len(headers)] for row in rows])
+
+        return len(rows)
+
+    def populate_metric(self, operation):
+        """Populates/updates an existing metric column in the global tracker 
+        with values returned from the 'operation' method.
+
+        The metric is calculated for every file, and then all the values are 
+        written in a single transaction.
+
+        Args:
+            operation (method (str)): the method that calculates the metric for 
+                the entry.
+
+        Returns:
+            int: 1 to signify completion of method, 0 otherwise.
+        """
+
+        # check column exists
+        try:
+            self.get_column_number(operation(heading=True))
+        except ValueError as e: # if column not found
+            print(e)
+            return 0
+
+        return self.add_metrics([operation])
+
+    def remove_deleted(self):
+        """Removes any files from the tracker if they have been deleted from 
+        the data directory.
+
+        Lists the data directory once, and removes every file that isn't in the 
+        listing in a single transaction. The directory isn't listed if neither 
+        it nor the database has changed since the last time nothing was found.
+
+        Returns:
+            bool: signifies completion of method.
+        """
+
+        databaseStat = os.stat(const.TRACKER_DATABASE_FILEPATH)
+        state = (const.DATA_DIRECTORY, os.stat(const.DATA_DIRECTORY).st_mtime_ns,
+                    databaseStat.st_mtime_ns, databaseStat.st_size)
+        if state == GlobalDatabase.__deletedCheckState:
+            return True
+
+        entries = _list_data_directory()
+
+        # files in the tracker but not the data directory - segments of a raw 
+        # data file are deleted with the file
+        deleted = [fileName for fileName in self.get_file_names()
+                    if functions.parse_segment_file_name(fileName)[0] \
+                        [const.LENGTH_OF_DATA_DIR:] not in entries]
+
+        if len(deleted) > 0:
+            for fileName in deleted:
+                print("Deleted: ", fileName)
+
+            with self.__connection:
+                self.__connection.executemany("DELETE FROM tracker WHERE name = ?",
+                                                [(fileName,) for fileName in deleted])
+
+            # delete processed data files if they exist and tally
+            deletedProcessed = processed_data.ProcessedData() \
+                                    .delete_processed_data_files(deleted, entries)
+
+            print("Deleted {} raw data files and {} processed data files"
+                .format(len(deleted), deletedProcessed))
+        else:
+            # only skip next time if the tracker hasn't been changed here
+            GlobalDatabase.__deletedCheckState = state
+
+        return True
+
+    def remove_files(self, fileNames):
+        """Removes several files from the tracker, in a single transaction. 
+        Their processed data files are left alone.
+
+        Args:
+            fileNames (list[str]): names of the files to remove.
+
+        Returns:
+            int: number of files removed.
+        """
+
+        with self.__connection:
+            cursor = self.__connection.executemany("DELETE FROM tracker WHERE name = ?",
+                                                    [(fileName,) for fileName in fileNames])
+        return cursor.rowcount
+
+    def remove_metric(self, columnHeading):
+        """Removes a column from the tracker.
+
+        The table is rebuilt without the column, as older versions of SQLite 
+        can't drop columns.
+
+        Args:
+            columnHeading (str): name of column to be removed.
+
+        Returns:
+            bool: signifying successful completion of method.
+        """
+
+        try:
+            columnNumber = self.get_column_number(columnHeading)
+        except ValueError as e: # if column not found
+            print(e)
+            return False
+
+        headers = self.__get_headers()
+        del headers[columnNumber]
+        columns = ", ".join('"{}"'.format(heading) for heading in headers)
+
+        with self.__connection:
+            self.__connection.execute(
+                'CREATE TABLE new_tracker ("{}" TEXT PRIMARY KEY, {})'
+                .format(headers[0], ", ".join('"{}" DEFAULT \'\''.format(heading)
+                                                for heading in headers[1:])))
+            self.__connection.execute(
+                "INSERT INTO new_tracker ({0}) SELECT {0} FROM tracker ORDER BY rowid"
+                .format(columns))
+            self.__connection.execute("DROP TABLE tracker")
+            self.__connection.execute("ALTER TABLE new_tracker RENAME TO tracker")
+
+        return True
+
+    def rename_files(self, fileNames):
+        """Renames several files in the tracker, in a single transaction, 
+        keeping the rest of their entries.
+
+        Args:
+            fileNames (dict[str, str]): new name of each file, keyed by its 
+                current name.
+
+        Returns:
+            int: number of files renamed.
+        """
+
+        with self.__connection:
+            cursor = self.__connection.executemany("UPDATE tracker SET name = ? WHERE name = ?",
+                                                    [(newFileName, fileName) for fileName,
+                                                        newFileName in fileNames.items()])
+        return cursor.rowcount
+
+    def change_health_status(self, fileName, healthStatus):
+        """Changes the health status of a given file in the tracker.
+
+        Args:
+            fileName (str): name of file whose entry is to be updated.
+            healthStatus (int): health status associated with the file.
+
+        Returns:
+            bool: indicates successful completion of method.
+        """
+
+        return self.write_to_file(fileName, 1, healthStatus)
+
+    def get_health_status(self, fileName):
+        """Gets the health status of the given raw data file.
+
+        Args:
+            fileName (str): name of the file to check health status of.
+
+        Returns:
+            int: value of health status, or -1 if file not found.
+        """
+
+        row = self.__connection.execute(
+            'SELECT "health status" FROM tracker WHERE name = ?',
+            (fileName,)).fetchone()
+
+        if row == None:
+            print("File '{}' not found in tracker".format(fileName))
+            return -1
+        return int(row[0])
+
+    def is_file_recorded(self, fileName):
+        """Checks if a given file is recorded in the tracker.
+
+        Args:
+            fileName (str): name of file to find in tracker.
+
+        Returns:
+            bool: 'True' if the file is listed, 'False' otherwise.
+        """
+
+        row = self.__connection.execute("SELECT 1 FROM tracker WHERE name = ?",
+                                        (fileName,)).fetchone()
+        return row != None
+
+    def write_to_file(self, fileName, columnNumber, data):
+        """Overwrites a given cell in the tracker with data passed to the 
+        method.
+
+        Args:
+            fileName (str): name of file whose entry is to be updated.
+            columnNumber (int): the column in the row to be overwritten.
+            data (any): data to write into tracker, gets cast into a string.
+
+        Returns:
+            bool: signifies complete execution of method.
+        """
+
+        if data == None:
+            return
+
+        return self.write_many_to_file([(fileName, columnNumber, data)])
+
+    def write_many_to_file(self, updates):
+        """Overwrites several cells in the tracker at once, in a single 
+        transaction.
+
+        Args:
+            updates (list[tuple]): changes to make, each as (file name, column 
+                number, data). Changes where the data is None are ignored.
+
+        Returns:
+            bool: signifies complete execution of method.
+        """
+
+        headers = self.__get_headers()
+
+        with self.__connection:
+            for fileName, columnNumber, data in updates:
+                if data == None:
+                    continue
+                cursor = self.__connection.execute(
+                    'UPDATE tracker SET "{}" = ? WHERE name = ?'
+                    .format(headers[columnNumber]), (str(data), fileName))
+                if cursor.rowcount == 0:
+                    print("File '{}' not found in tracker".format(fileName))
+
+        return True
+
+
+    def __get_headers(self):
+        """Private method to get the column headers of the tracker, in order.
+
+        Returns:
+            list[str]: column headers.
+        """
+
+        return [column[1] for column in
+                    self.__connection.execute("PRAGMA table_info(tracker)")]
+
+
+class _TrackerCache:
+    """Copy of the contents of the global tracker file, shared by every 
+    'GlobalFile' object in the process.
+
+    The file is read once, and the rows are kept in memory along with the row 
+    number of each file listed, so looking up an entry doesn't require reading 
+    the file. Each time the rows are used, the modification time and size of 
+    the file are checked, and the file is only read again if either has 
+    changed, for example if it has been edited by hand or by another process. 
+    Every write to the tracker file goes through this object, so the copy in 
+    memory is kept up to date without reading the file back.
+
+    Changes to individual cells are not written to the tracker file straight 
+    away. Instead, each one is appended to a journal file next to it, as a row 
+    of (file name, column heading, data), so the cost of a change doesn't 
+    depend on the size of the tracker. When the tracker file is read, the 
+    journal is replayed onto it. When the journal grows beyond 
+    const.TRACKER_JOURNAL_COMPACTION_SIZE bytes, the tracker file is rewritten 
+    with the changes included and the journal is deleted. Replaying a change 
+    twice has the same result as replaying it once, so if the program stops 
+    part way through any of this, nothing is lost or half written.
+
+    Attributes:
+        __signature (tuple): paths, modification times and sizes of the 
+            tracker file and journal when they were last read or written.
+        __rows (list[list[str]]): every row of the tracker file, including the 
+            header, but not including blank rows.
+        __rowNumbers (dict[str, int]): index in '__rows' of each file listed in 
+            the tracker, keyed by the name of the file.
+        __version (int): counts the times rows have been read, added or 
+            removed, so other objects can tell if the files listed may have 
+            changed.
+
+    Methods:
+        __init__ : class constructor.
+        journal_file_path (property) : getter for the path to the journal.
+        rows (property) : getter for the rows of the tracker file.
+        version (property) : getter for the attribute of the same name.
+        append_rows : adds rows to the bottom of the tracker file.
+        append_to_journal : records changes to cells in the journal.
+        compact : merges the journal into the tracker file.
+        copy_rows : returns a copy of the rows, which can be changed.
+        get_row : returns the row of a given file.
+        get_row_number : returns the index of the row of a given file.
+        write_rows : replaces the contents of the tracker file.
+        __apply : makes changes read from the journal to the rows in memory.
+        __get_signature : returns the current state of the tracker file and 
+            journal.
+        __load : reads the tracker file and journal into memory.
+        __sign : records the current state of the tracker file and journal.
+        __truncate_journal : removes a partly written change from the journal.
+        __validate : reads the tracker file again if it has changed.
+    """
+
+    def __init__(self):
+        """Constructor for class. Nothing is read until the rows are needed.
+        """
+
+        self.__signature = None
+        self.__rows = []
+        self.__rowNumbers = {}
+        self.__version = 0
+
+    @property
+    def journal_file_path(self):
+        """Getter for the path to the journal of the tracker file.
+
+        Returns:
+            str: full path to the journal.
+        """
+
+        return const.TRACKER_FILEPATH + const.TRACKER_JOURNAL_FILE_TYPE
+
+    @property
+    def rows(self):
+        """Getter for the rows of the tracker file. These should not be 
+        changed - use 'copy_rows' to get a copy that can be.
+
+        Raises:
+            FileNotFoundError: raised if the tracker file does not exist.
+
+        Returns:
+            list[list[str]]: every row of the tracker file, including the 
+                header.
+        """
+
+        self.__validate()
+        return self.__rows
+
+    @property
+    def version(self):
+        """Getter for attribute of the same name. Changes whenever rows may 
+        have been added to or removed from the tracker file, but not when cells 
+        are changed.
+
+        Returns:
+            int: version of the rows.
+        """
+
+        self.__validate()
+        return self.__version
+
+
+    def append_rows(self, rows):
+        """Adds rows to the bottom of the tracker file, in the same format as 
+        they have always been added, and to the copy in memory.
+
+        Args:
+            rows (list[list[str]]): rows to be added.
+        """
+
+        if len(rows) == 0:
+            return
+
+        self.__validate()
+
+        lines = [", ".join(row) for row in rows]
+        with open(const.TRACKER_FILEPATH, "a") as f:
+            for line in lines:
+                f.write("\n")
+                f.write(line)
+
+        # store the rows as they will be read back from the file
+        for row in csv.reader(lines):
+            self.__rows.append(row)
+            self.__rowNumbers.setdefault(row[0], len(self.__rows)-1)
+
+        self.__version += 1
+        self.__sign()
+
+    def append_to_journal(self, records):
+        """Records changes to cells of the tracker in the journal, and makes 
+        them to the copy in memory. If the journal has grown too large, it is 
+        merged into the tracker file.
+
+        Args:
+            records (list[tuple]): changes to make, each as (file name, column 
+                heading, data).
+        """
+
+        if len(records) == 0:
+            return
+
+        self.__validate()
+        self.__truncate_journal()
+
+        with open(self.journal_file_path, "a", newline="") as f:
+            journal_file = csv.writer(f)
+            journal_file.writerows(records)
+            f.flush()
+            os.fsync(f.fileno()) # make sure changes survive a crash
+
+        self.__apply(records)
+        self.__sign()
+
+        if os.path.getsize(self.journal_file_path) > const.TRACKER_JOURNAL_COMPACTION_SIZE:
+            self.compact()
+
+    def compact(self):
+        """Merges the journal into the tracker file, by rewriting the tracker 
+        file with every change included and then deleting the journal.
+
+        Returns:
+            bool: 'True' if there was a journal to merge, 'False' otherwise.
+        """
+
+        if not os.path.exists(self.journal_file_path):
+            return False
+
+        self.write_rows(self.copy_rows())
+        return True
+
+    def copy_rows(self):
+        """Returns a copy of the rows of the tracker file, which can be changed 
+        and then passed to 'write_rows'.
+
+        Returns:
+            list[list[str]]: every row of the tracker file, including the 
+                header.
+        """
+
+        return [list(row) for row in self.rows]
+
+    def get_row(self, fileName):
+        """Returns the row of a given file.
+
+        Args:
+            fileName (str): name of the file.
+
+        Returns:
+            list[str]: the row, or None if the file is not listed.
+        """
+
+        rowNumber = self.get_row_number(fileName)
+        if rowNumber == None:
+            return None
+        return self.__rows[rowNumber]
+
+    def get_row_number(self, fileName):
+        """Returns the index of the row of a given file, in 'rows'.
+
+        Args:
+            fileName (str): name of the file.
+
+        Returns:
+            int: index of the row, or None if the file is not listed.
+        """
+
+        self.__validate()
+        return self.__rowNumbers.get(fileName)
+
+    def write_rows(self, rows):
+        """Replaces the contents of the tracker file, and the copy in memory.
+
+        The new file is written alongside the tracker and then moved into its 
+        place, so the tracker is never left with only some of the changes made.
+        As the rows include every change in the journal, the journal is then 
+        deleted.
+
+        Args:
+            rows (list[list[str]]): every row of the tracker, including the 
+                header.
+        """
+
+        temporaryFilePath = const.TRACKER_FILEPATH + ".tmp"
+        with open(temporaryFilePath, "w", newline="") as f: # writeable
+            tracker_file = csv.writer(f)
+            tracker_file.writerows(rows) # write amended data to tracker file
+        os.replace(temporaryFilePath, const.TRACKER_FILEPATH)
+
+        if os.path.exists(self.journal_file_path):
+            os.remove(self.journal_file_path)
+
+        self.__rows = [[str(cell) for cell in row] for row in rows]
+        self.__rowNumbers = {}
+        for rowNumber in range(len(self.__rows)-1, 0, -1): # first entry wins
+            self.__rowNumbers[self.__rows[rowNumber][0]] = rowNumber
+
+        self.__version += 1
+        self.__sign()
+
+
+    def __apply(self, records):
+        """Private method to make changes to cells of the rows in memory. 
+        Changes to files or columns that aren't in the tracker are ignored.
+
+        Args:
+            records (list[tuple]): changes to make, each as (file name, column 
+                heading, data).
+        """
+
+        headers = self.__rows[0]
+
+        for fileName, columnHeading, data in records:
+            rowNumber = self.__rowNumbers.get(fileName)
+            if rowNumber == None or columnHeading not in headers:
+                continue
+
+            row = self.__rows[rowNumber]
+            columnNumber = headers.index(columnHeading)
+            if columnNumber >= len(row):
+                row.extend([""] * (columnNumber + 1 - len(row)))
+            row[columnNumber] = str(data)
+
+    def __get_signature(self):
+        """Private method to get the paths, modification times and sizes of the 
+        tracker file and journal.
+
+        Raises:
+            FileNotFoundError: raised if the tracker file does not exist.
+
+        Returns:
+            tuple: state of the tracker file and journal.
+        """
+
+        stat = os.stat(const.TRACKER_FILEPATH)
+        signature = (const.TRACKER_FILEPATH, stat.st_mtime_ns, stat.st_size)
+
+        try:
+            stat = os.stat(self.journal_file_path)
+        except FileNotFoundError: # no changes since last merge
+            return signature
+        return signature + (stat.st_mtime_ns, stat.st_size)
+
+    def __load(self):
+        """Private method to read the tracker file into memory, ignoring blank 
+        rows, and then replay the journal onto it.
+        """
+
+        with open(const.TRACKER_FILEPATH) as f: # read only
+            tracker_file = csv.reader(f)
+            self.__rows = [row for row in tracker_file
+                            if len(row) >= const.TRACKER_BARE_MINIMUM_LENGTH]
+
+        self.__rowNumbers = {}
+        for rowNumber in range(len(self.__rows)-1, 0, -1): # first entry wins
+            self.__rowNumbers[self.__rows[rowNumber][0]] = rowNumber
+
+        if len(self.__rows) > 0 and os.path.exists(self.journal_file_path):
+            with open(self.journal_file_path, newline="") as f: # read only
+                lines = f.read().splitlines(keepends=True)
+
+            # ignore the last change if it was only partly written
+            if len(lines) > 0 and not lines[-1].endswith("\n"):
+                lines = lines[:-1]
+
+            self.__apply([record for record in csv.reader(lines) if len(record) == 3])
+
+        self.__version += 1
+        self.__sign()
+
+    def __sign(self):
+        """Private method to record the state of the tracker file and journal, 
+        so changes made to them elsewhere can be spotted.
+        """
+
+        self.__signature = self.__get_signature()
+
+    def __truncate_journal(self):
+        """Private method to remove the last change from the journal if it was 
+        only partly written, so that new changes don't get joined onto it.
+        """
+
+        try:
+            f = open(self.journal_file_path, "r+b")
+        except FileNotFoundError: # nothing to remove
+            return
+
+        with f:
+            # only the last byte needs reading if the journal is intact
+            if f.seek(0, os.SEEK_END) == 0:
+                return
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.seek(0)
+                f.truncate(f.read().rfind(b"\n") + 1)
+
+    def __validate(self):
+        """Private method to read the tracker file again if it, or the journal, 
+        has changed since it was last read or written.
+
+        Raises:
+            FileNotFoundError: raised if the tracker file does not exist.
+        """
+
+        if self.__signature != self.__get_signature():
+            self.__load()
+
+
+# contents of the tracker file, shared by every 'GlobalFile' in this process
+_trackerCache = _TrackerCache()
+
+
+def _list_data_directory():
+    """Lists the names of the files in the data directory, in a single scan.
+    Compressed files are listed by the names they're known by in the tracker 
+    (see 'storage.list_directory').
+
+    Returns:
+        set[str]: names of the files in the data directory.
+    """
+
+    return set(storage.list_directory())
+
+def get_tracker(fullInitialisation = True, workers=1):
+    """Opens the global tracker, using the backend set in 
+    const.TRACKER_BACKEND.
+
+    Args:
+        fullInitialisation (bool, optional): controls whether initialisation 
+            is full or partial. Defaults to True.
+        workers (int, optional): number of processes used to calculate 
+            metrics. Defaults to 1.
+
+    Returns:
+        GlobalFile or GlobalDatabase: the global tracker.
+    """
+
+    if const.TRACKER_BACKEND == "sqlite":
+        return GlobalDatabase(fullInitialisation, workers)
+    return GlobalFile(fullInitialisation, workers)
+
+
+def _calculate_metrics_for_files(fileNames, operations, workers=1):
+    """Calculates several metrics for every file listed, in a single pass over 
+    the files.
+
+    The files are shared out between 'workers' processes if there is more than 
+    one worker, otherwise they are done one after another.
+
+    Args:
+        fileNames (list[str]): names of the files to calculate metrics for.
+        operations (list[method (str)]): the methods that calculate the metrics.
+        workers (int, optional): number of processes used to calculate the 
+            metrics. Defaults to 1.
+
+    Returns:
+        dict[str, list]: value of each metric, in the same order as 
+            'operations', keyed by the name of the file.
+    """
+
+    values = {}
+
+    if workers > 1 and len(fileNames) > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(_calculate_metrics, fileName, operations):
+                        fileName for fileName in fileNames}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    values[futures[future]] = future.result()
+                except Exception as e:
+                    print("Metrics for {} could not be calculated: {}"
+                            .format(futures[future], e))
+                    values[futures[future]] = [None] * len(operations)
+    else:
+        for fileName in fileNames:
+            try:
+                values[fileName] = _calculate_metrics(fileName, operations)
+            except Exception as e:
+                print("Metrics for {} could not be calculated: {}".format(fileName, e))
+                values[fileName] = [None] * len(operations)
+
+    return values
+
+def _calculate_metrics(fileName, operations):
+    """Calculates several metrics for a single file. Module level so that it 
+    can be run in a separate process.
+
+    Operations whose heading is a metric in the registry of the metrics 
+    engine are all calculated together, from a single read of the processed 
+    data file. Any other operation is called on its own.
+
+    Args:
+        fileName (str): name of the file to calculate the metrics for.
+        operations (list[method (str)]): the methods that calculate the metrics.
+
+    Returns:
+        list: value of each metric, in the same order as 'operations'.
+    """
+
+    M = processed_data.ProcessedData().metrics
+    headings = [operation(heading=True) for operation in operations]
+
+    values = M.calculate([heading for heading in headings if heading in M.registry],
+                            fileName)
 
-            f.close()
+    return [values[heading] if heading in values else operation(fileName)
+                for heading, operation in zip(headings, operations)]
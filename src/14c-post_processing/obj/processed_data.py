@@ -1,12 +1,14 @@
 from . import const
-from .exceptions import UniqueCaseException
 from . import functions
 from . import global_tracker
-import csv
+from . import records
+from . import storage
+from .throw import Throw
+import concurrent.futures
+import itertools
 import matplotlib.pyplot as plt
 import numpy as np
 import os
-import scipy.integrate
 
 class ProcessedData:
     """Main class for handling the processed data files based on the raw data 
@@ -25,6 +27,11 @@ class ProcessedData:
         overwrite (bool): set as 'True' if data in the processed data files 
             should be overwritten with changes otherwise set as 'False'.
         fileName (str): name of the processed data file to be worked on.
+        workers (int): number of processes used to create processed data files 
+            in parallel.
+        integrationMethods (dict[str, str]): integration method used by each 
+            calculation (or column) that integrates, if it is not the default. 
+            Used by every '_Individual' created from this object.
         
     Methods:
         __init__ : class constructor.
@@ -37,24 +44,46 @@ class ProcessedData:
         set_file_name : setter for the attribute of the same name.
         create_all_processed_data_files : creates processed data files for all 
             raw data files marked as healthy.
+        create_processed_data_file_from_data : creates a processed data file 
+            from raw data that has already been read and converted.
         create_single_processed_data_file : creates a processed data file for 
             any one raw data file.
+        delete_processed_data_files : deletes the processed data files for 
+            several raw data files at once.
+        export_processed_data_files : writes a CSV version of every processed 
+            data file.
         get_all_processed_files : gets a list of all the processed data files 
             created.
-        __convert_units : changes the units of the sensor output to make 
-            calculations easier.
-        __ write_data_to_file : writes a column of data to processed data file.
+        split_all_raw_data_files : splits every healthy raw data file that 
+            holds several throws.
+        split_raw_data_file : splits a raw data file that holds several throws 
+            into a tracker entry for each throw.
+        __find_movement : finds the samples where the ball is moving.
+        __find_segments : finds where the sensors initialise, and where the 
+            flight of the ball starts and ends. 
+        __prepare_raw_data : converts the data read from a raw data file.
+        __read_raw_data : reads a raw data file, or a segment of one. 
     """
 
-    def __init__(self, overwrite=True, fileName=""):
+    def __init__(self, overwrite=True, fileName="", workers=const.DEFAULT_WORKERS,
+                    integrationMethods=None):
         """Constructor for class, defines constants and class attributes.
 
         Args:
             overwrite (bool): whether or not to overwrite processed data files.
             fileName (str): the name of the processed data file to work on.
+            workers (int, optional): number of processes used to create 
+                processed data files in parallel. Defaults to 
+                const.DEFAULT_WORKERS.
+            integrationMethods (dict[str, str], optional): integration method 
+                to use for each calculation (or column), keyed by its name - 
+                see 'calculations.set_integration_method'. Defaults to None, 
+                which uses const.DEFAULT_INTEGRATION_METHOD for all of them.
         """
 
         self.overwrite = overwrite
+        self.workers = workers
+        self.integrationMethods = dict(integrationMethods or {})
 
         # ensure processed file, not raw
         self.fileName = functions.raw_to_processed(fileName)
@@ -78,7 +107,7 @@ class ProcessedData:
             _Individual object: instance of class.
         """
 
-        return _Individual(self.file_name)
+        return _Individual(self.file_name, integrationMethods=self.integrationMethods)
 
     @property
     def metrics(self):
@@ -142,54 +171,98 @@ class ProcessedData:
         created and populated. If the file exists and overwrite is set 'False', 
         the entry is skipped.
 
+        If a raw data file has been split into throws, a processed data file 
+        is created for each throw instead of for the whole file.
+
+        The files are shared out between 'workers' processes. Each one sends 
+        back the name of the processed data file it created, and the tracker 
+        is updated with all of them at once at the end.
+
         Returns:
             int: number of files created.
         """
 
-        count = 0
+        G = global_tracker.get_tracker(False)
+        rawFileNames = []
+
+        # segments listed in the tracker, grouped by the raw data file they're in
+        segments = {}
+        for fileName in G.get_file_names():
+            sourceFileName, start, _ = functions.parse_segment_file_name(fileName)
+            if start != None:
+                segments.setdefault(sourceFileName, []).append(fileName)
 
         # iterate over every file in the data directory
-        for entry in os.listdir(self.DATA_DIRECTORY):
+        for entry in storage.list_directory(self.DATA_DIRECTORY):
             rawFilePath = os.path.join(self.DATA_DIRECTORY, entry)
             rawFileName = rawFilePath[const.PATH_LENGTH_TO_DATA_DIR:]
 
             # only check raw data files if they've been marked as healthy
             if entry[:len(const.RAW_DATA_PREFIX)] == const.RAW_DATA_PREFIX:
-                G = global_tracker.GlobalFile(False)
                 if G.get_health_status(rawFileName) >= const.passedWithWarnings:
 
-                     # if overwrite is False, it doesn't matter if the file has already been recorded
-                    if not self.overwrite:
-                        processedFilePath = const.DATA_DIRECTORY + \
-                            const.PROCESSED_DATA_PREFIX + \
-                            entry[len(const.RAW_DATA_PREFIX):]
+                    for fileName in segments.get(rawFileName, [rawFileName]):
+                        # if overwrite is False, it doesn't matter if the file has already been recorded
+                        if not self.overwrite:
+                            throw = Throw(fileName)
             
-                        # check file exists
-                        try:
-                            f = open(processedFilePath)
-                        except FileNotFoundError:
-                            pass
-                        else:
-                            # if it exists, close file and move on
-                            f.close()
-                            continue
-
-                    self.create_single_processed_data_file(rawFileName)
-                    count += 1
+                            # check file exists, in either format
+                            if storage.exists(throw.binary_file_path) or \
+                                    storage.exists(throw.file_path):
+                                continue
+
+                        rawFileNames.append(fileName)
+
+        # changes to make to the tracker, as (file name, column number, data)
+        trackerUpdates = []
+
+        if self.workers > 1 and len(rawFileNames) > 1:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = {executor.submit(_create_processed_data_file, rawFileName):
+                            rawFileName for rawFileName in rawFileNames}
+                for future in concurrent.futures.as_completed(futures):
+                    try:
+                        update = future.result()
+                    except Exception as e:
+                        print("Processed data file for {} could not be created: {}"
+                                .format(futures[future], e))
+                        continue
+                    if update != None:
+                        trackerUpdates.append(update)
+        else:
+            for rawFileName in rawFileNames:
+                update = _create_processed_data_file(rawFileName)
+                if update != None:
+                    trackerUpdates.append(update)
 
+        # add names of processed data files to tracker
+        G.write_many_to_file(trackerUpdates)
+
+        count = len(trackerUpdates)
         print("Finished: {} processed data files created".format(count))
         return count
 
-    def create_single_processed_data_file(self, rawFileName):
+    def create_single_processed_data_file(self, rawFileName, updateTracker=True):
         """Creates a processed data file for any given raw data file.
 
-        Stores the from the raw data file in an array, removes any offset from 
-        the sensors, and changes the units of the data to make it more usable. 
-        Then writes this amended dataset to the corresponding processed data 
-        file.
+        Reads the whole raw data file into an array in one go, removes any 
+        offset from the sensors, and changes the units of the data to make it 
+        more usable. Then finds where the flight of the ball starts and ends, 
+        and (if const.TRIM_TO_FLIGHT is set) keeps only the samples during the 
+        flight, with the time measured from the start of the flight. Then 
+        writes this amended dataset to the corresponding (binary) processed 
+        data file, with the positions of the start and end of the flight in 
+        the raw data file stored as metadata.
+
+        The raw data file can also be a segment of a raw data file (see 
+        'split_raw_data_file'), in which case only the lines of the segment are 
+        read.
 
         Args:
             rawFileName (str): name of the raw data file.
+            updateTracker (bool, optional): set 'False' to leave it to the 
+                caller to add the name of the processed data file to the 
+                tracker. Defaults to True.
 
         Returns:
             str: name of the new processed data file.
@@ -197,59 +270,91 @@ class ProcessedData:
 
         # get raw and processed data file names
         processedFileName = functions.raw_to_processed(rawFileName)
-        rawFilePath = const.DATA_DIRECTORY + rawFileName[const.LENGTH_OF_DATA_DIR:]
-        processedFilePath = const.DATA_DIRECTORY + processedFileName[const.LENGTH_OF_DATA_DIR:]
 
-        # check files exists
+        # read the whole raw data file into an array, with one row per line
         try:
-            f = open(rawFilePath)
+            data = self.__read_raw_data(rawFileName)
         except FileNotFoundError as e:
             print("Raw data file could not be found:", e)
             return
+        except ValueError as e:
+            print("Raw data file could not be read:", e)
+            return
 
-        raw_file = csv.reader(f)
-        self.set_file_name(processedFileName)
-        
-        try:
-            g = open(processedFilePath, "w")
-        except FileNotFoundError as e:
-            print("Processed data file could not be found:", e)
+        fileData, sensorsInitialised = self.__prepare_raw_data(data)
 
-        # add header, but prefix all sensor columns with '[raw]
-        header = ",[raw] ".join(const.COLUMN_HEADERS)
-        g.write(header)
-        g.write("\n")
+        return self.create_processed_data_file_from_data(rawFileName, fileData,
+                                                            sensorsInitialised,
+                                                            updateTracker=updateTracker)
 
-        # process sensor data only if sensors have initialised
-        sensorsInitialised = [False, False, False]
-        allSensorsInitialised = False
-        
-        for line in raw_file:
-            if not allSensorsInitialised:
-                if line[1:4] != ["0.00", "0.00", "0.00"]:
-                    sensorsInitialised[0] = True
-                if line[4:7] != ["0.00", "0.00", "0.00"]:
-                    sensorsInitialised[1] = True
-                if line[7:10] != ["0.00", "0.00", "0.00"]:
-                    sensorsInitialised[2] = True
-                if sensorsInitialised == [True, True, True]:
-                    allSensorsInitialised = True
-
-            newData = self.__convert_units(line, sensorsInitialised)
-            
-            g.write(",".join(newData))
-            g.write("\n")
+    def create_processed_data_file_from_data(self, rawFileName, fileData,
+                                                sensorsInitialised,
+                                                calculations=None, updateTracker=True):
+        """Creates a processed data file from the data of a raw data file that 
+        has already been read and converted (e.g. as it was received - see 
+        'stream.StreamingThrow'), rather than reading the raw data file.
+
+        Finds where the flight of the ball starts and ends, and keeps only the 
+        flight if const.TRIM_TO_FLIGHT is set, in the same way as 
+        'create_single_processed_data_file'. Any calculations asked for are run 
+        before the processed data file is written, so it's only written once.
+
+        Args:
+            rawFileName (str): name of the raw data file.
+            fileData (np.ndarray): the converted data, with one row per line of 
+                the raw data file.
+            sensorsInitialised (np.ndarray): whether each of the three sensors 
+                had initialised at each line.
+            calculations (list[str], optional): names of calculations to run, 
+                as listed in 'calculations.registry'. Defaults to None, which 
+                runs none of them.
+            updateTracker (bool, optional): set 'False' to leave it to the 
+                caller to add the name of the processed data file to the 
+                tracker. Defaults to True.
 
-        # close raw and processed data files
-        g.close()
-        f.close()
+        Returns:
+            str: name of the new processed data file.
+        """
+
+        if calculations == None:
+            calculations = []
+
+        processedFileName = functions.raw_to_processed(rawFileName)
+        self.set_file_name(processedFileName)
+        
+        # add header, but prefix all sensor columns with '[raw]
+        header = ",[raw] ".join(const.COLUMN_HEADERS).split(",")
+
+        segments = self.__find_segments(fileData, sensorsInitialised)
+        segments["raw length"] = len(fileData)
+        _, start, end = functions.parse_segment_file_name(rawFileName)
+        if start != None: # lines of the raw data file the segment is made of
+            segments["segment start"] = start
+            segments["segment end"] = end
+        if len(fileData) > 0:
+            segments["launch time"] = fileData[min(segments["launch"], len(fileData)-1), 0]
+
+        # only keep the flight, timed from the start of it
+        if const.TRIM_TO_FLIGHT:
+            fileData = fileData[segments["launch"]:segments["landing"]]
+            if len(fileData) > 0:
+                fileData[:, 0] -= fileData[0, 0]
+
+        # keep the data in memory, so the file is only written once
+        throw = Throw(processedFileName).set_data(header, fileData)
+        for key, value in segments.items():
+            throw.set_metadata(key, value)
 
         # calculate timesteps between samples and write to file
-        self.individual.add_column(self.individual.calculations.delta_time)
+        I = _Individual(processedFileName, throw, self.integrationMethods)
+        I.add_column(I.calculations.delta_time, flush=len(calculations) == 0)
+        if len(calculations) > 0:
+            I.calculate(calculations)
         
         # add name of processed data file to tracker
-        G = global_tracker.GlobalFile(False)
-        G.write_to_file(rawFileName, 2, processedFileName)
+        if updateTracker:
+            G = global_tracker.get_tracker(False)
+            G.write_to_file(rawFileName, 2, processedFileName)
         
         print("  Created " + processedFileName)
         return processedFileName
@@ -265,100 +370,346 @@ class ProcessedData:
         """
 
         files = []
-        for entry in os.listdir(self.DATA_DIRECTORY):
+        for entry in storage.list_directory(self.DATA_DIRECTORY):
             # filter by processed data files
             if entry[:len(const.RAW_DATA_PREFIX)] == const.PROCESSED_DATA_PREFIX:
-                files.append(functions.add_data_directory(entry))
+                # list binary and CSV versions of the same file only once
+                if entry.endswith(const.PROCESSED_DATA_BINARY_FILE_TYPE):
+                    entry = entry[:-len(const.PROCESSED_DATA_BINARY_FILE_TYPE)] + \
+                                const.PROCESSED_DATA_FILE_TYPE
+                fileName = functions.add_data_directory(entry)
+                if fileName not in files:
+                    files.append(fileName)
 
         return files
 
-    def __convert_units(self, data, sensorsInitialised):
-        """Converts the units of the raw data file to ones that are more 
-        appropriate for the usage.
+    def delete_processed_data_files(self, rawFileNames, entries=None):
+        """Deletes the processed data files, in both formats, for several raw 
+        data files at once.
+
+        Rather than checking whether each file exists, the names are looked up 
+        in a single listing of the data directory.
 
         Args:
-            data (list[str]): a line of data read from the raw data file.
-            sensorsInitialised (list[bool]): tracks whether each sensor has been 
-                initialised yet, and therefore if it is outputting values.
+            rawFileNames (list[str]): names of the raw data files whose 
+                processed data files should be deleted.
+            entries (set[str], optional): names of the files in the data 
+                directory, if they have already been listed. Defaults to None, 
+                in which case the directory is listed here.
 
         Returns:
-            list[str]: the data in the correct units for the processed data 
-                file.
+            int: number of raw data files whose processed data was deleted.
         """
 
-        # convert data from strings into numerical values
-        for i in range(0, len(data)):
-            data[i] = float(data[i])
-        
-        # subtract offsets
-        if sensorsInitialised[0]:
-            data[1:4] = np.subtract(data[1:4], const.SENSOR_OFFSETS[1:4])
-        else:
-            data[1:4] = np.multiply(data[1:4], 0)
-        if sensorsInitialised[1]:
-            data[4:7] = np.subtract(data[4:7], const.SENSOR_OFFSETS[4:7])
-        else:
-            data[4:7] = np.multiply(data[4:7], 0)
-        if sensorsInitialised[2]:
-            data[7:10] = np.subtract(data[7:10], const.SENSOR_OFFSETS[7:10])
-        else:
-            data[7:10] = np.multiply(data[7:10], 0)
+        if entries == None:
+            entries = set(storage.list_directory(self.DATA_DIRECTORY))
 
-        # change the units
-        newData = []
-        
-        newData.append(data[0]/1000) # time changes from milliseconds to seconds
-        newData.extend(data[1:4]) # linear acceleration stays in m/s^2
-        newData.extend(np.deg2rad(data[4:7])) # angular velocity changes from deg/s to rad/s
-        newData.extend([value%(2*np.pi) for value in np.deg2rad(data[7:])]) # euler angles change from degrees to radians
+        count = 0
+        for rawFileName in rawFileNames:
+            processedFileName = functions.raw_to_processed(
+                                    rawFileName[const.LENGTH_OF_DATA_DIR:])
+
+            deleted = 0
+            for entry in [processedFileName,
+                            functions.processed_to_binary(processedFileName)]: # remove both formats
+                if entry in entries:
+                    storage.remove(os.path.join(self.DATA_DIRECTORY, entry))
+                    deleted = 1
+            count += deleted
+
+        return count
+
+    def export_processed_data_files(self):
+        """Writes a CSV version of every processed data file, so it can be 
+        viewed or used outside of this program.
+
+        Returns:
+            int: number of files exported.
+        """
+
+        count = 0
+        for fileName in self.get_all_processed_files():
+            try:
+                filePath = Throw(fileName).export_csv()
+            except FileNotFoundError as e:
+                print("Processed data file could not be found:", e)
+            else:
+                print("  Exported " + filePath)
+                count += 1
+
+        print("Finished: {} processed data files exported".format(count))
+        return count
+
+    def split_all_raw_data_files(self):
+        """Splits every healthy raw data file in the data directory that holds 
+        several throws into a tracker entry for each throw.
+
+        Returns:
+            int: number of throws found in the files that were split.
+        """
+
+        G = global_tracker.get_tracker(False)
+        count = 0
+
+        for entry in storage.list_directory(self.DATA_DIRECTORY):
+            rawFileName = os.path.join(self.DATA_DIRECTORY, entry) \
+                            [const.PATH_LENGTH_TO_DATA_DIR:]
+
+            # only split raw data files if they've been marked as healthy
+            if entry[:len(const.RAW_DATA_PREFIX)] == const.RAW_DATA_PREFIX:
+                if G.get_health_status(rawFileName) >= const.passedWithWarnings:
+                    count += len(self.split_raw_data_file(rawFileName))
+
+        print("Finished: {} throws found in raw data files with more than one"
+                .format(count))
+        return count
+
+    def split_raw_data_file(self, rawFileName):
+        """Splits a raw data file that holds several throws into a tracker 
+        entry for each throw.
+
+        The samples where the ball is moving are found for the whole file at 
+        once (in the same way as the flight is found when a processed data 
+        file is created). Runs of movement separated by at least 
+        const.SPLIT_MINIMUM_GAP_SAMPLES samples at rest are separate throws, 
+        and runs shorter than const.SPLIT_MINIMUM_THROW_SAMPLES are ignored.
+
+        Each throw is added to the tracker as a segment of the raw data file, 
+        named after the lines it is made of (see 
+        'functions.segment_file_name'), with the same health status as the 
+        file. No data is copied - the processed data file for each throw is 
+        made from those lines of the raw data file. Segments from any previous 
+        split of the file are removed from the tracker.
+
+        Args:
+            rawFileName (str): name of the raw data file.
+
+        Returns:
+            list[str]: names of the segments, or an empty list if the file 
+                holds fewer than two throws.
+        """
+
+        try:
+            data = self.__read_raw_data(rawFileName)
+        except FileNotFoundError as e:
+            print("Raw data file could not be found:", e)
+            return []
+        except ValueError as e:
+            print("Raw data file could not be read:", e)
+            return []
 
-        # convert each element back into a string
-        for i in range(len(data)):
-            newData[i] = str(newData[i])
+        fileData, sensorsInitialised = self.__prepare_raw_data(data)
+        _, moving = self.__find_movement(fileData, sensorsInitialised)
+        movingSamples = np.flatnonzero(moving)
 
-        return newData
+        # a throw ends wherever the gap to the next moving sample is long enough
+        gaps = np.flatnonzero(np.diff(movingSamples) > const.SPLIT_MINIMUM_GAP_SAMPLES)
+        starts = movingSamples[np.concatenate(([0], gaps + 1))] if len(movingSamples) else movingSamples
+        ends = movingSamples[np.concatenate((gaps, [len(movingSamples) - 1]))] + 1 \
+                    if len(movingSamples) else movingSamples
 
-    def __write_data_to_file(self, header, data):
-        """Writes a column of data to the processed data file.
+        isThrow = ends - starts >= const.SPLIT_MINIMUM_THROW_SAMPLES
+        starts, ends = starts[isThrow], ends[isThrow]
 
-        File to write to is decided by the attribute 'fileName'. The contents of 
-        the file is stored in a list and the relevant data is appended to the 
-        list. Then the new list is written back to the file.
+        G = global_tracker.get_tracker(False)
+
+        # forget any previous split of the file
+        G.remove_files([fileName for fileName in G.get_file_names()
+                            if functions.parse_segment_file_name(fileName)[0] == rawFileName
+                            and fileName != rawFileName])
+
+        if len(starts) < 2:
+            print("{} holds {} throw(s), not split".format(rawFileName, len(starts)))
+            return []
+
+        # keep some samples at rest either side of each throw
+        margin = const.SEGMENT_MARGIN_SAMPLES
+        starts = np.maximum(starts - margin, 0)
+        ends = np.minimum(ends + margin, len(fileData))
+
+        # rows of data are lines of the file, unless the file has blank lines
+        lines = self.__find_data_lines(rawFileName)
+        segmentFileNames = [functions.segment_file_name(rawFileName, lines[start],
+                                                        lines[end - 1] + 1)
+                                for start, end in zip(starts, ends)]
+
+        healthStatus = G.get_health_status(rawFileName)
+        if healthStatus < 0:
+            healthStatus = const.untested
+        G.add_files({fileName: healthStatus for fileName in segmentFileNames})
+
+        print("Split {} into {} throws".format(rawFileName, len(segmentFileNames)))
+        return segmentFileNames
+
+    def __find_data_lines(self, rawFileName):
+        """Private method to find which line of a raw data file each row of 
+        data is on, as blank lines are skipped when the file is read. Files 
+        stored as binary records have no blank lines - each record is a line.
 
         Args:
-            header (str): name of column header.
-            data (list[str]): data to write to the file.
+            rawFileName (str): name of the raw data file.
 
         Returns:
-            int: '1' signifies successful completion of method.
+            np.ndarray: index of the line of each row of data.
         """
 
-        filePath = const.DATA_DIRECTORY + self.file_name.split("\\")[-1]
+        rawFilePath = const.DATA_DIRECTORY + rawFileName[const.LENGTH_OF_DATA_DIR:]
+        if records.is_binary(rawFileName):
+            with storage.open_file(rawFilePath, "rb") as f:
+                return np.arange(f.seek(0, os.SEEK_END) // const.RECORD_SIZE)
+
+        with storage.open_file(rawFilePath) as f:
+            isData = np.array([len(line.strip()) > 0 for line in f], dtype=bool)
 
-        with open(filePath) as f: # read only
-            processed_file = csv.reader(f)
+        return np.flatnonzero(isData)
 
-            # for tracking during loop
-            fileData = []
+    def __find_movement(self, data, sensorsInitialised):
+        """Private method to find the samples where the ball is moving, using 
+        every line of the converted data at once.
 
-            # store first line of file in list - remove line break and split into a list
-            fileData.append(f.readline()[:-1].split(","))
-            fileData[0].append(header)
+        The acceleration of the ball at rest is taken from the first few 
+        samples after the sensors initialise. The ball is moving at any sample 
+        where the magnitude of its acceleration differs from that by more than 
+        const.SEGMENT_ACCELERATION_THRESHOLD, or it is spinning about e_r faster 
+        than const.SEGMENT_SPIN_THRESHOLD.
 
-            for row in processed_file:
-                # ignore blank rows
-                if len(row) < const.NUMBER_OF_COLUMNS:
-                    continue
+        Args:
+            data (np.ndarray): the converted data, with one row per line of the 
+                raw data file.
+            sensorsInitialised (np.ndarray): whether each of the three sensors 
+                had been initialised at each line. One row per line.
 
-                # add another empty column
-                fileData.append(list(row))
-                fileData[-1].append(str(data[processed_file.line_num-1]))
+        Returns:
+            tuple: index of the first line where all the sensors have 
+                initialised, and whether the ball is moving at each line.
+        """
 
-            with open(filePath, "w", newline="") as f: # writeable
-                processed_file = csv.writer(f)
-                processed_file.writerows(fileData) # write amended data to tracker file
-            
-            return 1
+        length = len(data)
+
+        allInitialised = np.all(sensorsInitialised, axis=1)
+        initialised = int(np.argmax(allInitialised)) if np.any(allInitialised) else length
+
+        accelerationMagnitude = np.linalg.norm(data[:, 1:4], axis=1)
+        restSamples = accelerationMagnitude[initialised:initialised+const.SEGMENT_REST_SAMPLES]
+        restAcceleration = np.median(restSamples) if len(restSamples) else 0
+
+        accelerationChange = np.abs(accelerationMagnitude - restAcceleration)
+        moving = (accelerationChange > const.SEGMENT_ACCELERATION_THRESHOLD) | \
+                    (np.abs(data[:, 4]) > const.SEGMENT_SPIN_THRESHOLD)
+        moving[:initialised] = False
+
+        return initialised, moving
+
+    def __find_segments(self, data, sensorsInitialised):
+        """Finds where the sensors initialise, and where the flight of the ball 
+        starts and ends, using every line of the converted data at once.
+
+        The flight runs from the first sample where the ball is moving (see 
+        '__find_movement') to the last, plus a margin either side. If the ball 
+        is never moving, the flight is taken to be every sample after the 
+        sensors initialise.
+
+        Args:
+            data (np.ndarray): the converted data, with one row per line of the 
+                raw data file.
+            sensorsInitialised (np.ndarray): whether each of the three sensors 
+                had been initialised at each line. One row per line.
+
+        Returns:
+            dict[str, int]: index of the first line where all the sensors have 
+                initialised ("initialised"), the first line of the flight 
+                ("launch"), and the line after the end of the flight 
+                ("landing").
+        """
+
+        length = len(data)
+        initialised, moving = self.__find_movement(data, sensorsInitialised)
+
+        if not np.any(moving):
+            return {"initialised": initialised, "launch": initialised, "landing": length}
+
+        launch = int(np.argmax(moving))
+        landing = length - int(np.argmax(moving[::-1])) # line after the last moving sample
+
+        return {
+            "initialised": initialised,
+            "launch": max(launch - const.SEGMENT_MARGIN_SAMPLES, initialised),
+            "landing": min(landing + const.SEGMENT_MARGIN_SAMPLES, length)
+        }
+
+    def __prepare_raw_data(self, data):
+        """Private method to convert the data read from a raw data file, 
+        ignoring sensors that haven't initialised.
+
+        Args:
+            data (np.ndarray): data read from the raw data file, with one row 
+                per line.
+
+        Returns:
+            tuple: the converted data, and whether each of the three sensors 
+                had initialised at each line.
+        """
+
+        # process sensor data only if sensors have initialised
+        sensorsInitialised = functions.find_sensors_initialised(data)
+        
+        return functions.convert_units(data, sensorsInitialised), sensorsInitialised
+
+    def __read_raw_data(self, rawFileName):
+        """Private method to read a raw data file into an array, with one row 
+        per line (or record, if it's stored as binary records). If the name is 
+        of a segment of a raw data file, only the lines of the segment are 
+        read.
+
+        Args:
+            rawFileName (str): name of the raw data file, or of a segment.
+
+        Raises:
+            FileNotFoundError: raised if the raw data file does not exist.
+            ValueError: raised if the raw data file can't be read.
+
+        Returns:
+            np.ndarray: the data in the file.
+        """
+
+        sourceFileName, start, end = functions.parse_segment_file_name(rawFileName)
+        rawFilePath = const.DATA_DIRECTORY + sourceFileName[const.LENGTH_OF_DATA_DIR:]
+
+        if records.is_binary(sourceFileName):
+            data, errors, _ = records.read_file(rawFilePath)
+            if len(errors) > 0:
+                raise ValueError("record {}: {}".format(*errors[0]))
+            data = data[start:end]
+        elif start == None:
+            with storage.open_file(rawFilePath) as f:
+                data = np.loadtxt(f, delimiter=",", ndmin=2)
+        else:
+            with storage.open_file(rawFilePath) as f:
+                data = np.loadtxt(itertools.islice(f, start, end), delimiter=",", ndmin=2)
+
+        return data.reshape(-1, const.NUMBER_OF_COLUMNS) # in case the file is empty
+
+
+def _create_processed_data_file(rawFileName):
+    """Creates a processed data file for a raw data file, without updating the 
+    tracker. Used by the processes that create processed data files in 
+    parallel, so it must be a module level function.
+
+    Args:
+        rawFileName (str): name of the raw data file.
+
+    Returns:
+        tuple: change to make to the tracker, as (file name, column number, 
+            data), or None if the file wasn't created.
+    """
+
+    P = ProcessedData(True)
+    processedFileName = P.create_single_processed_data_file(rawFileName,
+                                                            updateTracker=False)
+    if processedFileName == None:
+        return None
+
+    return (rawFileName, 2, processedFileName)
 
 
 class _Individual:
@@ -373,6 +724,11 @@ class _Individual:
     Attributes:
         fileName (str): name of the processed data file to be worked on.
         filePath (str): full file path to the given processed data file.
+        __throw (Throw): data in the processed data file, loaded into memory 
+            the first time it is needed.
+        __calculations (_Calculations): the 'calculations' methods, kept for 
+            as long as this object so that any settings made on them (e.g. the 
+            integration method of a column) are used by 'calculate'.
         
     Methods:
         __init__ : class constructor.
@@ -380,43 +736,68 @@ class _Individual:
         file_path (property) : getter for the attribute of the same name.
         raw_file_name (property) : getter for the name of the raw day file 
             corresponding to the processed data file.
+        throw (property) : getter for the data in the processed data file.
         set_file_name : setter for attribute of the same name.
         add_column : adds a new column to the processed data file.
+        calculate : runs calculations, and any others they depend on, on the 
+            processed data file.
         delete_file : deletes a given processed data file
         get_column_number : returns the column number of a given heading.
         get_health_status : checks if a raw data file is marked as healthy in 
             the global tracker.
         graph_sensor_data : produces graphs of raw (unfiltered) and/or filtered 
             (smoothened) sensor data.
+        plan_calculations : works out which calculations need to run, and in 
+            what order.
         populate_column : populates/ updates an existing column in the processed 
             data file.
-        write_to_file : overwrites an entry already listed in the file.
+        write_to_file : writes all changes made in memory to the file.
+        __add_to_plan : adds a calculation, and the ones it depends on, to a 
+            plan.
         __make_graph : produces a graph based on parameters passed to it.
     """
 
-    def __init__(self, fileName):
+    def __init__(self, fileName, throw=None, integrationMethods=None):
         """Constructor for class.
 
         Args:
             fileName (str): name of the processed data files
+            throw (Throw, optional): data already loaded from the processed 
+                data file, so it can be shared between objects. Defaults to 
+                None, in which case it is loaded when first needed.
+            integrationMethods (dict[str, str], optional): integration method 
+                to use for each calculation (or column), keyed by its name - 
+                see 'calculations.set_integration_method'. Defaults to None, 
+                which uses const.DEFAULT_INTEGRATION_METHOD for all of them.
+
+        Raises:
+            ValueError: raised if an integration method is not recognised.
         """
 
         self.fileName = fileName
+        self.__throw = throw
+        self.__calculations = _Calculations(fileName, throw)
+
+        for name, method in (integrationMethods or {}).items():
+            self.__calculations.set_integration_method(name, method)
 
     @property
     def calculations(self):
-        """Creates instance of _Calculations as an object of _Individual.
+        """Getter for the instance of _Calculations that belongs to this 
+        object.
         
-        Creates an instance of the '_Calculations' class as an object 
-        called 'self.calculations', where 'self' is the name of the instance of 
-        '_Individual'. Parameters passeed to '_Calculations' are as set by the 
-        '_Individual' class attributes.
+        The same instance is returned every time, so that its registry, and 
+        any settings made on it, are the ones used by 'calculate'. It is kept 
+        on the same file, and the same data in memory, as this object.
 
         Returns:
             _Calculations object: instance of class
         """
         
-        return _Calculations(self.fileName)
+        self.__calculations.set_file_name(self.fileName)
+        if self.__throw != None:
+            self.__calculations.throw = self.__throw
+        return self.__calculations
 
     @property
     def file_path(self):
@@ -444,6 +825,21 @@ class _Individual:
         
         return functions.processed_to_raw(self.fileName)
 
+    @property
+    def throw(self):
+        """Getter for the data in the processed data file.
+
+        The file is read the first time this is called, and the same object is 
+        returned until the file name changes.
+
+        Returns:
+            Throw: data in the processed data file.
+        """
+
+        if self.__throw == None or self.__throw.fileName != self.fileName:
+            self.__throw = Throw(self.fileName)
+        return self.__throw
+
 
     def set_file_name(self, value):
         """Setter for the attribute of the same name.Name of the processed data 
@@ -459,67 +855,80 @@ class _Individual:
         self.fileName = functions.raw_to_processed(value)
         return self.fileName
 
-    def add_column(self, operation):
+    def add_column(self, operation, flush=True):
         """Adds another column to the processed data file and populates it with 
         values returned from the 'operation' method.
 
-        First checks what the operation is - for all operations this method 
-        iterates once, but for 'smooth', it iterates 10 times, one for each 
-        column. Iterates through each line and saves the data in a list. For the 
-        header, the name of the new heading gets appended, and for every other 
-        row, the value from the operation gets appended. Then the data get 
-        written back to the processed data file.
+        The column is added to the data held in memory, and then the changes 
+        get written back to the processed data file. To add the columns of a 
+        calculation in the registry (along with any columns it depends on), use 
+        'calculate' instead.
 
         Args:
             operation (method (str)): the method that calculates the metric for 
                 the entry.
+            flush (bool, optional): set 'False' to keep the changes in memory, 
+                so that several columns can be added before the file is written 
+                with 'write_to_file'. Defaults to True.
 
         Returns:
             int: 1 to signify completion of method.
         """
 
-        # exception is thrown upon completion of group operations
-        try:
-            header = operation(fileName=self.fileName, heading=True)
-        except UniqueCaseException:
-            return 1
+        self.populate_column(operation)
 
-        if operation.__name__ == "smooth":
-            iterations = len(const.COLUMN_HEADERS)-1
-        else:
-            iterations = 1
+        if flush:
+            self.write_to_file()
+
+        return 1
+
+    def calculate(self, calculations, flush=True):
+        """Adds/updates the columns of the given calculations in the processed 
+        data file.
 
-        for _ in range (0, iterations):
-            header = operation(heading=True)
+        Works out a plan of which calculations to run - the ones asked for, plus 
+        any that add a column they need which isn't in the file yet. Each one 
+        is run once, after all the calculations it depends on, and the columns 
+        are added to the data held in memory. All the changes then get written 
+        back to the processed data file at once.
+
+        Args:
+            calculations (list[str]): names of the calculations, as listed in 
+                'calculations.registry'.
+            flush (bool, optional): set 'False' to keep the changes in memory, 
+                so that the file is only written with 'write_to_file'. Defaults 
+                to True.
 
-            with open(self.file_path) as f: # read only
-                processed_file = csv.reader(f)
+        Returns:
+            int: 1 to signify completion of method, 0 otherwise.
+        """
 
-                # if heading not in top row, add heading
-                if "," + header not in next(f):
-                    f.seek(0)
+        registry = self.calculations.registry
 
-                    # for tracking during loop
-                    fileData = []
+        try:
+            throw = self.throw.load()
+        except FileNotFoundError:
+            print("Couldn't open file:", self.fileName)
+            return 0
 
-                    # store first line of file in list - remove line break and split into a list
-                    fileData.append(f.readline()[:-1].split(","))
-                    fileData[0].append(header)
+        try:
+            plan = self.plan_calculations(calculations)
+        except ValueError as e:
+            print(e)
+            return 0
 
-                    for row in processed_file:
-                        # ignore blank rows
-                        if len(row) < const.NUMBER_OF_COLUMNS:
-                            continue
+        for name in plan:
+            print("  Calculating '{}'...".format(name))
+            columns = registry[name]["method"](throw=throw)
+            if columns == None: # if calculation failed
+                return 0
+            for columnHeading, values in columns.items():
+                throw.set_column(columnHeading, values)
 
-                        # add another empty column
-                        fileData.append(list(row))
-                        fileData[-1].append("")
+        if flush:
+            self.write_to_file()
 
-                    with open(self.filePath, "w", newline="") as f: # writeable
-                        processed_file = csv.writer(f)
-                        processed_file.writerows(fileData) # write amended data to tracker file
-                
-                self.populate_column(operation)
+        return 1
 
     def delete_file(self, filePath):
         """Deletes a given processed data file.
@@ -533,12 +942,14 @@ class _Individual:
 
         # ensure we're using processed data file, not raw data
         filePath = functions.raw_to_processed(filePath)
+        binaryFilePath = functions.processed_to_binary(filePath)
 
-        if os.path.exists(filePath):
-            os.remove(filePath)
-            return 1
-        else:
-            return 0
+        deleted = 0
+        for path in [filePath, binaryFilePath]: # remove both formats
+            if storage.remove(path):
+                deleted = 1
+
+        return deleted
 
     def get_column_headers(self):
         """Returns a list of all the column headers in any given processed data 
@@ -552,8 +963,7 @@ class _Individual:
         """
 
         try:
-            with open(self.file_path) as f:
-                headers = f.readline()[:-1].split(",")
+            headers = self.throw.headers
         except FileNotFoundError:
             print("File could not be found")
             return []
@@ -563,9 +973,9 @@ class _Individual:
     def get_column_number(self, columnHeading):
         """Returns the column number associated with a given heading.
 
-        Opens the processed data file, and iterates through the first row to 
-        find a match. If found, the index of the column is returned. Else, a 
-        ValueError is raised.
+        Looks up the heading in the headers of the data loaded from the 
+        processed data file. If found, the index of the column is returned. 
+        Else, a ValueError is raised.
 
         Args:
             columnHeading (str): name of column to be found.
@@ -577,18 +987,7 @@ class _Individual:
             int: index of column.
         """
 
-        with open(self.file_path) as f:
-            processed_file = csv.reader(f)
-
-            # find column number
-            columnNumber = 0
-            for row in processed_file:
-                for heading in row:
-                    if heading == columnHeading:
-                        return columnNumber # stop when heading is found
-                    else:
-                        columnNumber += 1
-                raise ValueError("Column heading not found")
+        return self.throw.get_column_number(columnHeading)
 
     def get_health_status(self):
         """Gets the health status of the raw data file corresponding to the 
@@ -600,7 +999,7 @@ class _Individual:
 
         rawFileName = self.raw_file_name
 
-        G = global_tracker.GlobalFile(fullInitialisation = False)
+        G = global_tracker.get_tracker(fullInitialisation = False)
         return G.get_health_status(rawFileName)
 
     def graph(self, x_title, y_titles, title=""):
@@ -626,32 +1025,15 @@ class _Individual:
 
         # check if file exists
         try:
-            f = open(self.file_path)
+            throw = self.throw.load()
         except FileNotFoundError as e:
             print("Processed data file could not be found:", e)
             return 0
 
-        csv_file = csv.reader(f)
-
-        # create variables to store data - vertical axis may have multiple values
-        x_data = []
-        y_data =  [[] for title in y_titles]
-        columnNumber_x = self.get_column_number(x_title)
-        columnNumbers_y = [self.get_column_number(title) for title in y_titles]
-
-        # read first line and add headings to a list
-        firstLine = f.readline()[:-1].split(",")
-        x_data.append(firstLine[columnNumber_x])
-        for i in range(len(y_titles)):
-            y_data[i].append(firstLine[columnNumbers_y[i]])
-    
-        # add data from the rest of the file to the list so it can be plotted
-        for row in csv_file:
-            x_data.append(float(row[columnNumber_x]))
-            for i in range(len(y_titles)):
-                y_data[i].append(float(row[columnNumbers_y[i]]))
-            
-        f.close()
+        # store data with headings first - vertical axis may have multiple values
+        x_data = [x_title] + list(throw.get_column(x_title))
+        y_data = [[y_title] + list(throw.get_column(y_title))
+                    for y_title in y_titles]
 
         # generate title if none is given
         if title == "":
@@ -681,29 +1063,14 @@ class _Individual:
         """
         
         try:
-            f = open(self.file_path)
+            throw = self.throw.load()
         except FileNotFoundError as e:
             print("Processed data file could not be found:", e)
             return 0
 
-        columnNumber_x = self.get_column_number("pos (x)")
-        columnNumber_y = self.get_column_number("pos (y)")
-
-        csv_file = csv.reader(f)
-        x_data = []
-        y_data =  []
-
-        # read first line and add headings to a list
-        firstLine = f.readline()[:-1].split(",")
-        x_data.append(firstLine[columnNumber_x])
-        y_data.append(firstLine[columnNumber_y])
-    
-        # add data from the rest of the file to the list so it can be plotted
-        for row in csv_file:
-            x_data.append(float(row[columnNumber_x]))
-            y_data.append(float(row[columnNumber_y]))
-            
-        f.close()
+        # store data with headings first
+        x_data = ["pos (x)"] + list(throw.get_column("pos (x)"))
+        y_data = ["pos (y)"] + list(throw.get_column("pos (y)"))
 
         title = "Flight path of Ball (Height against Distance)"
 
@@ -733,37 +1100,27 @@ class _Individual:
             print("No data to be plotted. Check parameters.")
             return None
 
-        for i in range(0, 7, 3): # repeat once for each sensor
-            try:
-                f = open(self.file_path)
-            except FileNotFoundError as e:
-                print("Processed data file could not be found:", e)
-                return 0
+        try:
+            throw = self.throw.load()
+        except FileNotFoundError as e:
+            print("Processed data file could not be found:", e)
+            return 0
 
-            csv_file = csv.reader(f)
-            time = []
+        headers = throw.headers
+
+        for i in range(0, 7, 3): # repeat once for each sensor
+            time = [headers[0]] + list(throw.get_column(headers[0]))
             # three sublists for filtered data, three for unfiltered
             data =  [[] for j in range(3 * (filtered + unfiltered))]
 
-            # read first line and add headings to a list
-            firstLine = f.readline()[:-1].split(",")
-            time.append(firstLine[0])
+            # add headings, followed by the data, to a list so it can be plotted
             for j in range(0, 3):
                 if unfiltered:
-                    data[j-3].append(firstLine[i+j+1])
+                    header = headers[i+j+1]
+                    data[j-3] = [header] + list(throw.get_column(header))
                 if filtered:
-                    data[j].append(firstLine[i+len(const.COLUMN_HEADERS)+j+1])
-        
-            # add data from the rest of the file to the list so it can be plotted
-            for row in csv_file:
-                time.append(float(row[0]))
-                for j in range(0, 3):
-                    if unfiltered:
-                        data[j-3].append(float(row[i+j+1]))
-                    if filtered:
-                        data[j].append(float(row[i+len(const.COLUMN_HEADERS)+j+1]))
-
-            f.close()
+                    header = headers[i+len(const.COLUMN_HEADERS)+j+1]
+                    data[j] = [header] + list(throw.get_column(header))
 
             y_data = [[] for j in range(3)]
             
@@ -785,13 +1142,90 @@ class _Individual:
 
         return 1
 
+    def plan_calculations(self, calculations):
+        """Works out which calculations need to be run, and in what order, to 
+        add the columns of the given calculations to the processed data file.
+
+        A calculation is run if it was asked for, or if one of the calculations 
+        asked for depends on it (directly or not), and either it adds a column 
+        that a calculation being run needs but isn't in the file yet, or it 
+        needs a column that a calculation being run changes. Every calculation 
+        appears once, after all the calculations it depends on.
+
+        Args:
+            calculations (list[str]): names of the calculations, as listed in 
+                'calculations.registry'.
+
+        Raises:
+            ValueError: raised if a calculation is not in the registry, or if 
+                the calculations depend on each other in a loop.
+
+        Returns:
+            list[str]: names of the calculations to run, in order.
+        """
+
+        registry = self.calculations.registry
+
+        for name in calculations:
+            if name not in registry:
+                raise ValueError("Unknown calculation: {}".format(name))
+
+        # calculation that adds each column
+        producers = {}
+        for name, calculation in registry.items():
+            for column in calculation["outputs"]:
+                producers[column] = name
+
+        # calculations that add the columns each calculation needs
+        dependencies = {}
+        for name, calculation in registry.items():
+            dependencies[name] = [producers[column] for column in calculation["inputs"]
+                                    if column in producers]
+
+        # every calculation that the ones asked for depend on, directly or not
+        upstream = []
+        pending = list(calculations)
+        while pending:
+            for dependency in dependencies[pending.pop()]:
+                if dependency not in upstream:
+                    upstream.append(dependency)
+                    pending.append(dependency)
+
+        # repeat until no more calculations need to be run
+        needed = list(calculations)
+        changed = True
+        while changed:
+            changed = False
+            for name in upstream:
+                if name in needed:
+                    continue
+
+                # columns needed by the calculations being run
+                inputs = [column for other in needed
+                            for column in registry[other]["inputs"]]
+                missing = [column for column in registry[name]["outputs"]
+                            if column in inputs and not self.throw.has_column(column)]
+                changes = [dependency for dependency in dependencies[name]
+                            if dependency in needed]
+
+                if missing or changes:
+                    needed.append(name)
+                    changed = True
+
+        # order so that each calculation is run after the ones it depends on
+        plan = []
+        for name in needed:
+            self.__add_to_plan(name, needed, dependencies, plan, [])
+
+        return plan
+
     def populate_column(self, operation):
         """Populates/updates an existing column in the processed data file with 
         values returned from the 'operation' method.
 
-        First determines which column needs to be updated by reading the header. 
-        Then iterates through each line and overwrites the data in the relevant 
-        column.
+        Gets the heading of the column and calculates its values, then adds 
+        them to the data held in memory, replacing the column if it already 
+        exists. The file itself is not written until 'write_to_file' is called.
 
         Args:
             operation (method (str)): the method that calculates the values for 
@@ -802,58 +1236,60 @@ class _Individual:
         """
 
         columnHeading = operation(heading=True)
-        values = operation(self.fileName)
+        values = operation(self.fileName, throw=self.throw)
         
-        # get column number of given header
-        try:
-            columnNumber = self.get_column_number(columnHeading)
-        except ValueError as e: # if column not found
-            print(e)
+        if values is None: # if calculation failed
             return 0
 
-        self.write_to_file(columnNumber, values)
+        self.throw.set_column(columnHeading, values)
 
         return 1
 
-    def write_to_file(self, columnNumber, data):
-        """Writes the data passed to this method to a given column in the 
+    def write_to_file(self):
+        """Writes all the changes made to the data in memory back to the 
         processed data file.
         
-        Saves the data in the file as a list, and adds the data to the list, 
-        before writing the list back to the file. Note that the first 
-
-        Args:
-            columnNumber (int): the column in the row to be overwritten.
-            data list[(any)]: data to write into file, elements get cast into a 
-                string.
+        The whole file is written in one go, so this should be called once 
+        after all the columns have been added, rather than after each one.
 
         Returns:
-            bool: signifies complete execution of method.
+            bool: 'True' if the file was written, 'False' if there were no 
+                changes to write.
         """
 
-        with open(self.file_path, "r") as f: # read only
-            processed_file = csv.reader(f)
+        return self.throw.write_to_file()
 
-            # for tracking during loop
-            fileData = []
-            
-            
-            firstLine = f.readline()[:-1].split(",")
-            fileData.append(firstLine)
 
-            for i, row in enumerate(processed_file, start=1):
-                # ignore blank rows
-                if len(row) < const.NUMBER_OF_COLUMNS:
-                    continue
+    def __add_to_plan(self, name, needed, dependencies, plan, visiting):
+        """Private method to add a calculation to a plan, after adding the 
+        calculations it depends on.
+
+        Args:
+            name (str): name of the calculation.
+            needed (list[str]): names of all the calculations to be run.
+            dependencies (dict[str, list[str]]): calculations that each 
+                calculation depends on.
+            plan (list[str]): calculations to run, in order. Updated in place.
+            visiting (list[str]): calculations whose dependencies are being 
+                added, used to detect loops.
 
-                fileData.append(list(row))
-                fileData[i][columnNumber] = data[i-1]
+        Raises:
+            ValueError: raised if the calculations depend on each other in a 
+                loop.
+        """
+
+        if name in plan: # each calculation is only run once
+            return
+        if name in visiting:
+            raise ValueError("Calculation '{}' depends on itself".format(name))
 
-        with open(self.file_path, "w", newline="") as f: # writeable
-            tracker_file = csv.writer(f)
-            tracker_file.writerows(fileData) # write amended data to tracker file
-        return True
+        visiting.append(name)
+        for dependency in dependencies[name]:
+            if dependency in needed:
+                self.__add_to_plan(dependency, needed, dependencies, plan, visiting)
+        visiting.remove(name)
 
+        plan.append(name)
 
     def __make_graph(self, x_data, y_data, title=""):
         """Produces a graph based on the data passed in as parameters.
@@ -911,29 +1347,33 @@ class _Calculations:
     Attributes:
         fileName (str): name of the processed data file to be worked on.
         filePath (str): full file path to the given processed data file.
-        columnNumber (int): the number of the column to smooth (should be 
-            between 1 and 10 inclusive).
-        columnData (list[]): can be used to store data for other methods, if 
-            necessary
+        throw (Throw): data in the processed data file, held in memory.
+        integrationMethods (dict[str, str]): integration method used to 
+            calculate each column, if it is not the default.
         
     Methods:
         __init__ : class constructor.
         file_path (property) : getter for the attribute of the same name.
+        registry (property) : getter for the calculations that can be run, and 
+            the columns they need and add.
         set_file_name : setter for attribute of the same name.
+        get_throw : gets the data to do calculations on.
+        set_integration_method : chooses the integration method used to 
+            calculate a given column, or every column of a calculation.
         ball_centred_velocities : calculates the velocities of the ball in 
             ball-centered coordinates.
         cartesian_positions : calculates the position of the ball in cartesian 
             coordinates.
         cartesian_acceleration : calculates the acceleration of the ball in 
             cartesian coordinates.
+        cartesian_velocities : calculates the velocity of the ball in cartesian 
+            coordinates.
         delta_time : calculates the time step between each sample.
         smooth : runs the raw sensor data through a low pass filter to smooth 
             it.
-        __integrate : does numerical integration on a dataset using Simpson's 
-            rule.
-        __acc_x : returns list of acceleration values in x direction.
-        __acc_y : returns list of acceleration values in y direction.
-        __acc_z : returns list of acceleration values in z direction.
+        __calculate_columns : runs several single column operations.
+        __integrate : does numerical integration on a dataset, using the 
+            method chosen for the column being calculated.
         __pos_x : integrates velocity values (x) to get the spatial coordinate 
             in that direction.
         __pos_y : integrates velocity values (y) to get the spatial coordinate 
@@ -951,16 +1391,19 @@ class _Calculations:
         __vel_z : returns list of velocity values in z direction.
     """
 
-    def __init__(self, fileName=""):
+    def __init__(self, fileName="", throw=None):
         """Constructor for class.
 
         Args:
             fileName (str, optional): name of file to do calculations on. 
                 Defaults to "".
+            throw (Throw, optional): data already loaded from the processed 
+                data file. Defaults to None, in which case it is loaded when 
+                first needed.
         """
         self.fileName = fileName
-        self.columnNumber = 1
-        self.columnData = [] # empty for use as when needed
+        self.throw = throw
+        self.integrationMethods = {} # integration method for each column, if not the default
     
     @property
     def file_path(self):
@@ -976,6 +1419,49 @@ class _Calculations:
         self.filePath = const.DATA_DIRECTORY + self.fileName[const.LENGTH_OF_DATA_DIR:]
         return self.filePath
 
+    @property
+    def registry(self):
+        """Getter for the calculations that add columns to a processed data 
+        file.
+
+        Each calculation lists the columns it needs to already be in the data, 
+        the columns it adds, and the method that calculates them. The method 
+        returns the values of all of its columns, keyed by column heading.
+
+        Returns:
+            dict[str, dict]: details of each calculation, keyed by its name.
+        """
+
+        return {
+            "smooth": {
+                "inputs": ["[raw] " + heading for heading in const.COLUMN_HEADERS[1:]],
+                "outputs": const.COLUMN_HEADERS[1:],
+                "method": self.smooth
+            },
+            "ball centred velocities": {
+                "inputs": ["time", "acc (e_r)", "acc (e_theta)", "acc (e_phi)"],
+                "outputs": ["vel (e_r)", "vel (e_theta)", "vel (e_phi)"],
+                "method": self.ball_centred_velocities
+            },
+            "cartesian acceleration": {
+                "inputs": ["acc (e_r)", "acc (e_theta)", "acc (e_phi)",
+                            "euler (alpha)", "euler (beta)", "euler (gamma)"],
+                "outputs": ["acc (x)", "acc (y)", "acc (z)"],
+                "method": self.cartesian_acceleration
+            },
+            "cartesian velocities": {
+                "inputs": ["time", "acc (x)", "acc (y)", "acc (z)"],
+                "outputs": ["vel (x)", "vel (y)", "vel (z)"],
+                "method": self.cartesian_velocities
+            },
+            "cartesian positions": {
+                "inputs": ["time", "vel (x)", "vel (y)", "vel (z)"],
+                "outputs": ["pos (x)", "pos (y)", "pos (z)"],
+                "method": self.cartesian_positions
+            }
+        }
+
+
     def set_file_name(self, value):
         """Setter for the attribute of the same name.
 
@@ -989,290 +1475,191 @@ class _Calculations:
         self.fileName = functions.raw_to_processed(value)
         return self.fileName
 
-
-    def ball_centred_velocities(self, fileName=None, **kwargs):
-        """Runs the separate operations that calculate the ball-centered 
-        velocities.
-
-        Sets the name of the file to operate on, and then checks to see if all 
-        the columns that are required exist within the file, and if not, gets 
-        them added. Then calls the individual methods to calculate each of the 
-        velocities. Raises an exception to stop execution of 
-        individual.add_column method with this method as an argument.
+    def get_throw(self, fileName=None, throw=None):
+        """Gets the data to do calculations on, loading it from the processed 
+        data file if it is not already in memory.
 
         Args:
-            fileName (str, optional): name of the file to do calculations for.
+            fileName (str, optional): name of the file to do calculations for. 
+                Defaults to None, in which case the current file is used.
+            throw (Throw, optional): data already loaded from the processed 
+                data file. Defaults to None.
 
         Raises:
-            UniqueCaseException: raised to terminate execution of 
-                individual.add_column method with this operation as an argument
+            FileNotFoundError: raised if the data has to be loaded, but the 
+                processed data file does not exist.
+
+        Returns:
+            Throw: data in the processed data file.
         """
 
-        if fileName == None:
-            fileName = self.fileName
-        else:
+        if throw != None:
+            self.throw = throw
+            self.set_file_name(throw.fileName)
+        elif fileName != None:
             self.set_file_name(fileName)
 
-        I = ProcessedData().individual
-        I.set_file_name(fileName)
+        if self.throw == None or self.throw.fileName != self.fileName:
+            self.throw = Throw(self.fileName)
 
-        # list of columns headers that need to be in the file already
-        dependencies = {
-            "acc (e_r)": self.smooth,
-            "acc (e_theta)": self.smooth,
-            "acc (e_phi)": self.smooth
-        }
-
-        # if dependency not in the file already, add them before calculating this column
-        for key, value in dependencies.items():
-            try:
-                I.get_column_number(key)
-            except ValueError:
-                print("Column '{}' missing. Adding it to tracker file".format(key))
-                I.add_column(value)
-
-        # call functions to calculate each velocity
-        I.add_column(self.__vel_e_r)
-        I.add_column(self.__vel_e_theta)
-        I.add_column(self.__vel_e_phi)
-
-        raise UniqueCaseException
+        return self.throw.load()
 
-    def cartesian_acceleration(self, fileName=None, **kwargs):
-        """Calculates and produces a list of accelerations at each time in the 
-        processed data file, and runs each of the separate operations that write 
-        the data to the appropriate processed data file.
-        
-        Sets the name of the file to operate on, and then checks to see if all 
-        the columns that are required exist within the file, and if not, gets 
-        them added. Then calculates the values of the operation, and stores them 
-        in a list. Then, calls the individual methods to calculate each of the 
-        accelerations. Raises an exception to stop execution of 
-        individual.add_column method with this method as an argument. Note that 
-        operations are all calculated in one go to reduce algorithmic 
-        complexity.
+    def set_integration_method(self, name, method):
+        """Chooses the numerical integration method used to calculate a given 
+        column, e.g. 'vel (x)', or every column added by a given calculation, 
+        e.g. 'cartesian velocities'.
 
         Args:
-            fileName (str, optional): name of the file to do calculations for.
+            name (str): heading of the column, or name of the calculation as 
+                listed in the registry.
+            method (str): one of the methods listed in 
+                const.INTEGRATION_METHODS.
 
         Raises:
-            UniqueCaseException: raised to terminate execution of 
-                individual.add_column method with this operation as an argument
+            ValueError: raised if the integration method is not recognised.
+
+        Returns:
+            str: the method chosen.
         """
 
-        if fileName == None:
-            fileName = self.fileName
+        if method not in const.INTEGRATION_METHODS:
+            raise ValueError("Unknown integration method: {}".format(method))
+
+        registry = self.registry
+        if name in registry:
+            for columnHeading in registry[name]["outputs"]:
+                self.integrationMethods[columnHeading] = method
         else:
-            self.set_file_name(fileName)
+            self.integrationMethods[name] = method
+        return method
 
-        I = ProcessedData().individual
-        I.set_file_name(fileName)
-
-        # list of columns headers that need to be in the file already
-        dependencies = {
-            "acc (e_r)": self.smooth,
-            "acc (e_theta)": self.smooth,
-            "acc (e_phi)": self.smooth,
-            "euler (alpha)": self.ball_centred_velocities,
-            "euler (beta)": self.ball_centred_velocities,
-            "euler (gamma)": self.ball_centred_velocities
-        }
+    def ball_centred_velocities(self, fileName=None, throw=None):
+        """Calculates the ball-centered velocities.
 
-        # if dependency not in the file already, add them before calculating this column
-        for key, value in dependencies.items():
-            try:
-                I.get_column_number(key)
-            except ValueError:
-                print("Column '{}' missing. Adding it to tracker file".format(key))
-                I.add_column(value)
-        
+        Calls the individual methods to calculate each of the velocities. The 
+        smoothed accelerations must already be in the data - the order that 
+        calculations are run in is worked out by 'individual.calculate'.
 
-        # column numbers of each column in processed data file
-        columnNumbers = [I.get_column_number("acc (e_r)"),
-                            I.get_column_number("acc (e_theta)"),
-                            I.get_column_number("acc (e_phi)"),
-                            I.get_column_number("euler (alpha)"),
-                            I.get_column_number("euler (beta)"),
-                            I.get_column_number("euler (gamma)")]
-        
-        # variables to store data
-        #timesteps = []
-        velocities = np.zeros(3)
-        angles = np.zeros(3)
-        self.columnData = [[], [], []]
+        Args:
+            fileName (str, optional): name of the file to do calculations for.
+            throw (Throw, optional): data in memory to do calculations on. 
+                Defaults to None, in which case it is loaded from the file.
+
+        Returns:
+            dict[str, list[float]]: values of each new column, keyed by the 
+                column heading, or None if the file couldn't be opened.
+        """
 
         try:
-            with open(self.file_path) as f:
-                csv_file = csv.reader(f)
-                next(f)
-                
-                for row in csv_file:
-                    # store time, velocities and euler angles
-                    for i in range(0, 3):
-                        velocities[i] = float(row[columnNumbers[i]])
-                        angles[i] = float(row[columnNumbers[i+3]])
-
-                    dcm = functions.generate_dcm(angles[0], angles[1], angles[2])
-                    data = velocities.dot(dcm)
-                    for i in range(0, 3):
-                        self.columnData[i].append(data[i])
-                    
+            throw = self.get_throw(fileName, throw)
         except FileNotFoundError:
             print("Couldn't open file:", fileName)
+            return None
 
-        I.add_column(self.__acc_x)
-        I.add_column(self.__acc_y)
-        I.add_column(self.__acc_z)
-
-        self.columnData = [] # reset attribute to empty array
-
-        raise UniqueCaseException
+        # call functions to calculate each velocity
+        return self.__calculate_columns(throw, [self.__vel_e_r,
+                                                    self.__vel_e_theta,
+                                                    self.__vel_e_phi])
 
-    def cartesian_positions(self, fileName=None, **kwargs):
-        """Runs the separate operations that calculate the ball's coordinates in 
-        Cartesian space.
+    def cartesian_acceleration(self, fileName=None, throw=None):
+        """Calculates the accelerations at each time in the processed data file, 
+        in cartesian coordinates.
 
-        Sets the name of the file to operate on, and then checks to see if all 
-        the columns that are required exist within the file, and if not, gets 
-        them added. Then calls the individual methods to calculate each of the 
-        coordinates. Raises an exception to stop execution of 
-        individual.add_column method with this method as an argument.
+        Rotates the smoothed ball-centred accelerations by the smoothed Euler 
+        angles at each sample. All three accelerations are calculated in one go 
+        to reduce algorithmic complexity.
 
         Args:
             fileName (str, optional): name of the file to do calculations for.
+            throw (Throw, optional): data in memory to do calculations on. 
+                Defaults to None, in which case it is loaded from the file.
 
-        Raises:
-            UniqueCaseException: raised to terminate execution of 
-                individual.add_column method with this operation as an argument
+        Returns:
+            dict[str, list[float]]: values of each new column, keyed by the 
+                column heading, or None if the file couldn't be opened.
         """
 
-        if fileName == None:
-            fileName = self.fileName
-        else:
-            self.set_file_name(fileName)
-
-        I = ProcessedData().individual
-        I.set_file_name(fileName)
+        try:
+            throw = self.get_throw(fileName, throw)
+        except FileNotFoundError:
+            print("Couldn't open file:", fileName)
+            return None
 
-        # list of columns headers that need to be in the file already
-        dependencies = {
-            "vel (x)": self.cartesian_velocities,
-            "vel (y)": self.cartesian_velocities,
-            "vel (z)": self.cartesian_velocities
+        # accelerations at each sample, one row per sample
+        accelerations = np.column_stack([throw.get_column("acc (e_r)"),
+                                            throw.get_column("acc (e_theta)"),
+                                            throw.get_column("acc (e_phi)")])
+        
+        # rotate every sample at once, rather than one matrix at a time
+        dcm = functions.generate_dcm_stack(throw.get_column("euler (alpha)"),
+                                            throw.get_column("euler (beta)"),
+                                            throw.get_column("euler (gamma)"))
+        data = functions.rotate_vectors(accelerations, dcm)
+
+        return {
+            "acc (x)": data[:,0],
+            "acc (y)": data[:,1],
+            "acc (z)": data[:,2]
         }
 
-        # if dependency not in the file already, add them before calculating this column
-        for key, value in dependencies.items():
-            try:
-                I.get_column_number(key)
-            except ValueError:
-                print("Column '{}' missing. Adding it to tracker file".format(key))
-                I.add_column(value)
-
-        # call functions to calculate each position
-        I.add_column(self.__pos_x)
-        I.add_column(self.__pos_y)
-        I.add_column(self.__pos_z)
-
-        raise UniqueCaseException
+    def cartesian_positions(self, fileName=None, throw=None):
+        """Calculates the ball's coordinates in Cartesian space.
 
-    def cartesian_velocities(self, fileName=None, **kwargs):
-        """Runs the separate operations that calculate the ball's velocities in 
-        Cartesian space.
-
-        Sets the name of the file to operate on, and then checks to see if all 
-        the columns that are required exist within the file, and if not, gets 
-        them added. Then calls the individual methods to calculate each of the 
-        velocities. Raises an exception to stop execution of 
-        individual.add_column method with this method as an argument.
+        Calls the individual methods to calculate each of the coordinates. The 
+        cartesian velocities must already be in the data - the order that 
+        calculations are run in is worked out by 'individual.calculate'.
 
         Args:
             fileName (str, optional): name of the file to do calculations for.
+            throw (Throw, optional): data in memory to do calculations on. 
+                Defaults to None, in which case it is loaded from the file.
 
-        Raises:
-            UniqueCaseException: raised to terminate execution of 
-                individual.add_column method with this operation as an argument
+        Returns:
+            dict[str, list[float]]: values of each new column, keyed by the 
+                column heading, or None if the file couldn't be opened.
         """
 
-        if fileName == None:
-            fileName = self.fileName
-        else:
-            self.set_file_name(fileName)
-
-        I = ProcessedData().individual
-        I.set_file_name(fileName)
-
-        # list of columns headers that need to be in the file already
-        dependencies = {
-            "acc (x)": self.cartesian_acceleration,
-            "acc (y)": self.cartesian_acceleration,
-            "acc (z)": self.cartesian_acceleration
-        }
-
-        # if dependency not in the file already, add them before calculating this column
-        for key, value in dependencies.items():
-            try:
-                I.get_column_number(key)
-            except ValueError:
-                print("Column '{}' missing. Adding it to tracker file".format(key))
-                I.add_column(value)
-
-        # call functions to calculate each velocity
-        I.add_column(self.__vel_x)
-        I.add_column(self.__vel_y)
-        I.add_column(self.__vel_z)
+        try:
+            throw = self.get_throw(fileName, throw)
+        except FileNotFoundError:
+            print("Couldn't open file:", fileName)
+            return None
 
-        raise UniqueCaseException
+        # call functions to calculate each position
+        return self.__calculate_columns(throw, [self.__pos_x,
+                                                    self.__pos_y,
+                                                    self.__pos_z])
 
-    def delta_time(self, fileName=None, heading=False):
-        """Calculates the time step between consecutive samples of sensor data.
+    def cartesian_velocities(self, fileName=None, throw=None):
+        """Calculates the ball's velocities in Cartesian space.
 
-        If the 'heading' parameter is 'True', the method simply returns the 
-        heading for this column. Otherwise, the values for this column are 
-        calculated.
+        Calls the individual methods to calculate each of the velocities. The 
+        cartesian accelerations must already be in the data - the order that 
+        calculations are run in is worked out by 'individual.calculate'.
 
         Args:
-            fileName (str): name of the file to do calculations for.
-            heading (bool): set this to 'True' if only the heading title is 
-                wanted. Set 'False' to actually calculate the value. Defaults to 
-                False.
+            fileName (str, optional): name of the file to do calculations for.
+            throw (Throw, optional): data in memory to do calculations on. 
+                Defaults to None, in which case it is loaded from the file.
 
         Returns:
-            list[float]: time steps between samples, maintaining the same 
-                dimension as the input data.
+            dict[str, list[float]]: values of each new column, keyed by the 
+                column heading, or None if the file couldn't be opened.
         """
 
-        if heading:
-            return "delta time" # title of column in processed data file
-
-        if fileName == None:
-            fileName = self.fileName
-        else:
-            self.set_file_name(fileName)
-    
-        data = []
-        columnNumber = 0
-
         try:
-            with open(self.file_path) as f:
-                csv_file = csv.reader(f)
-                firstLine = f.readline()[:-1].split(",")
-                data.append(firstLine[columnNumber])
-                for row in csv_file:
-                    data.append(float(row[columnNumber]))
+            throw = self.get_throw(fileName, throw)
         except FileNotFoundError:
             print("Couldn't open file:", fileName)
-            return 0
-
-        output = [0]
-        for i in range(2, len(data)):
-            output.append(data[i]-data[i-1])
+            return None
 
-        return output
+        # call functions to calculate each velocity
+        return self.__calculate_columns(throw, [self.__vel_x,
+                                                    self.__vel_y,
+                                                    self.__vel_z])
 
-    def smooth(self, fileName=None, heading=False):
-        """Smoothens one of the columns of the processed data file and adds the 
-        data as a new column.
+    def delta_time(self, fileName=None, heading=False, throw=None):
+        """Calculates the time step between consecutive samples of sensor data.
 
         If the 'heading' parameter is 'True', the method simply returns the 
         heading for this column. Otherwise, the values for this column are 
@@ -1283,163 +1670,136 @@ class _Calculations:
             heading (bool): set this to 'True' if only the heading title is 
                 wanted. Set 'False' to actually calculate the value. Defaults to 
                 False.
+            throw (Throw, optional): data in memory to do calculations on. 
+                Defaults to None, in which case it is loaded from the file.
 
         Returns:
-            list[float]: smoothed values of the same dimension as the input 
-                data.
+            np.ndarray: time steps between samples, maintaining the same 
+                dimension as the input data.
         """
 
-        # make sure columnNumber is within range - only operate over raw data columns
-        if self.columnNumber >= const.NUMBER_OF_COLUMNS:
-            self.columnNumber = 1
-
         if heading:
-            return const.COLUMN_HEADERS[self.columnNumber]
-
-        if fileName == None:
-            fileName = self.fileName
-        else:
-            self.set_file_name(fileName)
-        
-        data = []
+            return "delta time" # title of column in processed data file
 
         try:
-            f = open(self.file_path)
+            throw = self.get_throw(fileName, throw)
         except FileNotFoundError:
             print("Couldn't open file:", fileName)
             return None
 
-        csv_file = csv.reader(f)
-
-        # skip header
-        next(f)
+        data = throw.get_column("time")
 
-        for row in csv_file:
-            data.append(float(row[self.columnNumber]))
-        f.close()
+        # first sample has no previous sample, so its time step is 0
+        return np.diff(data, prepend=data[:1])
 
+    def smooth(self, fileName=None, throw=None):
+        """Smoothens all the raw sensor data columns of the processed data 
+        file, in one pass.
 
-        # smooth data
-        windowSize = 4
-        if self.columnNumber <=3:
-            smoothed = functions.gaussian_smooth(data, 1)
-        elif self.columnNumber <= 6:
-            smoothed = functions.gaussian_smooth(data, 2)
-        else:
-            #self.columnNumber >= 7 # for the euler angles, choose an angle close to previous
-            for i in range(1, len(data)):
-                while data[i]-data[i-1] > np.pi:
-                    data[i] -= 2*np.pi
-                while data[i]-data[i-1] < -np.pi:
-                    data[i] += 2*np.pi
-            smoothed = [0] * (windowSize-1) + functions.moving_average(data, windowSize)
-            for i in range(len(smoothed)):
-                smoothed[i] = smoothed[i] % (2 * np.pi)
-        #else:
-        #    smoothed = [0] * (windowSize-1) + functions.moving_average(data, windowSize)
-
-        
-        self.columnNumber += 1 # increment
-        return smoothed
-  
-    def __acc_x(self, fileName=None, heading=False):
-        """Returns the x acceleration (cartesian coordinates) between 
-        consecutive samples of sensor data.
-
-        If the 'heading' parameter is 'True', the method simply returns the 
-        heading for this column. Otherwise, the precalculated values for this 
-        column are returned.
+        The raw sensor data is read as one 2D array, with a column for each 
+        sensor reading. The accelerations and angular velocities are smoothed 
+        with Gaussian filters. The Euler angles are unwrapped (so each angle is 
+        close to the previous one), smoothed with a moving average and then 
+        wrapped back to between 0 and 2pi.
 
         Args:
-            fileName (str): name of the file to do calculations for.
-            heading (bool): set this to 'True' if only the heading title is 
-                wanted. Set 'False' to return the value. Defaults to False.
+            fileName (str, optional): name of the file to do calculations for.
+            throw (Throw, optional): data in memory to do calculations on. 
+                Defaults to None, in which case it is loaded from the file.
 
         Returns:
-            list[float]: x acceleration at each sample, maintaining the same 
-                dimension as the input data.
+            dict[str, list[float]]: smoothed values of each column, keyed by the 
+                column heading, or None if the file couldn't be opened.
         """
 
-        if heading:
-            return "acc (x)" # title of column in processed data file
+        try:
+            throw = self.get_throw(fileName, throw)
+        except FileNotFoundError:
+            print("Couldn't open file:", fileName)
+            return None
 
-        output = self.columnData[0]
-        return output
+        # raw data, with one column for each sensor reading
+        headers = const.COLUMN_HEADERS[1:]
+        data = np.column_stack([throw.get_column("[raw] " + heading)
+                                for heading in headers])
     
-    def __acc_y(self, fileName=None, heading=False):
-        """Returns the y acceleration (cartesian coordinates) between 
-        consecutive samples of sensor data.
-
-        If the 'heading' parameter is 'True', the method simply returns the 
-        heading for this column. Otherwise, the precalculated values for this 
-        column are returned.
-
-        Args:
-            fileName (str): name of the file to do calculations for.
-            heading (bool): set this to 'True' if only the heading title is 
-                wanted. Set 'False' to return the value. Defaults to False.
-
-        Returns:
-            list[float]: y acceleration at each sample, maintaining the same 
-                dimension as the input data.
-        """
+        # smooth data
+        windowSize = 4
+        smoothed = np.empty_like(data)
+        smoothed[:,0:3] = functions.gaussian_smooth(data[:,0:3], 1, axis=0)
+        smoothed[:,3:6] = functions.gaussian_smooth(data[:,3:6], 2, axis=0)
+        # for the euler angles, choose an angle close to previous
+        angles = np.unwrap(data[:,6:9], axis=0)
+        smoothed[:,6:9] = functions.padded_moving_average(angles, windowSize) % (2 * np.pi)
 
-        if heading:
-            return "acc (y)" # title of column in processed data file
+        columns = {}
+        for i, heading in enumerate(headers):
+            columns[heading] = smoothed[:,i]
 
-        output = self.columnData[1]
-        return output
-    
-    def __acc_z(self, fileName=None, heading=False):
-        """Returns the z acceleration (cartesian coordinates) between 
-        consecutive samples of sensor data.
+        return columns
 
-        If the 'heading' parameter is 'True', the method simply returns the 
-        heading for this column. Otherwise, the precalculated values for this 
-        column are returned.
+    def __calculate_columns(self, throw, operations):
+        """Private method to run several single column operations on the same 
+        data.
 
         Args:
-            fileName (str): name of the file to do calculations for.
-            heading (bool): set this to 'True' if only the heading title is 
-                wanted. Set 'False' to return the value. Defaults to False.
+            throw (Throw): data in memory to do calculations on.
+            operations (list[method]): methods that each calculate the values of 
+                one column.
 
         Returns:
-            list[float]: z acceleration at each sample, maintaining the same 
-                dimension as the input data.
+            dict[str, list[float]]: values of each column, keyed by the column 
+                heading, or None if any of the calculations failed.
         """
 
-        if heading:
-            return "acc (z)" # title of column in processed data file
+        columns = {}
+        for operation in operations:
+            columnHeading = operation(heading=True)
+            values = operation(throw=throw)
+            if values is None: # if calculation failed
+                return None
+            columns[columnHeading] = values
 
-        output = self.columnData[2]
-        return output
+        return columns
+    
 
-    def __integrate(self, data, times, initialValue=0.0):
-        """Calculates numerical integration for a given dataset using Simpson's 
-        rule.
+    def __integrate(self, data, times, initialValue=0.0, columnHeading=None):
+        """Calculates numerical integration for a given dataset, using the 
+        method chosen for the column being calculated.
 
         For each element in the dataset, calculates the integral of the data up 
-        to that point and adds it to a list. Returns the integrated data.
+        to that point, in a single pass over the data. Returns the integrated 
+        data.
 
         Args:
             data (list[float]): data to be integrated.
             times (list[int]): time of each sample of 'data'.
             initialValue (float, optional): initial offset for integration. 
                 Defaults to 0.
+            columnHeading (str, optional): heading of the column being 
+                calculated, used to choose the integration method. Defaults to 
+                None, which uses the default method.
+
+        Raises:
+            ValueError: raised if the integration method is not recognised.
 
         Returns:
             list[float]: integrated values
         """
 
-        output = []
+        method = self.integrationMethods.get(columnHeading,
+                                                const.DEFAULT_INTEGRATION_METHOD)
 
-        for i in range (1, len(times)+1):
-            value = scipy.integrate.simpson(data[:i], x=times[:i], even="last")
-            output.append(value+initialValue)
+        if method == "simpson":
+            output = functions.cumulative_simpson(data, times, initialValue)
+        elif method == "trapezoid":
+            output = functions.cumulative_trapezoid(data, times, initialValue)
+        else:
+            raise ValueError("Unknown integration method: {}".format(method))
 
-        return output   
+        return list(output)
    
-    def __pos_x(self, fileName=None, heading=False):
+    def __pos_x(self, fileName=None, heading=False, throw=None):
         """Calculates the x position (cartesian coordinates) at each sample of 
         sensor data.
 
@@ -1451,6 +1811,8 @@ class _Calculations:
             fileName (str): name of the file to do calculations for.
             heading (bool): set this to 'True' if only the heading title is 
                 wanted. Set 'False' to return the value. Defaults to False.
+            throw (Throw, optional): data in memory to do calculations on. 
+                Defaults to None, in which case it is loaded from the file.
 
         Returns:
             list[float]: x position at each sample, maintaining the same 
@@ -1460,33 +1822,21 @@ class _Calculations:
         if heading:
             return "pos (x)" # title of column in processed data file
 
-        if fileName == None:
-            fileName = self.fileName
-        else:
-            self.set_file_name(fileName)
-
-        I = ProcessedData().individual
-        I.set_file_name(fileName)
-        columnNumber_time = 0
-        columnNumber = I.get_column_number("vel (x)")
-        times = []
-        data = []
-
-        # store file data in a list
         try:
-            with open(self.file_path) as f:
-                csv_file = csv.reader(f)
-                next(f)
-                for row in csv_file:
-                    times.append(float(row[columnNumber_time]))
-                    data.append(float(row[columnNumber]))
+            throw = self.get_throw(fileName, throw)
         except FileNotFoundError:
             print("Couldn't open file:", fileName)
+            return None
 
-        output = self.__integrate(data, times) # integrate velocity data
+        # get data from memory
+        times = throw.get_column("time")
+        data = throw.get_column("vel (x)")
+
+        # integrate velocity data
+        output = self.__integrate(data, times, columnHeading="pos (x)")
         return output
        
-    def __pos_y(self, fileName=None, heading=False):
+    def __pos_y(self, fileName=None, heading=False, throw=None):
         """Calculates the y position (cartesian coordinates) at each sample of 
         sensor data.
 
@@ -1498,6 +1848,8 @@ class _Calculations:
             fileName (str): name of the file to do calculations for.
             heading (bool): set this to 'True' if only the heading title is 
                 wanted. Set 'False' to return the value. Defaults to False.
+            throw (Throw, optional): data in memory to do calculations on. 
+                Defaults to None, in which case it is loaded from the file.
 
         Returns:
             list[float]: y position at each sample, maintaining the same 
@@ -1507,33 +1859,21 @@ class _Calculations:
         if heading:
             return "pos (y)" # title of column in processed data file
 
-        if fileName == None:
-            fileName = self.fileName
-        else:
-            self.set_file_name(fileName)
-
-        I = ProcessedData().individual
-        I.set_file_name(fileName)
-        columnNumber_time = 0
-        columnNumber = I.get_column_number("vel (y)")
-        times = []
-        data = []
-
-        # store file data in a list
         try:
-            with open(self.file_path) as f:
-                csv_file = csv.reader(f)
-                next(f)
-                for row in csv_file:
-                    times.append(float(row[columnNumber_time]))
-                    data.append(float(row[columnNumber]))
+            throw = self.get_throw(fileName, throw)
         except FileNotFoundError:
             print("Couldn't open file:", fileName)
+            return None
+
+        # get data from memory
+        times = throw.get_column("time")
+        data = throw.get_column("vel (y)")
 
-        output = self.__integrate(data, times) # integrate velocity data
+        # integrate velocity data
+        output = self.__integrate(data, times, columnHeading="pos (y)")
         return output
        
-    def __pos_z(self, fileName=None, heading=False):
+    def __pos_z(self, fileName=None, heading=False, throw=None):
         """Calculates the z position (cartesian coordinates) at each sample of 
         sensor data.
 
@@ -1545,6 +1885,8 @@ class _Calculations:
             fileName (str): name of the file to do calculations for.
             heading (bool): set this to 'True' if only the heading title is 
                 wanted. Set 'False' to return the value. Defaults to False.
+            throw (Throw, optional): data in memory to do calculations on. 
+                Defaults to None, in which case it is loaded from the file.
 
         Returns:
             list[float]: z position at each sample, maintaining the same 
@@ -1554,33 +1896,21 @@ class _Calculations:
         if heading:
             return "pos (z)" # title of column in processed data file
 
-        if fileName == None:
-            fileName = self.fileName
-        else:
-            self.set_file_name(fileName)
-
-        I = ProcessedData().individual
-        I.set_file_name(fileName)
-        columnNumber_time = 0
-        columnNumber = I.get_column_number("vel (z)")
-        times = []
-        data = []
-
-        # store file data in a list
         try:
-            with open(self.file_path) as f:
-                csv_file = csv.reader(f)
-                next(f)
-                for row in csv_file:
-                    times.append(float(row[columnNumber_time]))
-                    data.append(float(row[columnNumber]))
+            throw = self.get_throw(fileName, throw)
         except FileNotFoundError:
             print("Couldn't open file:", fileName)
+            return None
+
+        # get data from memory
+        times = throw.get_column("time")
+        data = throw.get_column("vel (z)")
 
-        output = self.__integrate(data, times) # integrate velocity data
+        # integrate velocity data
+        output = self.__integrate(data, times, columnHeading="pos (z)")
         return output
   
-    def __vel_e_r(self, fileName=None, heading=False):
+    def __vel_e_r(self, fileName=None, heading=False, throw=None):
         """Calculates the e_r velocity (ball-centred coordinates) between 
         consecutive samples of sensor data.
 
@@ -1593,6 +1923,8 @@ class _Calculations:
             heading (bool): set this to 'True' if only the heading title is 
                 wanted. Set 'False' to actually calculate the value. Defaults to 
                 False.
+            throw (Throw, optional): data in memory to do calculations on. 
+                Defaults to None, in which case it is loaded from the file.
 
         Returns:
             list[float]: e_r velocity at each sample, maintaining the same 
@@ -1602,33 +1934,21 @@ class _Calculations:
         if heading:
             return "vel (e_r)" # title of column in processed data file
 
-        if fileName == None:
-            fileName = self.fileName
-        else:
-            self.set_file_name(fileName)
-
-        I = ProcessedData().individual
-        I.set_file_name(fileName)
-        columnNumber_time = 0
-        columnNumber = I.get_column_number("acc (e_r)")
-        times = []
-        data = []
-
-        # store file data in a list
         try:
-            with open(self.file_path) as f:
-                csv_file = csv.reader(f)
-                next(f)
-                for row in csv_file:
-                    times.append(float(row[columnNumber_time]))
-                    data.append(float(row[columnNumber]))
+            throw = self.get_throw(fileName, throw)
         except FileNotFoundError:
             print("Couldn't open file:", fileName)
+            return None
 
-        output = self.__integrate(data, times) # integrate acceleration data
+        # get data from memory
+        times = throw.get_column("time")
+        data = throw.get_column("acc (e_r)")
+
+        # integrate acceleration data
+        output = self.__integrate(data, times, columnHeading="vel (e_r)")
         return output
 
-    def __vel_e_theta(self, fileName=None, heading=False):
+    def __vel_e_theta(self, fileName=None, heading=False, throw=None):
         """Calculates the e_theta velocity (ball-centred coordinates) between 
         consecutive samples of sensor data.
 
@@ -1641,6 +1961,8 @@ class _Calculations:
             heading (bool): set this to 'True' if only the heading title is 
                 wanted. Set 'False' to actually calculate the value. Defaults to 
                 False.
+            throw (Throw, optional): data in memory to do calculations on. 
+                Defaults to None, in which case it is loaded from the file.
 
         Returns:
             list[float]: e_theta velocity at each sample, maintaining the same 
@@ -1650,33 +1972,21 @@ class _Calculations:
         if heading:
             return "vel (e_theta)" # title of column in processed data file
 
-        if fileName == None:
-            fileName = self.fileName
-        else:
-            self.set_file_name(fileName)
-
-        I = ProcessedData().individual
-        I.set_file_name(fileName)
-        columnNumber_time = 0
-        columnNumber = I.get_column_number("acc (e_theta)")
-        times = []
-        data = []
-
-        # store file data in a list
         try:
-            with open(self.file_path) as f:
-                csv_file = csv.reader(f)
-                next(f)
-                for row in csv_file:
-                    times.append(float(row[columnNumber_time]))
-                    data.append(float(row[columnNumber]))
+            throw = self.get_throw(fileName, throw)
         except FileNotFoundError:
             print("Couldn't open file:", fileName)
+            return None
+
+        # get data from memory
+        times = throw.get_column("time")
+        data = throw.get_column("acc (e_theta)")
 
-        output = self.__integrate(data, times) # integrate acceleration data
+        # integrate acceleration data
+        output = self.__integrate(data, times, columnHeading="vel (e_theta)")
         return output
 
-    def __vel_e_phi(self, fileName=None, heading=False):
+    def __vel_e_phi(self, fileName=None, heading=False, throw=None):
         """Calculates the e_phi velocity (ball-centred coordinates) between 
         consecutive samples of sensor data.
 
@@ -1689,6 +1999,8 @@ class _Calculations:
             heading (bool): set this to 'True' if only the heading title is 
                 wanted. Set 'False' to actually calculate the value. Defaults to 
                 False.
+            throw (Throw, optional): data in memory to do calculations on. 
+                Defaults to None, in which case it is loaded from the file.
 
         Returns:
             list[float]: e_phi velocity at each sample, maintaining the same 
@@ -1698,33 +2010,21 @@ class _Calculations:
         if heading:
             return "vel (e_phi)" # title of column in processed data file
 
-        if fileName == None:
-            fileName = self.fileName
-        else:
-            self.set_file_name(fileName)
-
-        I = ProcessedData().individual
-        I.set_file_name(fileName)
-        columnNumber_time = 0
-        columnNumber = I.get_column_number("acc (e_phi)")
-        times = []
-        data = []
-
-        # store file data in a list
         try:
-            with open(self.file_path) as f:
-                csv_file = csv.reader(f)
-                next(f)
-                for row in csv_file:
-                    times.append(float(row[columnNumber_time]))
-                    data.append(float(row[columnNumber]))
+            throw = self.get_throw(fileName, throw)
         except FileNotFoundError:
             print("Couldn't open file:", fileName)
+            return None
 
-        output = self.__integrate(data, times) # integrate acceleration data
+        # get data from memory
+        times = throw.get_column("time")
+        data = throw.get_column("acc (e_phi)")
+
+        # integrate acceleration data
+        output = self.__integrate(data, times, columnHeading="vel (e_phi)")
         return output
    
-    def __vel_x(self, fileName=None, heading=False):
+    def __vel_x(self, fileName=None, heading=False, throw=None):
         """Calculates the x velocity (cartesian coordinates) at each sample of 
         sensor data.
 
@@ -1736,6 +2036,8 @@ class _Calculations:
             fileName (str): name of the file to do calculations for.
             heading (bool): set this to 'True' if only the heading title is 
                 wanted. Set 'False' to return the value. Defaults to False.
+            throw (Throw, optional): data in memory to do calculations on. 
+                Defaults to None, in which case it is loaded from the file.
 
         Returns:
             list[float]: x velocity at each sample, maintaining the same 
@@ -1745,33 +2047,21 @@ class _Calculations:
         if heading:
             return "vel (x)" # title of column in processed data file
 
-        if fileName == None:
-            fileName = self.fileName
-        else:
-            self.set_file_name(fileName)
-
-        I = ProcessedData().individual
-        I.set_file_name(fileName)
-        columnNumber_time = 0
-        columnNumber = I.get_column_number("acc (x)")
-        times = []
-        data = []
-
-        # store file data in a list
         try:
-            with open(self.file_path) as f:
-                csv_file = csv.reader(f)
-                next(f)
-                for row in csv_file:
-                    times.append(float(row[columnNumber_time]))
-                    data.append(float(row[columnNumber]))
+            throw = self.get_throw(fileName, throw)
         except FileNotFoundError:
             print("Couldn't open file:", fileName)
+            return None
+
+        # get data from memory
+        times = throw.get_column("time")
+        data = throw.get_column("acc (x)")
 
-        output = self.__integrate(data, times) # integrate acceleration data
+        # integrate acceleration data
+        output = self.__integrate(data, times, columnHeading="vel (x)")
         return output
        
-    def __vel_y(self, fileName=None, heading=False):
+    def __vel_y(self, fileName=None, heading=False, throw=None):
         """Calculates the y velocity (cartesian coordinates) at each sample of 
         sensor data.
 
@@ -1783,6 +2073,8 @@ class _Calculations:
             fileName (str): name of the file to do calculations for.
             heading (bool): set this to 'True' if only the heading title is 
                 wanted. Set 'False' to return the value. Defaults to False.
+            throw (Throw, optional): data in memory to do calculations on. 
+                Defaults to None, in which case it is loaded from the file.
 
         Returns:
             list[float]: y velocity at each sample, maintaining the same 
@@ -1792,33 +2084,21 @@ class _Calculations:
         if heading:
             return "vel (y)" # title of column in processed data file
 
-        if fileName == None:
-            fileName = self.fileName
-        else:
-            self.set_file_name(fileName)
-
-        I = ProcessedData().individual
-        I.set_file_name(fileName)
-        columnNumber_time = 0
-        columnNumber = I.get_column_number("acc (y)")
-        times = []
-        data = []
-
-        # store file data in a list
         try:
-            with open(self.file_path) as f:
-                csv_file = csv.reader(f)
-                next(f)
-                for row in csv_file:
-                    times.append(float(row[columnNumber_time]))
-                    data.append(float(row[columnNumber]))
+            throw = self.get_throw(fileName, throw)
         except FileNotFoundError:
             print("Couldn't open file:", fileName)
+            return None
 
-        output = self.__integrate(data, times) # integrate acceleration data
+        # get data from memory
+        times = throw.get_column("time")
+        data = throw.get_column("acc (y)")
+
+        # integrate acceleration data
+        output = self.__integrate(data, times, columnHeading="vel (y)")
         return output
        
-    def __vel_z(self, fileName=None, heading=False):
+    def __vel_z(self, fileName=None, heading=False, throw=None):
         """Calculates the z velocity (cartesian coordinates) at each sample of 
         sensor data.
 
@@ -1830,6 +2110,8 @@ class _Calculations:
             fileName (str): name of the file to do calculations for.
             heading (bool): set this to 'True' if only the heading title is 
                 wanted. Set 'False' to return the value. Defaults to False.
+            throw (Throw, optional): data in memory to do calculations on. 
+                Defaults to None, in which case it is loaded from the file.
 
         Returns:
             list[float]: z velocity at each sample, maintaining the same 
@@ -1839,30 +2121,18 @@ class _Calculations:
         if heading:
             return "vel (z)" # title of column in processed data file
 
-        if fileName == None:
-            fileName = self.fileName
-        else:
-            self.set_file_name(fileName)
-
-        I = ProcessedData().individual
-        I.set_file_name(fileName)
-        columnNumber_time = 0
-        columnNumber = I.get_column_number("acc (z)")
-        times = []
-        data = []
-
-        # store file data in a list
         try:
-            with open(self.file_path) as f:
-                csv_file = csv.reader(f)
-                next(f)
-                for row in csv_file:
-                    times.append(float(row[columnNumber_time]))
-                    data.append(float(row[columnNumber]))
+            throw = self.get_throw(fileName, throw)
         except FileNotFoundError:
             print("Couldn't open file:", fileName)
+            return None
+
+        # get data from memory
+        times = throw.get_column("time")
+        data = throw.get_column("acc (z)")
 
-        output = self.__integrate(data, times) # integrate acceleration data
+        # integrate acceleration data
+        output = self.__integrate(data, times, columnHeading="vel (z)")
         return output
 
 
@@ -1879,6 +2149,11 @@ class _Ensemble: # DOCSTRING
 class _Metrics:
     """Object that calculates all the metrics for the global tracker.
 
+    Each metric is a reduction of one or more columns of a processed data file 
+    to a single value. The metrics are listed in 'registry', along with the 
+    columns they need, so that any number of metrics can be calculated for a 
+    throw by reading only those columns, once.
+
     Attributes:
         fileName (str) : name of the file to calculate the metric for
         filePath (str) : file path to the file which will be operated on
@@ -1886,12 +2161,18 @@ class _Metrics:
     Methods:
         __init__ : constructor for class
         file_path (property) : getter for the attribute of the same name
+        registry (property) : getter for the metrics that can be calculated
         set_file_name : setter for the attribute of the same name
-        all : runs all methods in this class that calculate a metric
+        calculate : calculates several metrics for a throw at once
+        device : the ID of the device (ball) the throw was received from
+        get_column_number : returns the column number of a given heading
+        spiral_rate : metric calculator for the rate of the spiral
         total_time : metric calculator for the time of the throw recorded
+        __spiral_rate : reduction for the rate of the spiral
+        __total_time : reduction for the time of the throw recorded
     """
 
-    def init(self, fileName=""):
+    def __init__(self, fileName=""):
         """Constructor for class. Determines the processed data file name from 
         the raw data file name 
 
@@ -1917,6 +2198,34 @@ class _Metrics:
         self.filePath = const.DATA_DIRECTORY + self.fileName[const.LENGTH_OF_DATA_DIR:]
         return self.filePath
 
+    @property
+    def registry(self):
+        """Getter for the metrics that can be calculated, keyed by the heading 
+        of their column in the tracker.
+
+        Each metric lists the columns of the processed data file it needs, and 
+        the method that reduces them to a single value. The method is given the 
+        data in those columns, keyed by column heading. Metrics marked as 
+        "final" only need the last row of their columns, so only the last row 
+        is read for them.
+
+        Returns:
+            dict[str, dict]: details of each metric, keyed by its heading.
+        """
+
+        return {
+            "time of throw": {
+                "inputs": ["time"],
+                "final": True,
+                "method": self.__total_time
+            },
+            "spiral rate": {
+                "inputs": ["w (e_r)"],
+                "final": False,
+                "method": self.__spiral_rate
+            }
+        }
+
 
     def set_file_name(self, value):
         """Setter for the attribute of the same name. Name of the processed data 
@@ -1933,12 +2242,80 @@ class _Metrics:
         return self.fileName
 
 
+    def calculate(self, metrics, fileName=None):
+        """Calculates several metrics for a throw, reading the processed data 
+        file only once.
+
+        The columns needed by all the metrics are read together, and then each 
+        metric reduces its columns to a single value. Columns that are only 
+        needed by "final" metrics have just their last row read.
+
+        Args:
+            metrics (list[str]): headings of the metrics to calculate, as 
+                listed in the registry.
+            fileName (str, optional): name of the file to calculate the metrics 
+                for. Defaults to None, which uses 'self.fileName'.
+
+        Raises:
+            ValueError: raised if a metric is not in the registry.
+
+        Returns:
+            dict[str, any]: value of each metric, keyed by its heading. The 
+                value is None if it couldn't be calculated.
+        """
+
+        if fileName == None:
+            fileName = self.fileName
+        else:
+            self.set_file_name(fileName)
+
+        registry = self.registry
+
+        # columns needed by any of the metrics, each listed once
+        inputs = []
+        finalInputs = [] # columns where only the last row is needed
+        for metric in metrics:
+            if metric not in registry:
+                raise ValueError("Unknown metric: {}".format(metric))
+            for heading in registry[metric]["inputs"]:
+                if registry[metric]["final"]:
+                    if heading not in finalInputs:
+                        finalInputs.append(heading)
+                elif heading not in inputs:
+                    inputs.append(heading)
+        finalInputs = [heading for heading in finalInputs if heading not in inputs]
+
+        if len(metrics) == 0:
+            return {}
+
+        throw = Throw(self.fileName)
+        try:
+            columns = throw.read_columns(inputs) if len(inputs) else {}
+            if len(finalInputs):
+                columns.update(throw.read_last_values(finalInputs))
+        except FileNotFoundError:
+            print("Couldn't open file:", fileName)
+            return {metric: None for metric in metrics}
+
+        values = {}
+        for metric in metrics:
+            missing = [heading for heading in registry[metric]["inputs"]
+                        if heading not in columns]
+            if len(missing) > 0:
+                print("Couldn't calculate '{}' for {}: column(s) not found: {}"
+                        .format(metric, fileName, ", ".join(missing)))
+                values[metric] = None
+            else:
+                values[metric] = registry[metric]["method"](columns)
+
+        return values
+
     def get_column_number(self, columnHeading):
         """Returns the column number associated with a given heading.
 
-        Opens the tracker file, and iterates through the first row to find a 
-        match. If found, the index of the column is returned. Else, a 
-        ValueError is raised.
+        Reads the headers of the processed data file to find a match. If 
+        found, the index of the column is returned. Else, a ValueError is 
+        raised.
 
         Args:
             columnHeading (str): name of column to be found.
@@ -1950,61 +2327,38 @@ class _Metrics:
             int: index of column.
         """
 
-        with open(self.filePath) as f:
-            processed_file = csv.reader(f)
+        return Throw(self.fileName).get_column_number(columnHeading)
 
-            # find column number
-            columnNumber = 0
-            for row in processed_file:
-                for heading in row:
-                    if heading == columnHeading:
-                        return columnNumber # stop when heading is found
-                    else:
-                        columnNumber += 1
-                raise ValueError("Column heading not found")
-
-    def total_time(self, fileName=None, heading=False):
-        """Calculates a metric (total time of recording) for a given throw.
+    def device(self, fileName=None, heading=False):
+        """Finds the ID of the device (ball) a given throw was received from, 
+        when several were received from at once. It's part of the name of the 
+        raw data file, so the processed data file isn't read.
 
         If the 'heading' parameter is 'True', the method simply returns the 
-        heading for this column. Otherwise, each file listed is found, and the 
-        metric is calculated for it.
+        heading for this column.
 
         Args:
-            fileName (str): name of the file to calculate the metric for.
+            fileName (str): name of the file to find the device of.
             heading (bool): set this to 'True' if only the heading title is 
-                wanted. Set 'False' to actually calculate the value. Defaults to 
-                False.
+                wanted. Defaults to False.
 
         Returns:
-            int: value of metric.
+            str: the device ID, or None if the file name doesn't have one.
         """
 
         if heading:
-            return "time of throw" # title of column in tracker file
+            return "device" # title of column in tracker file
 
         if fileName == None:
             fileName = self.fileName
-        else:
-            self.set_file_name(fileName)
-    
-        try:
-            with open(self.file_path) as f:
-                csv_file = csv.reader(f)
-                # get to end of file
-                for row in csv_file:
-                    pass
-                time = float(row[0])
-                return time
-        except:
-            print("Couldn't open file:", fileName)
+        return functions.parse_device_id(fileName)
 
     def spiral_rate(self, fileName=None, heading=False):
         """Calculates a metric (rate of the spiral) for a given throw.
 
         If the 'heading' parameter is 'True', the method simply returns the 
-        heading for this column. Otherwise, each file listed is found, and the 
-        metric is calculated for it.
+        heading for this column. Otherwise, the metric is calculated for the 
+        file.
 
         Args:
             fileName (str): name of the file to calculate the metric for.
@@ -2013,26 +2367,68 @@ class _Metrics:
                 False.
 
         Returns:
-            int: value of metric.
+            float: value of metric.
         """
 
         if heading:
             return "spiral rate" # title of column in tracker file
 
-        if fileName == None:
-            fileName = functions.raw_to_processed(self.fileName)
-        else:
-            self.set_file_name(functions.raw_to_processed(fileName))
+        return self.calculate(["spiral rate"], fileName)["spiral rate"]
     
-        try:
-            with open(self.file_path) as f:
-                csv_file = csv.reader(f)
-                columnNumber = self.get_column_number("w (e_r)")
-                max = 0
-                next(f) # skip header
-                for row in csv_file:
-                    if abs(float(row[columnNumber])) > max:
-                        max = abs(float(row[columnNumber]))
-                return max
-        except FileNotFoundError:
-            print("Couldn't open file:", fileName)
+    def total_time(self, fileName=None, heading=False):
+        """Calculates a metric (total time of recording) for a given throw.
+
+        If the 'heading' parameter is 'True', the method simply returns the 
+        heading for this column. Otherwise, the metric is calculated for the 
+        file.
+
+        Args:
+            fileName (str): name of the file to calculate the metric for.
+            heading (bool): set this to 'True' if only the heading title is 
+                wanted. Set 'False' to actually calculate the value. Defaults to 
+                False.
+
+        Returns:
+            float: value of metric.
+        """
+
+        if heading:
+            return "time of throw" # title of column in tracker file
+
+        return self.calculate(["time of throw"], fileName)["time of throw"]
+    
+
+    def __spiral_rate(self, columns):
+        """Private method to reduce the data to the rate of the spiral - the 
+        largest angular velocity about the long axis of the ball.
+
+        Args:
+            columns (dict[str, np.ndarray]): data in the columns listed in the 
+                registry.
+
+        Returns:
+            float: value of metric.
+        """
+
+        data = columns["w (e_r)"]
+        if len(data) == 0:
+            return 0
+        return float(np.max(np.abs(data)))
+
+    def __total_time(self, columns):
+        """Private method to reduce the data to the total time of recording - 
+        the last value in the time column. If the data was trimmed to the 
+        flight, this is the length of the flight.
+
+        Args:
+            columns (dict[str, np.ndarray]): data in the columns listed in the 
+                registry.
+
+        Returns:
+            float: value of metric, or None if there is no data.
+        """
+
+        time = columns["time"]
+        if len(time) == 0:
+            return None
+        return float(time[-1])
@@ -1,8 +1,12 @@
 from . import const
 from . import functions
 from . import global_tracker
+from . import records
+from . import storage
+import concurrent.futures
 import csv
 # import inspect
+import numpy as np
 import os.path
 import sys
 
@@ -21,13 +25,15 @@ class RawData:
         showWarnings (bool): should be 'True' if the user wants any warnings 
             from the test outputted to the terminal.
         fileName (str): file name (without path) to raw data file to analyse.
+        workers (int): number of processes used to check files in parallel.
 
     Methods:
         __init__ : class constructor.
         health (property) : groups the 'health' methods.
     """
 
-    def __init__(self, overwrite=True, showWarnings=True):
+    def __init__(self, overwrite=True, showWarnings=True,
+                    workers=const.DEFAULT_WORKERS):
         """Constructor for class, sets the class attributes based on the 
         parameters passed in.
 
@@ -36,11 +42,14 @@ class RawData:
                 has already been listed in the file. Defaults to True.
             showWarnings (bool, optional): whether or not to print warnings 
                 from the tests to the terminal. Defaults to True.
+            workers (int, optional): number of processes used to check files 
+                in parallel. Defaults to const.DEFAULT_WORKERS.
         """
         
         # define class variables            
         self.overwrite = overwrite
         self.showWarnings = showWarnings
+        self.workers = workers
 
     @property
     def health(self):
@@ -56,7 +65,8 @@ class RawData:
         """
 
         return _RawDataHealthChecker(showWarnings = self.showWarnings, 
-                                        overwrite = self.overwrite)
+                                        overwrite = self.overwrite,
+                                        workers = self.workers)
 
 
 class _RawDataHealthChecker:
@@ -76,12 +86,11 @@ class _RawDataHealthChecker:
         __GYRO_WARNING_THRESHOLD (int): constant to store the threshold for 
             angular velocity across each axis, that, if exceeded, raises a 
             warning.
-        __warningsRaised (bool): a flag that stores if a warning has been raised 
-            for the raw data file currently being checked.
         overWrite (bool): set as 'True' if data in the global tracker file 
             should be overwritten with changes, otherwise set as 'False'.
         showWarnings (bool): should be 'True' if the user wants any warnings 
             from the test outputted to the terminal.
+        workers (int): number of processes used to check files in parallel.
 
     Methods:
         __init__ : class constructor.
@@ -96,21 +105,17 @@ class _RawDataHealthChecker:
             the same name.
         GYRO_WARNING_THRESHOLD : {property) returns the constant of the same 
             name.
-        check_all_files : iterates through all files in the folder and passes 
-            each one through to 'check_one_file'.
-        check_one_file : runs each test on each row of the given raw data file
+        check_all_files : checks every raw data file in the folder, in 
+            parallel.
+        check_one_file : runs each test on the given raw data file
         __add_file_to_tracker : adds a given file and its health status to the 
             global tracker, after testing it and determining its health status.
-        __check_columns : asserts that the number of columns in each row is 
-            correct.
-        __check_values : asserts that the values in the raw data file are 
-            usable.
-        __check_times : asserts that the recorded time strictly increases .
+        __print_results : outputs the errors and warnings found in a file.
         __is_in_tracker : determines if a given file has already been logged in 
             the global tracker.
     """
 
-    def __init__(self, overwrite, showWarnings):
+    def __init__(self, overwrite, showWarnings, workers=const.DEFAULT_WORKERS):
         """Constructor for class, defines constants and class attributes.
 
         Args:
@@ -118,17 +123,19 @@ class _RawDataHealthChecker:
                 has already been listed in the file.
             showWarnings (bool): whether or not to print warnings 
                 from the tests to the terminal.
+            workers (int, optional): number of processes used to check files 
+                in parallel. Defaults to const.DEFAULT_WORKERS.
         """
 
         # set class constants
-        self.__THROW_TIME_WARNING_THRESHOLD = 25000 
-        self.__ACCELEROMETER_WARNING_THRESHOLD = 150 # accelerometer set to 16G
-        self.__GYRO_WARNING_THRESHOLD = 1900 # gyro set to 2000dps
+        self.__THROW_TIME_WARNING_THRESHOLD = const.THROW_TIME_WARNING_THRESHOLD
+        self.__ACCELEROMETER_WARNING_THRESHOLD = const.ACCELEROMETER_WARNING_THRESHOLD
+        self.__GYRO_WARNING_THRESHOLD = const.GYRO_WARNING_THRESHOLD
         
         # define class variables
         self.showWarnings = showWarnings
         self.overwrite = overwrite
-        self.__warningsRaised = False
+        self.workers = workers
 
         print("Raw data initialised at", self.DATA_DIRECTORY, "\n")
         if self.overwrite == True:
@@ -212,9 +219,10 @@ class _RawDataHealthChecker:
 
         Goes through each file in the directory that stores all the raw data 
         files. For any raw data CSV files, tests are run, unless the file is 
-        already recorded in the tracker file and 'overwrite is set False. This 
-        method simply passes each file to the 'check_one_file' method. After 
-        testing all the files, results are displayed.
+        already recorded in the tracker file and 'overwrite is set False. The 
+        files are shared out between 'workers' processes, and the tracker is 
+        updated with the health status of every file at once. After testing all 
+        the files, results are displayed.
 
         Returns:
             int: returns 1 if method completed successfully.
@@ -224,16 +232,18 @@ class _RawDataHealthChecker:
         files_total = 0 # total files tested
         files_passed = 0 # total files passed
         files_failed = [] # list of files that failed a test
-        tests_failed = [] # the corresponding tests that the files failed on
+        tests_failed = [] # the corresponding errors that the files failed with
+        filePaths = [] # files to be tested
 
         # iterate through each file in directory where data files are kept
-        for entry in os.listdir(self.DATA_DIRECTORY):
+        for entry in storage.list_directory(self.DATA_DIRECTORY):
             filePath = os.path.join(self.DATA_DIRECTORY, entry)
             fileName = filePath[const.PATH_LENGTH_TO_DATA_DIR:]
             
-            # only check raw data files saved as a csv 
+            # only check raw data files saved as a csv, or as binary records
             if entry[:len(const.RAW_DATA_PREFIX)] == const.RAW_DATA_PREFIX:
-                 if entry.endswith(".csv"): # only check CSV files
+                 if entry.endswith((const.RAW_DATA_FILE_TYPE,
+                                    const.RAW_DATA_BINARY_FILE_TYPE)):
 
                     # if overwrite is False, it doesn't matter if the file has already been recorded
                     if not self.overwrite:
@@ -241,15 +251,43 @@ class _RawDataHealthChecker:
                             continue
                     
                     # therefor file is a valid raw data CSV file
-                    files_total += 1
-                    allTestsPassed, error = self.check_one_file(filePath)
+                    filePaths.append(filePath)
                     
-                    if allTestsPassed >= const.passedWithWarnings:
-                        files_passed += 1
-                    else:
-                        # record file name and error
-                        files_failed.append(fileName)
-                        tests_failed.append("{} ({})".format(error[0], error[1].strip()))
+        thresholds = (self.THROW_TIME_WARNING_THRESHOLD,
+                        self.ACCELEROMETER_WARNING_THRESHOLD,
+                        self.GYRO_WARNING_THRESHOLD)
+
+        # test files, in parallel if there is more than one
+        if self.workers > 1 and len(filePaths) > 1:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=self.workers) as executor:
+                results = list(executor.map(_assess_file, filePaths,
+                                            [thresholds] * len(filePaths)))
+        else:
+            results = [_assess_file(filePath, thresholds) for filePath in filePaths]
+
+        healthStatuses = {} # health status of each file, for the tracker
+
+        for filePath, result in zip(filePaths, results):
+            fileName = filePath[const.PATH_LENGTH_TO_DATA_DIR:]
+            healthStatus, errors, _ = result
+
+            self.__print_results(fileName, result)
+            if healthStatus == -1: # file not found
+                continue
+
+            files_total += 1
+            healthStatuses[fileName] = healthStatus
+            
+            if healthStatus >= const.passedWithWarnings:
+                files_passed += 1
+            else:
+                # record file name and errors
+                files_failed.append(fileName)
+                tests_failed.append(errors)
+
+        # list every file in tracker at once
+        G = global_tracker.get_tracker(fullInitialisation = False)
+        G.add_files(healthStatuses)
             
         # output results
         print("\n\nAll tests complete. {}/{} files passed.".format(files_passed, 
@@ -258,7 +296,11 @@ class _RawDataHealthChecker:
             print("The following files failed a test:")
 
             for i in range(0, len(files_failed)):
-                print("  {} : {}\n".format(files_failed[i], tests_failed[i]))
+                print("  {} : {} error(s)".format(files_failed[i],
+                                                    len(tests_failed[i])))
+                for lineNumber, error in tests_failed[i]:
+                    print("    line {}: {}".format(lineNumber, error))
+                print()
 
         return 1
 
@@ -267,83 +309,49 @@ class _RawDataHealthChecker:
         Returns a tuple with the health status as the first element and failure 
         messages, if any, as the second.
 
-        Runs the following tests on each row:
+        Runs the following tests on every row at once:
             - ensures the number of columns are correct
             - ensures the data in each cell is readable and in the correct form
             - checks the time of each measurement (each row) strictly increases
-        Stops checking the file as soon as a test fails. Any warnings, or error 
-        messages resulting from failed tests get outputted.
+        Every failed test is reported, along with the line it failed on. Any 
+        warnings, or error messages resulting from failed tests get outputted.
 
         Args:
             filePath (str): full absolute file path to the file to be checked.
 
         Returns:
             int: health status, which summarises the results of the tests.
-            str: failure message if test failed, NoneType otherwise.
+            list[tuple]: line number and message of each failed test, 
+                NoneType if all tests passed.
         """
 
         # shorten file path
         fileName = filePath[const.PATH_LENGTH_TO_DATA_DIR:]
 
-        try:
-            with open(filePath) as f:
-                csv_file = csv.reader(f)
-                print("Testing {}... ".format(fileName), end="")
-
-                healthStatus = const.untested
-                previousTime = 0 # to ensure time on each row always increases
-
-                try:
-                    # run tests on each row
-                    for row in csv_file:
-                        self.__check_columns(row)
-                        self.__check_values(row)
-                        previousTime = self.__check_times(csv_file.line_num, 
-                                                            row,
-                                                            previousTime)
-                    
-                except AssertionError as e: # test failed
-                    print("\nTest failed on line {}:".format(csv_file.line_num))
-                    print("  {}\n".format(e.args[0]))
-                    
-                    healthStatus = const.failed
-                    
-                    return(const.untested, e.args[0].split(":"))
-
-                else:
-                    if self.__warningsRaised and self.showWarnings:
-                        print() # adjust output formatting if displaying warnings
-                    if self.__warningsRaised:
-                        healthStatus = const.passedWithWarnings
-                        
-                    else:
-                        healthStatus = const.passed
-                    
-                    print("All tests passed with healthstatus", healthStatus, end="")
-                    if healthStatus != const.passed:
-                        print("*")
-                    else:
-                        print()
-                        
-                    self.__warningsRaised = False
-                    return(healthStatus, None)
-
-                finally:
-                    # regardless of test outcome, list file in tracker before method returns
-                    self.__add_file_to_tracker(fileName, healthStatus)
-            
-        except FileNotFoundError as e:
-            print("Raw data file could not be found:", e)
+        result = _assess_file(filePath, (self.THROW_TIME_WARNING_THRESHOLD,
+                                            self.ACCELEROMETER_WARNING_THRESHOLD,
+                                            self.GYRO_WARNING_THRESHOLD))
+        healthStatus, errors, _ = result
+
+        self.__print_results(fileName, result)
+        if healthStatus == -1: # file not found
             return -1
 
+        # regardless of test outcome, list file in tracker before method returns
+        self.__add_file_to_tracker(fileName, healthStatus)
+                    
+        if len(errors) == 0:
+            return(healthStatus, None)
+        return(healthStatus, errors)
+
 
     def __add_file_to_tracker(self, fileName, healthStatus=const.untested):
         """Private method to add a given file to the global tracker file with 
         a given healthStatus.
 
-        Creates an instance of the GlobalFile class and calls the relevant 
-        method in there to update the health status, if the file has already 
-        been recorded, or adds the file altogether if it has not been recorded.
+        Opens the global tracker and calls the relevant method in there to 
+        update the health status, if the file has already been recorded, or 
+        adds the file altogether if it has not been recorded.
 
         Args:
             fileName (str): raw data file to be added.
@@ -354,108 +362,54 @@ class _RawDataHealthChecker:
             int: returns 1 if completed successfully.
         """
 
-        G = global_tracker.GlobalFile(fullInitialisation = False)
+        G = global_tracker.get_tracker(fullInitialisation = False)
 
         if self.__is_in_tracker(fileName):
             return G.change_health_status(fileName, healthStatus)
         else:
             return G.add_file(fileName, healthStatus)
 
-    def __check_columns(self, row):
-        """Private method to check how many columns there are in a given row 
-        object of a CSV file.
-
-        Receives the row from the CSV handler and asserts that the length of it 
-        is the expected value, as defined in the class constants.
+    def __print_results(self, fileName, result):
+        """Private method to output the results of the tests on a file.
 
         Args:
-            row (list): row object from the CSV file.
+            fileName (str): name of the file that was tested.
+            result (tuple): health status, errors and warnings, as returned by 
+                '_assess_file'.
 
         Returns:
-            NoneType: signifies completion, and no assertion error.
+            NoneType: signifies completion.
         """
 
-        assert len(row) == self.NUMBER_OF_COLUMNS,\
-                "Check columns: {} columns - should be {}"\
-                .format(len(row), self.NUMBER_OF_COLUMNS)
-        return None
-
-    def __check_values(self, row):
-        """Private method to check that the values in each row are valid and 
-        usable.
+        healthStatus, errors, warnings = result
 
-        Receives the row object from the CSV handler and first checks if it has 
-        numerical data in it. Then, depending on the column, and therefore the 
-        type of data, checks to see if it is within an acceptable range, and if 
-        not, raises a warning.
+        if healthStatus == -1:
+            print("Raw data file could not be found:", fileName)
+            return None
 
-        Args:
-            row (list): row object from the CSV file.
+        print("Testing {}... ".format(fileName), end="")
 
-        Returns:
-            NoneType: signifies completion, and no assertion error.
-        """
+        if self.showWarnings: # only print if showWarnings is 'True'
+            for lineNumber, warning in warnings:
+                print("\n  Warning (line {}): {}".format(lineNumber, warning), end="")
+            if len(warnings) > 0:
+                print() # adjust output formatting if displaying warnings
 
-        # iterate through each element in the row
-        for i, value_str in enumerate(row):
+        if len(errors) > 0:
+            print("\n{} test(s) failed:".format(len(errors)))
+            for lineNumber, error in errors:
+                print("  line {}: {}".format(lineNumber, error))
+            print()
+            return None
 
-            # check the element has data, and that it can be cast into a float
-            assert len(value_str.strip()) > 0,\
-                    "Check values: no data in column {}".format(i)
-            assert functions.isFloat(value_str),\
-                    "Check values: non-float value ({}) in column {}"\
-                    .format(value_str, i)
-            
-            value = int(float(value_str))
-
-            if i == 0: # time
-                if value >= self.THROW_TIME_WARNING_THRESHOLD:
-                    if self.showWarnings: # only print if showWarnings is 'True'
-                        print("\n  Warning: Time of throw exceeds {} ( = {})"
-                                .format(self.THROW_TIME_WARNING_THRESHOLD, value),
-                                end="")
-                    self.__warningsRaised = True
-            elif i <= 3: # acceleration on each axis
-                if abs(value) >= self.ACCELEROMETER_WARNING_THRESHOLD:
-                    if self.showWarnings:
-                        print("\n  Warning: Acceleration exceeds {} in column {} ( = {})"
-                            .format(self.ACCELEROMETER_WARNING_THRESHOLD, i, value),
-                            end="")
-                    self.__warningsRaised = True
-            elif i <= 6: # angular velocity on each axis
-                if abs(value) >= self.GYRO_WARNING_THRESHOLD:
-                    if self.showWarnings:
-                        print("\n  Warning: Acceleration exceeds {} in column {} ( = {})"
-                            .format(self.GYRO_WARNING_THRESHOLD, i, value),
-                            end="")
-                    self.__warningsRaised = True
+        print("All tests passed with healthstatus", healthStatus, end="")
+        if healthStatus != const.passed:
+            print("*")
+        else:
+            print()
         
         return None
 
-    def __check_times(self, line_num, row, previousTime):
-        """Private method to check that the time strictly increases within 
-        the raw data file.
-
-        Receives the row object from the CSV handler and first asserts that the 
-        time has not decreased since the last reading. Then it assertts that the 
-        time has not remained constant either.
-
-        Args:
-            row (list[str]): row object from the CSV file.
-            previousTime (float): the time recorded on the previous row.
-
-        Returns:
-            float: time recorded on this row.
-        """
-
-        assert float(row[0]) >= previousTime,\
-                "Check times: row {} has time less than previous row ({} -> {})"\
-                .format(line_num, row[0], previousTime)
-        assert float(row[0]) > previousTime,\
-                "Check times: row {} has time equal to previous row ({})"\
-                .format(line_num, row[0])
-        return float(row[0])
-
     def __is_in_tracker(self, fileName):
         """Checks if a given raw data file has been logged in the global tracker 
         file.
@@ -471,8 +425,218 @@ class _RawDataHealthChecker:
                 not been recorded, or if the tracker file cannot be found.
         """
 
-        G = global_tracker.GlobalFile(fullInitialisation = False)
+        G = global_tracker.get_tracker(fullInitialisation = False)
         if G.TRACKER_EXISTS:
             return G.is_file_recorded(fileName)
         return 0
 
+
+def _assess_file(filePath, thresholds):
+    """Runs every test on a raw data file, and returns the results rather than 
+    outputting them. Used by the processes that check files in parallel, so it 
+    must be a module level function.
+
+    The file is parsed once (see '_read_lines'), and the tests are run on 
+    every row at once (see '_check_rows'). Rows with the wrong number of 
+    columns, or with unusable values, are left out of the later tests.
+
+    Files stored as binary records always have the right number of columns 
+    of numbers, so instead any bytes that aren't part of a record with the 
+    right CRC fail, and records lost from the sequence raise warnings. Each 
+    record counts as a line.
+
+    Args:
+        filePath (str): full absolute file path to the file to be checked.
+        thresholds (tuple[int]): warning thresholds for the time of throw, 
+            acceleration and angular velocity.
+
+    Returns:
+        int: health status, or -1 if the file could not be found.
+        list[tuple]: line number and message of each failed test.
+        list[tuple]: line number and message of each warning.
+    """
+
+    errors = []
+    warnings = []
+
+    if records.is_binary(filePath):
+        try:
+            values, errors, warnings = records.read_file(filePath)
+        except FileNotFoundError:
+            return (-1, errors, warnings)
+        lineNumbers = np.arange(1, len(values)+1) # one line per record
+        unreadable = np.zeros(values.shape, dtype=bool)
+    else:
+        try:
+            with storage.open_file(filePath) as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return (-1, errors, warnings)
+
+        values, lineNumbers, unreadable = _read_lines(lines, errors)
+
+    _check_rows(values, lineNumbers, unreadable, thresholds, errors, warnings)
+
+    # sort by line number
+    errors = sorted([(int(lineNumber), error) for lineNumber, error in errors])
+    warnings = sorted([(int(lineNumber), warning) for lineNumber, warning in warnings])
+
+    if len(errors) > 0:
+        healthStatus = const.failed
+    elif len(warnings) > 0:
+        healthStatus = const.passedWithWarnings
+    else:
+        healthStatus = const.passed
+
+    return (healthStatus, errors, warnings)
+
+def _check_rows(values, lineNumbers, unreadable, thresholds, errors, warnings,
+                    previousTime=0):
+    """Runs the tests that need the values of each row on every row at once. 
+    Used on a whole raw data file by '_assess_file', and on each line as it's 
+    received by 'stream.StreamingThrow', so both give the same results:
+        - ensures each cell that could be read is a finite number
+        - checks the time of each measurement (each row) strictly increases
+        - warns if the time, acceleration or angular velocity exceed the 
+        thresholds 
+    Rows with unusable values are left out of the later tests.
+
+    Args:
+        values (np.ndarray): values in each row, as read by '_read_lines'.
+        lineNumbers (np.ndarray): line number of each row.
+        unreadable (np.ndarray): 'True' for each cell that couldn't be read.
+        thresholds (tuple[int]): warning thresholds for the time of throw, 
+            acceleration and angular velocity.
+        errors (list[tuple]): line number and message of each failed test. 
+            Updated in place.
+        warnings (list[tuple]): line number and message of each warning. 
+            Updated in place.
+        previousTime (float, optional): time of the last usable row before 
+            these. Defaults to 0, for the start of a file.
+
+    Returns:
+        np.ndarray: 'True' for each row that is usable.
+    """
+
+    timeThreshold, accelerometerThreshold, gyroThreshold = thresholds
+
+    # NaN or infinite values can be read, but can't be used
+    nonFinite = ~unreadable & ~np.isfinite(values)
+    for row, column in zip(*np.nonzero(nonFinite)):
+        errors.append((lineNumbers[row], "Check values: non-finite value ({}) in column {}"
+                        .format(values[row, column], column)))
+
+    usable = ~(unreadable | nonFinite).any(axis=1)
+    values = values[usable]
+    lineNumbers = lineNumbers[usable]
+
+    # check times strictly increase, starting from 0
+    times = values[:, 0]
+    previousTimes = np.concatenate([[previousTime], times[:-1]])
+    for i in np.flatnonzero(times < previousTimes):
+        errors.append((lineNumbers[i],
+                        "Check times: row {} has time less than previous row ({} -> {})"
+                        .format(lineNumbers[i], times[i], previousTimes[i])))
+    for i in np.flatnonzero(times == previousTimes):
+        errors.append((lineNumbers[i],
+                        "Check times: row {} has time equal to previous row ({})"
+                        .format(lineNumbers[i], times[i])))
+
+    # warn if values exceed thresholds - values are truncated to integers first
+    values = np.trunc(values)
+    for i in np.flatnonzero(values[:, 0] >= timeThreshold):
+        warnings.append((lineNumbers[i], "Time of throw exceeds {} ( = {})"
+                            .format(timeThreshold, int(values[i, 0]))))
+    for row, column in zip(*np.nonzero(np.abs(values[:, 1:4]) >= accelerometerThreshold)):
+        warnings.append((lineNumbers[row], "Acceleration exceeds {} in column {} ( = {})"
+                            .format(accelerometerThreshold, column+1,
+                                    int(values[row, column+1]))))
+    for row, column in zip(*np.nonzero(np.abs(values[:, 4:7]) >= gyroThreshold)):
+        warnings.append((lineNumbers[row], "Angular velocity exceeds {} in column {} ( = {})"
+                            .format(gyroThreshold, column+4,
+                                    int(values[row, column+4]))))
+
+    return usable
+
+def _read_lines(lines, errors, firstLineNumber=1):
+    """Reads the lines of a raw data file into an array. Usually every line is 
+    fine, so they are all read in one call first. If that fails, they are 
+    read cell by cell (see '_read_cells') to find exactly which cells can't 
+    be used.
+
+    Args:
+        lines (list[str]): lines of the raw data file.
+        errors (list[tuple]): line number and message of each failed test. 
+            Updated in place.
+        firstLineNumber (int, optional): line number of the first line. 
+            Defaults to 1.
+
+    Returns:
+        np.ndarray: values in every row with the right number of columns, 
+            with NaN where the cell couldn't be read.
+        np.ndarray: line number of each of these rows.
+        np.ndarray: 'True' for each cell that couldn't be read.
+    """
+
+    try:
+        values = np.loadtxt(lines, delimiter=",", comments=None, ndmin=2)
+    except ValueError:
+        values = None
+
+    if values is not None and values.shape == (len(lines), const.NUMBER_OF_COLUMNS):
+        lineNumbers = np.arange(firstLineNumber, firstLineNumber+len(lines))
+        return values, lineNumbers, np.zeros(values.shape, dtype=bool)
+
+    return _read_cells(lines, errors, firstLineNumber)
+
+def _read_cells(lines, errors, firstLineNumber=1):
+    """Reads the lines of a raw data file cell by cell, to find exactly which 
+    cells can't be used.
+
+    Args:
+        lines (list[str]): lines of the raw data file.
+        errors (list[tuple]): line number and message of each failed test. 
+            Updated in place.
+        firstLineNumber (int, optional): line number of the first line. 
+            Defaults to 1.
+
+    Returns:
+        np.ndarray: values in every row with the right number of columns, 
+            with NaN where the cell couldn't be read.
+        np.ndarray: line number of each of these rows.
+        np.ndarray: 'True' for each cell that couldn't be read.
+    """
+
+    rows = list(csv.reader(lines))
+    lineNumbers = np.arange(firstLineNumber, firstLineNumber+len(rows))
+
+    # check columns
+    lengths = np.array([len(row) for row in rows], dtype=int)
+    correctLength = lengths == const.NUMBER_OF_COLUMNS
+    for i in np.flatnonzero(~correctLength):
+        errors.append((lineNumbers[i], "Check columns: {} columns - should be {}"
+                        .format(lengths[i], const.NUMBER_OF_COLUMNS)))
+
+    cells = np.array([row for row, correct in zip(rows, correctLength) if correct],
+                        dtype=str).reshape(-1, const.NUMBER_OF_COLUMNS)
+    lineNumbers = lineNumbers[correctLength]
+
+    # check values - every cell must have data that can be cast into a float
+    cells = np.char.strip(cells)
+    blank = cells == ""
+    try:
+        values = np.where(blank, "nan", cells).astype(float)
+        nonFloat = np.zeros(cells.shape, dtype=bool)
+    except ValueError: # find which cells couldn't be read
+        nonFloat = ~blank & ~np.vectorize(functions.isFloat, otypes=[bool])(cells)
+        values = np.where(blank | nonFloat, "nan", cells).astype(float)
+
+    for row, column in zip(*np.nonzero(blank | nonFloat)):
+        if blank[row, column]:
+            message = "Check values: no data in column {}".format(column)
+        else:
+            message = "Check values: non-float value ({}) in column {}"\
+                        .format(cells[row, column], column)
+        errors.append((lineNumbers[row], message))
+
+    return values, lineNumbers, (blank | nonFloat)
@@ -0,0 +1,320 @@
+from . import const
+from . import functions
+from . import global_tracker
+from . import processed_data
+from . import storage
+import binascii
+import numpy as np
+import os
+
+# layout of one binary record (see const.py)
+RECORD_TYPE = np.dtype([("sync", "S2"), ("sequence", "<u2"), ("time", "<u4"),
+                        ("values", "<i2", (const.NUMBER_OF_COLUMNS-1,)),
+                        ("crc", "<u2")])
+assert RECORD_TYPE.itemsize == const.RECORD_SIZE, \
+    "Fatal (records.py): records are {} bytes; they should be {}." \
+        .format(RECORD_TYPE.itemsize, const.RECORD_SIZE)
+
+__CRC_START = len(const.RECORD_SYNC) # the CRC covers everything after the sync bytes...
+__CRC_END = const.RECORD_SIZE - 2 # ...up to the CRC itself
+__CRC_TABLE = np.array([binascii.crc_hqx(bytes([i]), 0) for i in range(256)],
+                        dtype=np.uint16)
+__SCALES = np.array(const.RECORD_SCALES, dtype=float)
+
+def is_binary(fileName):
+    """Checks if a raw data file (or a segment of one) is stored as binary 
+    records, rather than CSV.
+
+    Args:
+        fileName (str): name or path of the raw data file.
+
+    Returns:
+        bool: 'True' if the file is stored as binary records.
+    """
+
+    return functions.parse_segment_file_name(fileName)[0] \
+                .endswith(const.RAW_DATA_BINARY_FILE_TYPE)
+
+def crc(records):
+    """Calculates the CRC of every record at once. The CRC is CRC-16/CCITT, 
+    starting from 0xFFFF, as calculated by 'binascii.crc_hqx(data, 0xFFFF)'.
+
+    Args:
+        records (np.ndarray): bytes of each record, with one row per record.
+
+    Returns:
+        np.ndarray: CRC of each record.
+    """
+
+    records = records[:, __CRC_START:__CRC_END]
+    crcs = np.full(len(records), 0xFFFF, dtype=np.uint16)
+
+    # one byte of every record at a time
+    for column in records.T:
+        crcs = (crcs << 8) ^ __CRC_TABLE[(crcs >> 8) ^ column]
+
+    return crcs
+
+def encode(data, firstSequence=0):
+    """Encodes lines of raw data as binary records.
+
+    Args:
+        data (np.ndarray): values of each line, in the units of the raw data 
+            files, with one row per line.
+        firstSequence (int, optional): sequence number of the first record. 
+            Defaults to 0.
+
+    Raises:
+        ValueError: raised if any value can't be stored in a record.
+
+    Returns:
+        bytes: the records.
+    """
+
+    data = np.asarray(data, dtype=float).reshape(-1, const.NUMBER_OF_COLUMNS)
+    scaled = np.round(data * __SCALES)
+
+    if not np.all(np.isfinite(scaled)):
+        raise ValueError("non-finite values can't be stored in a record")
+    if np.any(scaled[:, 0] < 0) or np.any(scaled[:, 0] > np.iinfo(np.uint32).max):
+        raise ValueError("times must be between 0 and {} ms".format(np.iinfo(np.uint32).max))
+    if np.any(np.abs(scaled[:, 1:]) > np.iinfo(np.int16).max):
+        raise ValueError("values are too large to be stored in a record")
+
+    records = np.zeros(len(data), dtype=RECORD_TYPE)
+    records["sync"] = const.RECORD_SYNC
+    records["sequence"] = (firstSequence + np.arange(len(data))) % 65536
+    records["time"] = scaled[:, 0]
+    records["values"] = scaled[:, 1:]
+    records["crc"] = crc(records.view(np.uint8).reshape(-1, const.RECORD_SIZE))
+
+    return records.tobytes()
+
+def decode(data):
+    """Decodes binary records into lines of raw data.
+
+    Usually every record is whole and in order, so they are all decoded at 
+    once. If not, the records are found one at a time, by looking for the sync 
+    bytes, and any bytes that aren't part of a record with the right CRC are 
+    skipped.
+
+    Args:
+        data (bytes): the records.
+
+    Returns:
+        np.ndarray: values of each line, in the units of the raw data files, 
+            with one row per record.
+        np.ndarray: sequence number of each record.
+        list[tuple]: record number and message for each run of bytes that 
+            couldn't be decoded.
+    """
+
+    errors = []
+    records = np.frombuffer(data, dtype=np.uint8)
+    length = len(records) // const.RECORD_SIZE
+
+    # try every record in place first
+    records = records[:length*const.RECORD_SIZE].reshape(-1, const.RECORD_SIZE)
+    valid = (records[:, 0] == const.RECORD_SYNC[0]) & \
+                (records[:, 1] == const.RECORD_SYNC[1]) & \
+                (crc(records) == records[:, __CRC_END:].copy().view("<u2")[:, 0])
+
+    if not np.all(valid) or len(data) != length*const.RECORD_SIZE:
+        # find the records one by one, resynchronising after any bad bytes
+        found = []
+        position = 0
+        skipped = None # position of the first byte skipped
+        while position + const.RECORD_SIZE <= len(data):
+            record = data[position:position+const.RECORD_SIZE]
+            if record.startswith(const.RECORD_SYNC) and \
+                    binascii.crc_hqx(record[__CRC_START:__CRC_END], 0xFFFF) \
+                        == int.from_bytes(record[__CRC_END:], "little"):
+                if skipped != None:
+                    errors.append((len(found)+1, "Check records: {} unreadable bytes before record"
+                                                    .format(position - skipped)))
+                    skipped = None
+                found.append(record)
+                position += const.RECORD_SIZE
+                continue
+
+            if skipped == None:
+                skipped = position
+            nextSync = data.find(const.RECORD_SYNC, position+1)
+            position = nextSync if nextSync != -1 else len(data)
+
+        if skipped == None and position < len(data):
+            skipped = position
+        if skipped != None:
+            errors.append((len(found)+1, "Check records: {} unreadable bytes at end of file"
+                                            .format(len(data) - skipped)))
+        records = np.frombuffer(b"".join(found), dtype=np.uint8) \
+                        .reshape(-1, const.RECORD_SIZE)
+
+    records = records.copy().view(RECORD_TYPE)[:, 0]
+    values = np.empty((len(records), const.NUMBER_OF_COLUMNS))
+    values[:, 0] = records["time"]
+    values[:, 1:] = records["values"]
+    values /= __SCALES
+
+    return values, records["sequence"].astype(int), errors
+
+def find_lost_records(sequences):
+    """Finds where records are missing, from gaps in the sequence numbers.
+
+    Args:
+        sequences (np.ndarray): sequence number of each record.
+
+    Returns:
+        list[tuple]: record number and message for each gap.
+    """
+
+    lost = (np.diff(sequences) - 1) % 65536
+    return [(i+2, "Check records: {} record(s) lost before record".format(lost[i]))
+                for i in np.flatnonzero(lost)]
+
+def read_file(filePath):
+    """Reads a raw data file stored as binary records.
+
+    Args:
+        filePath (str): full absolute file path to the raw data file.
+
+    Raises:
+        FileNotFoundError: raised if the raw data file does not exist.
+
+    Returns:
+        np.ndarray: values of each line, in the units of the raw data files, 
+            with one row per record.
+        list[tuple]: record number and message for each run of bytes that 
+            couldn't be decoded.
+        list[tuple]: record number and message for each gap in the sequence 
+            numbers.
+    """
+
+    with storage.open_file(filePath, "rb") as f:
+        values, sequences, errors = decode(f.read())
+
+    return values, errors, find_lost_records(sequences)
+
+def write_file(filePath, data):
+    """Writes lines of raw data to a file as binary records.
+
+    Args:
+        filePath (str): full absolute file path to write to.
+        data (np.ndarray): values of each line, in the units of the raw data 
+            files, with one row per line.
+
+    Raises:
+        ValueError: raised if any value can't be stored in a record.
+
+    Returns:
+        int: number of records written.
+    """
+
+    records = encode(data)
+    with storage.open_file(filePath, "wb") as f:
+        f.write(records)
+
+    return len(records) // const.RECORD_SIZE
+
+def convert_all_files():
+    """Converts every raw data file in the data directory stored as CSV into 
+    binary records, keeping their entries in the tracker.
+
+    Returns:
+        int: number of files converted.
+    """
+
+    count = 0
+    for entry in sorted(storage.list_directory()):
+        if entry[:len(const.RAW_DATA_PREFIX)] == const.RAW_DATA_PREFIX \
+                and entry.endswith(const.RAW_DATA_FILE_TYPE):
+            if convert_file(os.path.join(const.DATA_DIRECTORY, entry)):
+                count += 1
+
+    print("Finished: {} raw data files converted to binary records".format(count))
+    return count
+
+def convert_file(filePath):
+    """Converts a raw data file stored as CSV into binary records, which 
+    replace it.
+
+    Each line becomes a record, and blank lines are dropped. A file is only 
+    converted if every line can be read and stored as a record without losing 
+    anything - the values in the CSV files are rounded to two decimal places, 
+    so they must be within half of that of a step of the sensor.
+
+    Entries for the file in the tracker (and for any segments of it, see 
+    'functions.segment_file_name') are renamed, so their metrics are kept. The 
+    processed data files are named the same for either type of raw data file, 
+    so they are kept too, except for segments whose lines change because blank 
+    lines were dropped, which must be processed again.
+
+    Args:
+        filePath (str): full absolute file path to the CSV raw data file.
+
+    Returns:
+        str: full absolute file path to the binary raw data file, or None if 
+            the file could not be converted.
+    """
+
+    fileName = filePath[const.PATH_LENGTH_TO_DATA_DIR:]
+    binaryFilePath = filePath[:-len(const.RAW_DATA_FILE_TYPE)] + const.RAW_DATA_BINARY_FILE_TYPE
+    binaryFileName = binaryFilePath[const.PATH_LENGTH_TO_DATA_DIR:]
+
+    try:
+        with storage.open_file(filePath) as f:
+            lines = f.read().splitlines()
+        originalSize = storage.get_size(filePath)
+    except FileNotFoundError:
+        print("Raw data file could not be found:", fileName)
+        return None
+
+    dataLines = np.array([i for i, line in enumerate(lines) if len(line.strip()) > 0],
+                            dtype=int)
+
+    try:
+        data = np.loadtxt([lines[i] for i in dataLines], delimiter=",", comments=None,
+                            ndmin=2).reshape(-1, const.NUMBER_OF_COLUMNS)
+        records = encode(data)
+    except ValueError as e:
+        print("{} not converted: {}".format(fileName, e))
+        return None
+
+    # nothing can be lost, apart from the rounding of the CSV file
+    decoded = decode(records)[0]
+    if np.any(np.abs(decoded - data) > 0.005 + 1e-9):
+        print("{} not converted: values don't match the steps of the sensors"
+                .format(fileName))
+        return None
+
+    with storage.open_file(binaryFilePath, "wb") as f:
+        f.write(records)
+
+    # rename the file and its segments in the tracker
+    G = global_tracker.get_tracker(False)
+    names = {}
+    moved = [] # segments whose lines have changed
+    for trackedFileName in G.get_file_names():
+        sourceFileName, start, end = functions.parse_segment_file_name(trackedFileName)
+        if sourceFileName != fileName:
+            continue
+        if start == None:
+            names[trackedFileName] = binaryFileName
+        else:
+            start, end = np.searchsorted(dataLines, [start, end])
+            names[trackedFileName] = functions.segment_file_name(binaryFileName,
+                                                                    int(start), int(end))
+            if functions.raw_to_processed(names[trackedFileName]) != \
+                    functions.raw_to_processed(trackedFileName):
+                moved.append(trackedFileName)
+    if len(names) > 0:
+        G.rename_files(names)
+    if len(moved) > 0:
+        processed_data.ProcessedData().delete_processed_data_files(moved)
+        print("  {} segment(s) of {} need to be processed again".format(len(moved), fileName))
+
+    storage.remove(filePath)
+
+    print("Converted {} ({} -> {} bytes)".format(fileName, originalSize,
+                                                storage.get_size(binaryFilePath)))
+    return binaryFilePath
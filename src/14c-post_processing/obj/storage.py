@@ -0,0 +1,438 @@
+from . import const
+import bz2
+import builtins
+import gzip
+import io
+import lzma
+import os
+import threading
+import zlib
+
+# modules that read and write each codec, keyed by the name used in const.py
+__CODECS = {"gzip": gzip, "lzma": lzma, "bz2": bz2}
+
+def compressed_path(filePath, compression=None):
+    """Finds where a data file is stored when it is compressed with a given 
+    codec.
+
+    Args:
+        filePath (str): path to the file, as it's named without compression.
+        compression (str, optional): name of the codec, as listed in 
+            const.COMPRESSED_FILE_TYPES. Defaults to None, which means 
+            uncompressed.
+
+    Returns:
+        str: path to the compressed file.
+    """
+
+    if compression == None:
+        return filePath
+    return filePath + const.COMPRESSED_FILE_TYPES[compression]
+
+def parse_stored_name(entry):
+    """Splits the name of a file in the data directory into the name it's 
+    known by elsewhere and the codec it's compressed with.
+
+    Args:
+        entry (str): name of the file as it's stored.
+
+    Returns:
+        str: name of the file without the suffix of the codec.
+        str: name of the codec, or None if the file isn't compressed.
+    """
+
+    for compression, suffix in const.COMPRESSED_FILE_TYPES.items():
+        if entry.endswith(suffix):
+            return entry[:-len(suffix)], compression
+    return entry, None
+
+def stored_path(filePath):
+    """Finds the file a data file is stored in, whichever codec it's 
+    compressed with.
+
+    An uncompressed file is used before a compressed one, then the codec set 
+    in const.DATA_COMPRESSION before any other, in case a file is stored twice 
+    (e.g. while it's being recompressed).
+
+    Args:
+        filePath (str): path to the file, as it's named without compression.
+
+    Returns:
+        str: path to the stored file, or None if it doesn't exist.
+    """
+
+    compressions = [None, const.DATA_COMPRESSION] + list(const.COMPRESSED_FILE_TYPES.keys())
+    for compression in compressions:
+        path = compressed_path(filePath, compression)
+        if os.path.exists(path):
+            return path
+    return None
+
+def exists(filePath):
+    """Checks if a data file exists, whichever codec it's compressed with.
+
+    Args:
+        filePath (str): path to the file, as it's named without compression.
+
+    Returns:
+        bool: 'True' if the file exists.
+    """
+
+    return stored_path(filePath) != None
+
+def get_size(filePath):
+    """Finds the size of a data file as it's stored, i.e. after compression.
+
+    Args:
+        filePath (str): path to the file, as it's named without compression.
+
+    Raises:
+        FileNotFoundError: raised if the file does not exist.
+
+    Returns:
+        int: size of the file in bytes.
+    """
+
+    path = stored_path(filePath)
+    if path == None:
+        raise FileNotFoundError(filePath)
+    return os.path.getsize(path)
+
+def list_directory(directory=None):
+    """Lists the files in a directory by the names they're known by, without 
+    the suffixes of any codecs. A file stored more than once is listed once.
+
+    Args:
+        directory (str, optional): the directory. Defaults to None, which is 
+            the data directory.
+
+    Returns:
+        list[str]: names of the files, in the order they were first found.
+    """
+
+    if directory == None:
+        directory = const.DATA_DIRECTORY
+
+    names = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            names[parse_stored_name(entry.name)[0]] = None
+    return list(names)
+
+def open_file(filePath, mode="r", newline=None):
+    """Opens a data file in the same way as the built-in 'open', compressing 
+    or decompressing it as needed, so callers only deal with the name of the 
+    file without compression.
+
+    Files are read in whichever codec they're stored with. A compressed file 
+    is decompressed in one go into memory, so it can be read (and seeked) like 
+    an uncompressed one - the data files are small enough for this to be 
+    quicker than decompressing them as they're read.
+
+    Files are written with the codec set in const.DATA_COMPRESSION. The file 
+    is kept in memory while it's written, so it can be seeked (as 'np.savez' 
+    needs), and is only written to disk when it's closed - to a temporary 
+    file that is then moved into place, after which any other copies of the 
+    file (uncompressed, or in another codec) are deleted. If the file is 
+    closed by a 'with' statement because of an exception, or never closed, 
+    nothing is written and the existing copy is kept.
+
+    Args:
+        filePath (str): path to the file, as it's named without compression.
+        mode (str, optional): "r", "rb", "w" or "wb", as for 'open'. Defaults 
+            to "r".
+        newline (str, optional): as for 'open', in text mode. Defaults to None.
+
+    Raises:
+        FileNotFoundError: raised if the file is opened to read and does not 
+            exist.
+        ValueError: raised if the mode isn't one of those above.
+
+    Returns:
+        file object: the open file.
+    """
+
+    binary = mode.endswith("b")
+    if mode not in ["r", "rb", "w", "wb"]:
+        raise ValueError("Mode not supported for data files: " + mode)
+
+    if mode[0] == "w":
+        codec = None if const.DATA_COMPRESSION == None else __CODECS[const.DATA_COMPRESSION]
+        f = _StoredFile(filePath, compressed_path(filePath, const.DATA_COMPRESSION), codec)
+        if binary:
+            return f
+        return _StoredTextFile(f, newline=newline)
+
+    path = stored_path(filePath)
+    if path == None:
+        raise FileNotFoundError(2, "No such file or directory", filePath)
+
+    compression = parse_stored_name(path)[1]
+    if compression == None or path == filePath:
+        return builtins.open(path, mode, newline=None if binary else newline)
+
+    with builtins.open(path, "rb") as f:
+        data = io.BytesIO(__CODECS[compression].decompress(f.read()))
+    if binary:
+        return data
+    return io.TextIOWrapper(data, newline=newline)
+
+class _StoredFile(io.BytesIO):
+    """A binary data file that is kept in memory while it's written, and is 
+    compressed (if need be) and written to disk when it's closed. The file on 
+    disk is replaced in one step, so it's never left half written.
+
+    Attributes:
+        __filePath (str): path to the file, as it's named without compression.
+        __path (str): path to write the stored file to.
+        __codec (module): module of the codec to compress the file with, or 
+            None to write it uncompressed.
+        __discarded (bool): 'True' if the file shouldn't be written.
+
+    Methods:
+        __init__ : class constructor.
+        __del__ : class destructor.
+        __exit__ : closes the file at the end of a 'with' statement.
+        close : writes the file to disk.
+        discard : stops the file being written to disk.
+    """
+
+    def __init__(self, filePath, path, codec):
+        """Constructor for class.
+
+        Args:
+            filePath (str): path to the file, as it's named without 
+                compression.
+            path (str): path to write the stored file to.
+            codec (module): module of the codec to compress the file with, or 
+                None to write it uncompressed.
+        """
+
+        super().__init__()
+        self.__filePath = filePath
+        self.__path = path
+        self.__codec = codec
+        self.__discarded = False
+
+    def __del__(self):
+        """Destructor for class. A file that was never closed is discarded, 
+        as it may not have been finished.
+        """
+
+        self.discard()
+        super().__del__()
+
+    def __exit__(self, exceptionType, exception, traceback):
+        """Closes the file at the end of a 'with' statement, discarding it if 
+        the statement raised an exception.
+        """
+
+        if exceptionType != None:
+            self.discard()
+        return super().__exit__(exceptionType, exception, traceback)
+
+    def close(self):
+        """Writes the contents of the file to disk, the first time it is 
+        called, unless the file has been discarded.
+
+        The contents are written to a temporary file, which is then moved into 
+        place, and only then are any other copies of the file deleted.
+
+        Returns:
+            NoneType: signifies completion.
+        """
+
+        if not self.closed and not self.__discarded:
+            data = self.getvalue()
+            if self.__codec != None:
+                data = self.__codec.compress(data)
+
+            temporaryPath = _temporary_path(self.__path)
+            try:
+                with builtins.open(temporaryPath, "wb") as f:
+                    f.write(data)
+                os.replace(temporaryPath, self.__path)
+            except OSError: # e.g. the disk is full - the old copy is kept
+                if os.path.exists(temporaryPath):
+                    os.remove(temporaryPath)
+                raise
+            remove(self.__filePath, keep=self.__path)
+
+        super().close()
+        return None
+
+    def discard(self):
+        """Stops the file being written to disk when it's closed.
+
+        Returns:
+            NoneType: signifies completion.
+        """
+
+        self.__discarded = True
+        return None
+
+class _StoredTextFile(io.TextIOWrapper):
+    """A text data file, written through a '_StoredFile'.
+
+    Methods:
+        __del__ : class destructor.
+        __exit__ : closes the file at the end of a 'with' statement.
+    """
+
+    def __del__(self):
+        """Destructor for class. A file that was never closed is discarded, 
+        as it may not have been finished.
+        """
+
+        self.buffer.discard()
+        super().__del__()
+
+    def __exit__(self, exceptionType, exception, traceback):
+        """Closes the file at the end of a 'with' statement, discarding it if 
+        the statement raised an exception.
+        """
+
+        if exceptionType != None:
+            self.buffer.discard()
+        return super().__exit__(exceptionType, exception, traceback)
+
+
+def _temporary_path(path):
+    """Finds a path to write a file to before it's moved into place, with a 
+    name that isn't listed as a data file.
+
+    Args:
+        path (str): path the file will be moved to.
+
+    Returns:
+        str: the temporary path.
+    """
+
+    directory, name = os.path.split(path)
+    return os.path.join(directory, "." + name + ".tmp")
+
+def remove(filePath, keep=None):
+    """Deletes every stored copy of a data file, whichever codec they're 
+    compressed with.
+
+    Args:
+        filePath (str): path to the file, as it's named without compression.
+        keep (str, optional): path to a stored copy not to delete. Defaults to 
+            None.
+
+    Returns:
+        bool: 'True' if anything was deleted.
+    """
+
+    deleted = False
+    for compression in [None] + list(const.COMPRESSED_FILE_TYPES.keys()):
+        path = compressed_path(filePath, compression)
+        if path != keep and os.path.exists(path):
+            os.remove(path)
+            deleted = True
+    return deleted
+
+def recompress_file(filePath, compression=None):
+    """Stores a data file with a given codec, in place of how it's stored now.
+
+    The new copy is written to a temporary file and moved into place before 
+    the old copy is deleted, so the file can still be read while this is 
+    running. If the old copy changes while it's being recompressed (e.g. a 
+    processed data file being written at the same time), it's left as it is.
+
+    Args:
+        filePath (str): path to the file, as it's named without compression.
+        compression (str, optional): name of the codec, as listed in 
+            const.COMPRESSED_FILE_TYPES. Defaults to None, which stores the 
+            file uncompressed.
+
+    Returns:
+        tuple: sizes of the file in bytes before and after, or None if it 
+            wasn't recompressed.
+    """
+
+    oldPath = stored_path(filePath)
+    newPath = compressed_path(filePath, compression)
+    if oldPath == None or oldPath == newPath:
+        return None
+
+    oldStat = os.stat(oldPath)
+    with open_file(filePath, "rb") as f:
+        data = f.read()
+    if compression != None:
+        data = __CODECS[compression].compress(data)
+
+    temporaryPath = _temporary_path(newPath)
+    with builtins.open(temporaryPath, "wb") as f:
+        f.write(data)
+    os.utime(temporaryPath, ns=(oldStat.st_atime_ns, oldStat.st_mtime_ns)) # it hasn't been modified
+
+    try:
+        newStat = os.stat(oldPath)
+    except FileNotFoundError:
+        newStat = None
+    if newStat == None or (newStat.st_mtime_ns, newStat.st_size) != \
+                            (oldStat.st_mtime_ns, oldStat.st_size):
+        os.remove(temporaryPath)
+        return None
+
+    os.replace(temporaryPath, newPath)
+    remove(filePath, keep=newPath)
+
+    return oldStat.st_size, len(data)
+
+def recompress_all_files(compression):
+    """Stores every raw and processed data file in the data directory with a 
+    given codec, e.g. after const.DATA_COMPRESSION has been changed.
+
+    Args:
+        compression (str): name of the codec, as listed in 
+            const.COMPRESSED_FILE_TYPES, or None to store the files 
+            uncompressed.
+
+    Returns:
+        int: number of files recompressed.
+    """
+
+    count = 0
+    sizeBefore = 0
+    sizeAfter = 0
+
+    for entry in sorted(list_directory()):
+        if entry[:len(const.RAW_DATA_PREFIX)] != const.RAW_DATA_PREFIX and \
+                entry[:len(const.PROCESSED_DATA_PREFIX)] != const.PROCESSED_DATA_PREFIX:
+            continue
+
+        try:
+            sizes = recompress_file(os.path.join(const.DATA_DIRECTORY, entry), compression)
+        except (OSError, EOFError, lzma.LZMAError, zlib.error) as e: # e.g. a corrupt compressed file
+            print("{} could not be recompressed: {}".format(entry, e))
+            continue
+        if sizes != None:
+            count += 1
+            sizeBefore += sizes[0]
+            sizeAfter += sizes[1]
+
+    print("Finished: {} data files recompressed ({} -> {} bytes)"
+            .format(count, sizeBefore, sizeAfter))
+    return count
+
+def start_recompression(compression):
+    """Recompresses every raw and processed data file (see 
+    'recompress_all_files') in a background thread, so other work can carry 
+    on at the same time. The codecs release the GIL while they compress, so 
+    the thread doesn't hold up the rest of the program much.
+
+    Args:
+        compression (str): name of the codec, as listed in 
+            const.COMPRESSED_FILE_TYPES, or None to store the files 
+            uncompressed.
+
+    Returns:
+        threading.Thread: the thread, which has been started.
+    """
+
+    thread = threading.Thread(target=recompress_all_files, args=(compression,),
+                                name="recompression")
+    thread.start()
+    return thread
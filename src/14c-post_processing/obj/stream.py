@@ -0,0 +1,242 @@
+from . import const
+from . import functions
+from . import global_tracker
+from . import processed_data
+from . import raw_data
+import numpy as np
+import os
+
+class StreamingThrow:
+    """Processes a raw data file line by line, while it is being received, so 
+    that its processed data file and its entry in the tracker are ready as 
+    soon as the last line arrives.
+
+    Each line is health checked with the same functions as 
+    '_RawDataHealthChecker' uses on a whole file, and then converted into the 
+    units of the processed data file with the same functions as 
+    'ProcessedData' uses, and kept in memory. When the file is finished, the 
+    flight is found and the processed data file is created from the data in 
+    memory, with every calculation run on it, so the raw data file is never 
+    read back.
+
+    Attributes:
+        filePath (str): full absolute file path to the raw data file.
+        fileName (str): name of the raw data file.
+        errors (list[tuple]): line number and message of each failed test.
+        warnings (list[tuple]): line number and message of each warning.
+        integrationMethods (dict[str, str]): integration method used by each 
+            calculation (or column) that integrates, if it is not the default.
+        __data (np.ndarray): converted data of every usable line so far, with 
+            spare rows at the end to add more lines to.
+        __length (int): number of rows of '__data' in use.
+        __lineNumber (int): number of lines received.
+        __previousTime (float): time of the last usable line.
+        __sensorsInitialised (np.ndarray): whether each of the three sensors 
+            had initialised at each row of '__data'.
+
+    Methods:
+        __init__ : class constructor.
+        health_status (property) : getter for the health status of the lines 
+            received so far.
+        length (property) : getter for the number of usable lines received.
+        add_line : checks and converts a line of the raw data file.
+        finish : updates the tracker and creates the processed data file, once 
+            the whole file has been received.
+        __check_line : runs the health check tests on one line.
+        __convert_line : converts one line into the units of the processed 
+            data file.
+    """
+
+    def __init__(self, filePath, integrationMethods=None):
+        """Constructor for class.
+
+        Args:
+            filePath (str): full absolute file path to the raw data file. The 
+                file must be in the data directory.
+            integrationMethods (dict[str, str], optional): integration method 
+                to use for each calculation (or column), keyed by its name - 
+                see 'calculations.set_integration_method'. Defaults to None, 
+                which uses const.DEFAULT_INTEGRATION_METHOD for all of them.
+        """
+
+        self.filePath = filePath
+        self.fileName = os.path.join(const.DATA_DIRECTORY, os.path.basename(filePath)) \
+                            [const.PATH_LENGTH_TO_DATA_DIR:]
+        self.errors = []
+        self.warnings = []
+        self.integrationMethods = dict(integrationMethods or {})
+
+        self.__data = np.empty((1024, const.NUMBER_OF_COLUMNS))
+        self.__sensorsInitialised = np.empty((1024, 3), dtype=bool)
+        self.__length = 0
+        self.__lineNumber = 0
+        self.__previousTime = 0
+
+    @property
+    def health_status(self):
+        """Getter for the health status of the lines received so far.
+
+        Returns:
+            int: the health status.
+        """
+
+        if len(self.errors) > 0:
+            return const.failed
+        elif len(self.warnings) > 0:
+            return const.passedWithWarnings
+        return const.passed
+
+    @property
+    def length(self):
+        """Getter for the number of usable lines received so far.
+
+        Returns:
+            int: number of lines.
+        """
+
+        return self.__length
+
+    def add_line(self, line):
+        """Health checks a line of the raw data file, and if it's usable, 
+        converts it and adds it to the data in memory.
+
+        Args:
+            line (str): the line, without its ending.
+
+        Returns:
+            bool: 'True' if the line is usable.
+        """
+
+        self.__lineNumber += 1
+
+        values = self.__check_line(line)
+        if values is None:
+            return False
+
+        # make room for more lines, doubling the space each time
+        if self.__length == len(self.__data):
+            self.__data = np.concatenate([self.__data, np.empty_like(self.__data)])
+            self.__sensorsInitialised = np.concatenate([self.__sensorsInitialised,
+                                                np.empty_like(self.__sensorsInitialised)])
+
+        self.__convert_line(values)
+        self.__length += 1
+        return True
+
+    def finish(self, calculations=None):
+        """Records the health status of the raw data file in the tracker, and 
+        if it passed, creates its processed data file and fills in its metrics 
+        in the tracker.
+
+        If the raw data file came from one of several devices (balls), the 
+        device is recorded in the tracker too.
+
+        Args:
+            calculations (list[str], optional): names of the calculations to 
+                run on the processed data file, as listed in 
+                'calculations.registry'. Defaults to None, which runs all of 
+                them.
+
+        Returns:
+            str: name of the processed data file, or None if the raw data file 
+                failed the health check.
+        """
+
+        self.errors.sort()
+        self.warnings.sort()
+        healthStatus = self.health_status
+
+        G = global_tracker.get_tracker(False)
+        G.add_files({self.fileName: healthStatus})
+
+        M = processed_data.ProcessedData().metrics
+        deviceId = M.device(self.fileName)
+        if deviceId != None:
+            try:
+                G.write_to_file(self.fileName, G.get_column_number(M.device(heading=True)),
+                                deviceId)
+            except ValueError: # no column for the device yet
+                G.add_metric(M.device)
+
+        if healthStatus < const.passedWithWarnings:
+            print("{} failed {} test(s)".format(self.fileName, len(self.errors)))
+            for lineNumber, error in self.errors:
+                print("  line {}: {}".format(lineNumber, error))
+            return None
+
+        P = processed_data.ProcessedData(True, integrationMethods=self.integrationMethods)
+        if calculations == None:
+            calculations = list(P.individual.calculations.registry.keys())
+
+        processedFileName = P.create_processed_data_file_from_data(
+                                self.fileName, self.__data[:self.__length],
+                                self.__sensorsInitialised[:self.__length],
+                                calculations, updateTracker=False)
+
+        # fill in the metrics that are already in the tracker
+        updates = [(self.fileName, 2, processedFileName)]
+        headings = []
+        for heading in M.registry.keys():
+            try:
+                headings.append((G.get_column_number(heading), heading))
+            except ValueError:
+                continue
+        values = M.calculate([heading for _, heading in headings], self.fileName)
+        for columnNumber, heading in headings:
+            updates.append((self.fileName, columnNumber, values[heading]))
+
+        G.write_many_to_file(updates)
+
+        return processedFileName
+
+    def __check_line(self, line):
+        """Private method to run the health check tests on one line, with the 
+        same functions as '_assess_file' uses for a whole file (see 
+        'raw_data._read_lines' and 'raw_data._check_rows'). Any errors and 
+        warnings are added to 'errors' and 'warnings'.
+
+        Args:
+            line (str): the line to check.
+
+        Returns:
+            np.ndarray: values in the line, or None if it can't be used.
+        """
+
+        thresholds = (const.THROW_TIME_WARNING_THRESHOLD,
+                        const.ACCELEROMETER_WARNING_THRESHOLD,
+                        const.GYRO_WARNING_THRESHOLD)
+
+        values, lineNumbers, unreadable = raw_data._read_lines([line], self.errors,
+                                                                self.__lineNumber)
+        usable = raw_data._check_rows(values, lineNumbers, unreadable, thresholds,
+                                        self.errors, self.warnings, self.__previousTime)
+        if not np.any(usable):
+            return None
+
+        self.__previousTime = values[0, 0]
+        return values[0]
+
+    def __convert_line(self, values):
+        """Private method to convert one line into the units of the processed 
+        data file, with the same functions as 'ProcessedData' uses for a whole 
+        file, and add it to the end of the data in memory.
+
+        Whether a sensor has initialised only depends on the lines received so 
+        far, so it is carried on from the line before.
+
+        Args:
+            values (np.ndarray): values in the line.
+
+        Returns:
+            NoneType: signifies completion.
+        """
+
+        row = self.__length
+        values = values.reshape(1, -1)
+
+        previous = self.__sensorsInitialised[row-1] if row > 0 else None
+        initialised = functions.find_sensors_initialised(values, previous)
+
+        self.__sensorsInitialised[row] = initialised[0]
+        self.__data[row] = functions.convert_units(values, initialised)[0]
+        return None
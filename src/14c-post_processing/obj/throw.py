@@ -0,0 +1,548 @@
+from . import const
+from . import functions
+from . import storage
+import csv
+import numpy as np
+import struct
+import zipfile
+
+class Throw:
+    """In-memory, column-oriented copy of a single processed data file.
+
+    The file is read once, and every column is stored as a NumPy array keyed by 
+    its header. Calculations read from and write to this object, and the 
+    contents are only written back to disk when 'write_to_file' is called, so 
+    that a file is read once and written once no matter how many columns are 
+    added to it.
+
+    The data is stored in a binary file (a NumPy '.npz' bundle with one array 
+    per column, plus an array of the headers, and the names and values of any 
+    metadata) next to where the CSV version of 
+    the processed data file would be. If there is no binary file, the CSV file 
+    is read instead. The CSV file is only written when asked for, using 
+    'export_csv', and is deleted whenever the binary file is written, so an 
+    exported copy is never older than the data.
+
+    Attributes:
+        fileName (str): name of the processed data file.
+        __columns (dict[str, np.ndarray]): data in the file, keyed by column 
+            header, in the same order as the columns in the file.
+        __metadata (dict[str, float]): values describing the throw as a whole, 
+            such as where the flight starts and ends. Not included in the CSV 
+            file.
+        __loaded (bool): 'True' once the file has been read into memory.
+        __modified (bool): 'True' if the data has changed since it was last 
+            read from or written to the file.
+
+    Methods:
+        __init__ : class constructor.
+        binary_file_path (property) : getter for the path to the binary 
+            processed data file.
+        file_path (property) : getter for the path to the processed data file.
+        headers (property) : getter for a list of the column headers.
+        length (property) : getter for the number of rows of data.
+        metadata (property) : getter for the attribute of the same name.
+        modified (property) : getter for the attribute of the same name.
+        export_csv : writes the data in memory to the CSV processed data file.
+        get_column : returns the data in a given column.
+        get_column_number : returns the column number of a given heading.
+        has_column : checks if a given column exists.
+        load : reads the processed data file into memory.
+        read_columns : reads only some columns of the processed data file.
+        read_last_values : reads only the last row of some columns of the 
+            processed data file.
+        set_column : adds a new column, or overwrites an existing one.
+        set_data : replaces all the data in memory.
+        set_metadata : sets one value of the metadata.
+        write_to_file : writes the data in memory to the binary processed data 
+            file.
+        __load_binary : reads the binary processed data file.
+        __load_csv : reads the CSV processed data file.
+        __read_metadata : reads the metadata from the binary processed data 
+            file.
+        __read_last_binary : reads the last value of some columns of the 
+            binary processed data file.
+    """
+
+    def __init__(self, fileName=""):
+        """Constructor for class.
+
+        Args:
+            fileName (str, optional): name of the processed (or raw) data file. 
+                Defaults to "".
+        """
+
+        # ensure processed file, not raw
+        self.fileName = functions.raw_to_processed(fileName)
+        self.__columns = {}
+        self.__metadata = {}
+        self.__loaded = False
+        self.__modified = False
+
+    @property
+    def binary_file_path(self):
+        """Getter for the path to the binary processed data file.
+
+        Returns:
+            str: full path to the binary processed data file.
+        """
+
+        return functions.processed_to_binary(self.file_path)
+
+    @property
+    def file_path(self):
+        """Getter for the path to the (CSV) processed data file.
+
+        Returns:
+            str: full path to the processed data file.
+        """
+
+        return const.DATA_DIRECTORY + self.fileName.split("\\")[-1]
+
+    @property
+    def headers(self):
+        """Getter for the column headers, in the order they appear in the file.
+
+        Returns:
+            list[str]: column headers.
+        """
+
+        self.load()
+        return list(self.__columns.keys())
+
+    @property
+    def length(self):
+        """Getter for the number of rows of data (excluding the header).
+
+        Returns:
+            int: number of rows.
+        """
+
+        self.load()
+        for values in self.__columns.values():
+            return len(values)
+        return 0
+
+    @property
+    def metadata(self):
+        """Getter for attribute of the same name. Only the metadata is read 
+        from the file if the data isn't already in memory.
+
+        Returns:
+            dict[str, float]: copy of the metadata.
+        """
+
+        if self.__loaded:
+            return dict(self.__metadata)
+
+        if storage.exists(self.binary_file_path):
+            with storage.open_file(self.binary_file_path, "rb") as f, np.load(f) as npz_file:
+                return self.__read_metadata(npz_file)
+        return {}
+
+    @property
+    def modified(self):
+        """Getter for attribute of the same name.
+
+        Returns:
+            bool: 'True' if there are changes that have not been written to the 
+                file.
+        """
+
+        return self.__modified
+
+
+    def export_csv(self):
+        """Writes the data in memory to the CSV processed data file, in one 
+        pass.
+
+        Returns:
+            str: path to the CSV file.
+        """
+
+        self.load()
+
+        with storage.open_file(self.file_path, "w", newline="") as f:
+            processed_file = csv.writer(f)
+            processed_file.writerow(self.headers)
+            if self.length:
+                processed_file.writerows(
+                    np.column_stack(list(self.__columns.values())).tolist())
+
+        return self.file_path
+
+    def get_column(self, columnHeading):
+        """Returns the data in the column with the given heading.
+
+        Args:
+            columnHeading (str): name of column.
+
+        Raises:
+            ValueError: raised if the column is not found in the header.
+
+        Returns:
+            np.ndarray: data in the column.
+        """
+
+        self.load()
+        try:
+            return self.__columns[columnHeading]
+        except KeyError:
+            raise ValueError("Column heading not found")
+
+    def get_column_number(self, columnHeading):
+        """Returns the column number associated with a given heading.
+
+        Args:
+            columnHeading (str): name of column to be found.
+
+        Raises:
+            ValueError: raised if the column is not found in the header.
+
+        Returns:
+            int: index of column.
+        """
+
+        try:
+            return self.headers.index(columnHeading)
+        except ValueError:
+            raise ValueError("Column heading not found")
+
+    def has_column(self, columnHeading):
+        """Checks if a column with the given heading exists.
+
+        Args:
+            columnHeading (str): name of column.
+
+        Returns:
+            bool: 'True' if the column exists, 'False' otherwise.
+        """
+
+        self.load()
+        return columnHeading in self.__columns
+
+    def load(self, reload=False):
+        """Reads every column of the processed data file into memory.
+
+        Only reads the file the first time it is called, unless 'reload' is 
+        set. The binary file is read if it exists, otherwise the CSV file is 
+        read.
+
+        Args:
+            reload (bool, optional): set 'True' to discard the data in memory 
+                and read the file again. Defaults to False.
+
+        Raises:
+            FileNotFoundError: raised if the processed data file does not 
+                exist.
+
+        Returns:
+            Throw: this object.
+        """
+
+        if self.__loaded and not reload:
+            return self
+
+        if storage.exists(self.binary_file_path):
+            self.__columns = self.__load_binary()
+        else:
+            self.__columns = self.__load_csv()
+            self.__metadata = {}
+
+        self.__loaded = True
+        self.__modified = False
+        return self
+
+    def read_columns(self, columnHeadings):
+        """Returns the data in the given columns, reading only those columns 
+        from the file if it hasn't already been read into memory.
+
+        The binary file stores each column separately, so only the columns 
+        asked for are read from it. If there is no binary file, only the 
+        columns asked for are converted from the CSV file. The data is not 
+        kept in memory.
+
+        Args:
+            columnHeadings (list[str]): names of the columns.
+
+        Raises:
+            FileNotFoundError: raised if the processed data file does not 
+                exist.
+
+        Returns:
+            dict[str, np.ndarray]: data in each column, keyed by column 
+                header. Columns that aren't in the file are left out.
+        """
+
+        if self.__loaded:
+            return {heading: self.__columns[heading] for heading in columnHeadings
+                        if heading in self.__columns}
+
+        if storage.exists(self.binary_file_path):
+            with storage.open_file(self.binary_file_path, "rb") as f, np.load(f) as npz_file:
+                headers = [str(header) for header in npz_file["headers"]]
+                return {heading: npz_file["column {}".format(headers.index(heading))]
+                            for heading in columnHeadings if heading in headers}
+
+        with storage.open_file(self.file_path) as f:
+            headers = f.readline().strip().split(",")
+            columnHeadings = [heading for heading in columnHeadings if heading in headers]
+            if len(columnHeadings) == 0:
+                return {}
+            data = np.loadtxt(f, delimiter=",", ndmin=2,
+                                usecols=[headers.index(heading) for heading in columnHeadings])
+
+        if data.size == 0:
+            data = np.zeros((0, len(columnHeadings)))
+
+        return {heading: data[:, i] for i, heading in enumerate(columnHeadings)}
+
+    def read_last_values(self, columnHeadings):
+        """Returns the last value in each of the given columns, without reading 
+        the rest of the file, if it hasn't already been read into memory.
+
+        In the binary file, the position of the last value of each column is 
+        worked out and only that value is read. In the CSV file, only the last 
+        line is read, by reading backwards from the end of the file. Either 
+        way, the time taken doesn't depend on the length of the file, unless 
+        the file is compressed, as it has to be decompressed first.
+
+        Args:
+            columnHeadings (list[str]): names of the columns.
+
+        Raises:
+            FileNotFoundError: raised if the processed data file does not 
+                exist.
+
+        Returns:
+            dict[str, np.ndarray]: last value in each column, as an array so it 
+                can be used in the same way as a whole column. The array is 
+                empty if the file has no data. Columns that aren't in the file 
+                are left out.
+        """
+
+        if self.__loaded:
+            return {heading: self.__columns[heading][-1:] for heading in columnHeadings
+                        if heading in self.__columns}
+
+        if storage.exists(self.binary_file_path):
+            return self.__read_last_binary(columnHeadings)
+
+        with storage.open_file(self.file_path) as f:
+            header = f.readline().rstrip("\r\n")
+        headers = header.split(",")
+
+        lastLine = functions.read_last_line(self.file_path)
+        if lastLine == header: # no data under the header
+            values = np.zeros((0, len(headers)))
+        else:
+            values = np.array([[float(value) for value in lastLine.split(",")]])
+
+        return {heading: values[:, headers.index(heading)]
+                    for heading in columnHeadings if heading in headers}
+
+    def set_column(self, columnHeading, values):
+        """Adds a column with the given heading, or overwrites it if it already 
+        exists.
+
+        Args:
+            columnHeading (str): name of column.
+            values (list[float]): data for the column, with one value for each 
+                row.
+
+        Raises:
+            ValueError: raised if the number of values does not match the 
+                number of rows.
+
+        Returns:
+            np.ndarray: the data stored in the column.
+        """
+
+        self.load()
+        values = np.asarray(values, dtype=float)
+
+        if self.__columns and len(values) != self.length:
+            raise ValueError("Column '{}' has {} values - should be {}"
+                                .format(columnHeading, len(values), self.length))
+
+        self.__columns[columnHeading] = values
+        self.__modified = True
+        return values
+
+    def set_data(self, headers, data):
+        """Replaces all the data in memory, without reading the file. Used when 
+        creating a new processed data file.
+
+        Args:
+            headers (list[str]): column headers.
+            data (np.ndarray): 2D array of data, with one column for each 
+                header.
+
+        Returns:
+            Throw: this object.
+        """
+
+        data = np.asarray(data, dtype=float).reshape(-1, len(headers))
+
+        self.__columns = {}
+        for i, header in enumerate(headers):
+            self.__columns[header] = data[:, i]
+        self.__metadata = {}
+
+        self.__loaded = True
+        self.__modified = True
+        return self
+
+    def set_metadata(self, key, value):
+        """Sets one value of the metadata, which describes the throw as a 
+        whole.
+
+        Args:
+            key (str): name of the value.
+            value (float): the value.
+
+        Returns:
+            float: the value stored.
+        """
+
+        self.load()
+        self.__metadata[key] = float(value)
+        self.__modified = True
+        return self.__metadata[key]
+
+    def write_to_file(self):
+        """Writes the data in memory to the binary processed data file. Any 
+        CSV processed data file is deleted, as it no longer matches the data.
+
+        Returns:
+            bool: 'True' if the file was written, 'False' if there were no 
+                changes to write.
+        """
+
+        if not self.__modified:
+            return False
+
+        # one array per column, so they can be read without parsing any text
+        arrays = {"headers": np.array(self.headers)}
+        for i, values in enumerate(self.__columns.values()):
+            arrays["column {}".format(i)] = values
+        if self.__metadata:
+            arrays["metadata names"] = np.array(list(self.__metadata.keys()))
+            arrays["metadata values"] = np.array(list(self.__metadata.values()))
+
+        with storage.open_file(self.binary_file_path, "wb") as f:
+            np.savez(f, **arrays)
+        storage.remove(self.file_path)
+
+        self.__modified = False
+        return True
+
+
+    def __load_binary(self):
+        """Private method to read every column of the binary processed data 
+        file.
+
+        Returns:
+            dict[str, np.ndarray]: data in the file, keyed by column header.
+        """
+
+        columns = {}
+        with storage.open_file(self.binary_file_path, "rb") as f, np.load(f) as npz_file:
+            for i, header in enumerate(npz_file["headers"]):
+                columns[str(header)] = npz_file["column {}".format(i)]
+            self.__metadata = self.__read_metadata(npz_file)
+
+        return columns
+
+    def __load_csv(self):
+        """Private method to read every column of the CSV processed data file.
+
+        Returns:
+            dict[str, np.ndarray]: data in the file, keyed by column header.
+        """
+
+        with storage.open_file(self.file_path) as f:
+            headers = f.readline().strip().split(",")
+            data = np.loadtxt(f, delimiter=",", ndmin=2)
+
+        if data.size == 0:
+            data = np.zeros((0, len(headers)))
+
+        columns = {}
+        for i, header in enumerate(headers):
+            columns[header] = data[:, i]
+
+        return columns
+
+    def __read_metadata(self, npz_file):
+        """Private method to read the metadata from the binary processed data 
+        file.
+
+        Args:
+            npz_file (np.lib.npyio.NpzFile): the open binary file.
+
+        Returns:
+            dict[str, float]: the metadata, which is empty if the file has none.
+        """
+
+        if "metadata names" not in npz_file.files:
+            return {}
+        return {str(key): float(value) for key, value in
+                    zip(npz_file["metadata names"], npz_file["metadata values"])}
+
+    def __read_last_binary(self, columnHeadings):
+        """Private method to read the last value of some columns of the binary 
+        processed data file.
+
+        The bundle is a zip archive of '.npy' files, stored without 
+        compression, so the position of the last value of a column in the 
+        bundle can be found from the zip and '.npy' headers, and the value read 
+        on its own.
+
+        Args:
+            columnHeadings (list[str]): names of the columns.
+
+        Returns:
+            dict[str, np.ndarray]: last value in each column, keyed by column 
+                header.
+        """
+
+        values = {}
+
+        with storage.open_file(self.binary_file_path, "rb") as f, \
+                zipfile.ZipFile(f) as zip_file:
+            with zip_file.open("headers.npy") as headers_file:
+                headers = [str(header) for header in np.load(headers_file)]
+
+            for heading in columnHeadings:
+                if heading not in headers:
+                    continue
+
+                memberName = "column {}.npy".format(headers.index(heading))
+                info = zip_file.getinfo(memberName)
+
+                if info.compress_type != zipfile.ZIP_STORED: # can't seek, read it all
+                    with zip_file.open(memberName) as column_file:
+                        values[heading] = np.load(column_file)[-1:]
+                    continue
+
+                # skip the zip header of the member (30 bytes, then its name and extra field)
+                f.seek(info.header_offset)
+                nameLength, extraLength = struct.unpack("<HH", f.read(30)[26:30])
+                f.seek(nameLength + extraLength, 1)
+
+                # read the .npy header to get the length and type of the column
+                version = np.lib.format.read_magic(f)
+                if version == (1, 0):
+                    shape, _, dtype = np.lib.format.read_array_header_1_0(f)
+                else:
+                    shape, _, dtype = np.lib.format.read_array_header_2_0(f)
+
+                if shape[0] == 0:
+                    values[heading] = np.zeros(0, dtype=dtype)
+                    continue
+
+                f.seek((shape[0] - 1) * dtype.itemsize, 1)
+                values[heading] = np.frombuffer(f.read(dtype.itemsize), dtype=dtype)
+
+        return values
@@ -0,0 +1,518 @@
+from . import const
+from . import functions
+from . import global_tracker
+from . import processed_data
+from . import raw_data
+from . import storage
+from .throw import Throw
+import collections
+import concurrent.futures
+import os
+import time
+
+class Watcher:
+    """Watches the data directory for new or changed raw data files, and puts 
+    each one through the health check, into a processed data file with every 
+    calculation run on it, and its metrics into the tracker, without going 
+    through the menus of 'main.py'.
+
+    The data directory is polled every 'pollInterval' seconds. A file is only 
+    queued once its size and time modified have stayed the same for 
+    'settleTime' seconds, so files that are still being written (e.g. by the 
+    receiver) aren't read half written. A file is only processed if it hasn't 
+    got a processed data file, or it has changed since its processed data file 
+    was written, so files processed before the watcher started (or while they 
+    were received - see 'stream.StreamingThrow') are left alone. If a raw data 
+    file has been split into throws (see 'split_raw_data_file'), each throw is 
+    processed.
+
+    Files are processed by a pool of 'workers' processes, in the order they 
+    were queued, and no more files are given to the pool than it has workers, 
+    so the rest wait in the queue. The tracker is only written to by this 
+    process, once each file is finished. The metrics filled in are the ones 
+    that already have a column in the tracker.
+
+    Attributes:
+        workers (int): number of processes files are processed by.
+        pollInterval (float): time between scans of the data directory, in 
+            seconds.
+        settleTime (float): time a file must be unchanged for before it's 
+            queued, in seconds.
+        integrationMethods (dict[str, str]): integration method used by each 
+            calculation (or column) that integrates, if it is not the default.
+        processed (int): number of files processed.
+        failed (int): number of files that failed the health check, or 
+            couldn't be processed.
+        __changes (dict[str, tuple]): size and time modified of each file that 
+            is waiting to settle, and when they were first seen, keyed by the 
+            name of the file.
+        __signatures (dict[str, tuple]): size and time modified of each file 
+            when it was last queued or found to be up to date.
+        __queue (collections.OrderedDict): files waiting for a worker, with 
+            the times they were first seen changing and were queued, in the 
+            order they were queued.
+        __running (dict[concurrent.futures.Future, tuple]): files being 
+            processed, with the times they were first seen changing, queued 
+            and given to a worker.
+        __latencies (dict[str, collections.deque]): time taken by each stage 
+            for the last few files, keyed by the name of the stage.
+        __executor (concurrent.futures.ProcessPoolExecutor): the pool, while 
+            'run' is running.
+
+    Methods:
+        __init__ : class constructor.
+        latencies (property) : getter for the time taken by each stage.
+        queue_depth (property) : getter for the number of files waiting or 
+            being processed.
+        poll : scans the data directory once and hands queued files to the 
+            pool.
+        run : watches the data directory until interrupted.
+        status : summarises the queue and the time taken by each stage.
+        __finish : records the results of a file in the tracker.
+        __is_up_to_date : checks if a raw data file has been processed since 
+            it last changed.
+        __scan : finds raw data files that have changed and settled.
+        __submit : hands queued files to the pool.
+    """
+
+    # stages each file goes through, in order
+    STAGES = ["settling", "queue", "health check", "processing", "calculations",
+                "metrics", "tracker", "total"]
+
+    def __init__(self, workers=const.DEFAULT_WORKERS, pollInterval=const.WATCH_POLL_INTERVAL,
+                    settleTime=const.WATCH_SETTLE_TIME, integrationMethods=None):
+        """Constructor for class.
+
+        Args:
+            workers (int, optional): number of processes files are processed 
+                by. Defaults to const.DEFAULT_WORKERS.
+            pollInterval (float, optional): time between scans of the data 
+                directory, in seconds. Defaults to const.WATCH_POLL_INTERVAL.
+            settleTime (float, optional): time a file must be unchanged for 
+                before it's queued, in seconds. Defaults to 
+                const.WATCH_SETTLE_TIME.
+            integrationMethods (dict[str, str], optional): integration method 
+                to use for each calculation (or column), keyed by its name - 
+                see 'calculations.set_integration_method'. Defaults to None, 
+                which uses const.DEFAULT_INTEGRATION_METHOD for all of them.
+
+        Raises:
+            ValueError: raised if an integration method is not recognised.
+        """
+
+        self.workers = max(1, workers)
+        self.pollInterval = pollInterval
+        self.settleTime = settleTime
+        self.integrationMethods = dict(integrationMethods or {})
+
+        # check the methods now, rather than in every worker
+        for method in self.integrationMethods.values():
+            if method not in const.INTEGRATION_METHODS:
+                raise ValueError("Unknown integration method: {}".format(method))
+        self.processed = 0
+        self.failed = 0
+
+        self.__changes = {}
+        self.__signatures = {}
+        self.__queue = collections.OrderedDict()
+        self.__running = {}
+        self.__latencies = {stage: collections.deque(maxlen=const.WATCH_LATENCY_SAMPLES)
+                                for stage in self.STAGES}
+        self.__executor = None
+
+    @property
+    def latencies(self):
+        """Getter for the time taken by each stage, over the last few files 
+        (const.WATCH_LATENCY_SAMPLES).
+
+        Returns:
+            dict[str, dict]: the mean, maximum and last time taken in seconds, 
+                keyed by the name of the stage. Stages no file has been 
+                through yet are left out.
+        """
+
+        return {stage: {"mean": sum(times) / len(times), "max": max(times),
+                            "last": times[-1]}
+                    for stage, times in self.__latencies.items() if len(times) > 0}
+
+    @property
+    def queue_depth(self):
+        """Getter for the number of files waiting for a worker, and being 
+        processed.
+
+        Returns:
+            tuple: number of files waiting and number being processed.
+        """
+
+        return len(self.__queue), len(self.__running)
+
+
+    def poll(self):
+        """Records the results of any files that have finished, scans the data 
+        directory once, and hands queued files to the pool.
+
+        Returns:
+            int: number of files that finished.
+        """
+
+        finished = [future for future in self.__running if future.done()]
+        for future in finished:
+            self.__finish(future)
+
+        self.__scan()
+        self.__submit()
+
+        return len(finished)
+
+    def run(self, reportInterval=None, untilIdle=False):
+        """Watches the data directory until interrupted (e.g. by ctrl+C), or 
+        until there is nothing left to do if 'untilIdle' is set. Files still 
+        being processed when it stops are finished first.
+
+        Args:
+            reportInterval (float, optional): time between printing the status 
+                (see 'status'), in seconds. Defaults to None, which only prints 
+                it when files finish.
+            untilIdle (bool, optional): set 'True' to stop once no files are 
+                waiting to settle, queued or being processed. Defaults to 
+                False.
+
+        Returns:
+            int: number of files processed.
+        """
+
+        lastReport = time.monotonic()
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.workers) as executor:
+            self.__executor = executor
+            try:
+                while True:
+                    finished = self.poll()
+
+                    now = time.monotonic()
+                    if (reportInterval == None and finished > 0) or \
+                            (reportInterval != None and now - lastReport >= reportInterval):
+                        print(self.status())
+                        lastReport = now
+
+                    if untilIdle and len(self.__changes) == 0 and \
+                            self.queue_depth == (0, 0):
+                        break
+
+                    if len(self.__running) > 0:
+                        concurrent.futures.wait(list(self.__running), timeout=self.pollInterval,
+                                                return_when=concurrent.futures.FIRST_COMPLETED)
+                    else:
+                        time.sleep(self.pollInterval)
+            finally:
+                # finish the files already being processed
+                for future in list(self.__running):
+                    concurrent.futures.wait([future])
+                    self.__finish(future)
+                self.__executor = None
+
+        print(self.status())
+        return self.processed
+
+    def status(self):
+        """Summarises the queue and the time taken by each stage.
+
+        Returns:
+            str: the summary.
+        """
+
+        waiting, running = self.queue_depth
+        summary = "{} waiting, {} running, {} processed, {} failed".format(
+                        waiting, running, self.processed, self.failed)
+
+        latencies = self.latencies
+        if len(latencies) > 0:
+            summary += " | mean (max) time: " + ", ".join(
+                            "{} {:.2f}s ({:.2f}s)".format(stage, times["mean"], times["max"])
+                                for stage, times in latencies.items())
+
+        return summary
+
+    def __finish(self, future):
+        """Private method to record the results of a file that has finished in 
+        the tracker, and the time each stage took.
+
+        Args:
+            future (concurrent.futures.Future): the file's job in the pool.
+
+        Returns:
+            NoneType: signifies completion.
+        """
+
+        fileName, changed, queued, submitted = self.__running.pop(future)
+
+        try:
+            healthStatus, errors, results, latencies = future.result()
+        except Exception as e:
+            print("{} could not be processed: {}".format(fileName, e))
+            self.failed += 1
+            return None
+
+        if healthStatus == -1: # deleted before it was checked
+            return None
+
+        start = time.monotonic()
+
+        G = global_tracker.get_tracker(False)
+        fileNames = [fileName] + [name for name in results.keys() if name != fileName]
+        G.add_files({name: healthStatus for name in fileNames})
+
+        if healthStatus < const.passedWithWarnings:
+            print("{} failed {} test(s)".format(fileName, len(errors)))
+            for lineNumber, error in errors:
+                print("  line {}: {}".format(lineNumber, error))
+            self.failed += 1
+            return None
+
+        M = processed_data.ProcessedData().metrics
+        updates = []
+        for name, (processedFileName, values) in results.items():
+            if processedFileName == None:
+                continue
+            updates.append((name, 2, processedFileName))
+            for heading, value in values.items():
+                updates.append((name, G.get_column_number(heading), value))
+
+        # record the device the file came from, if there were several
+        if M.device(fileName) != None:
+            try:
+                column = G.get_column_number(M.device(heading=True))
+                updates += [(name, column, M.device(name)) for name in fileNames]
+            except ValueError: # no column for the device yet
+                G.add_metric(M.device)
+
+        G.write_many_to_file(updates)
+
+        now = time.monotonic()
+        latencies["settling"] = queued - changed
+        latencies["queue"] = submitted - queued
+        latencies["tracker"] = now - start
+        latencies["total"] = now - changed
+        for stage, latency in latencies.items():
+            self.__latencies[stage].append(latency)
+
+        print("Processed {} ({})".format(fileName,
+                                            ", ".join(processedFileName for processedFileName, _
+                                                        in results.values()
+                                                        if processedFileName != None)))
+        self.processed += 1
+        return None
+
+    def __is_up_to_date(self, fileName, modified, fileNames):
+        """Private method to check if a raw data file has been processed since 
+        it last changed, i.e. each of its processed data files is newer than 
+        it.
+
+        Args:
+            fileName (str): name of the raw data file.
+            modified (int): time the raw data file was last modified, in ns.
+            fileNames (list[str]): names of the throws in the raw data file, if 
+                it has been split, otherwise just its own name.
+
+        Returns:
+            bool: 'True' if every processed data file is up to date.
+        """
+
+        for name in fileNames:
+            processedFilePath = storage.stored_path(Throw(name).binary_file_path)
+            if processedFilePath == None:
+                return False
+            try:
+                if os.stat(processedFilePath).st_mtime_ns < modified:
+                    return False
+            except FileNotFoundError:
+                return False
+        return True
+
+    def __scan(self):
+        """Private method to scan the data directory for raw data files that 
+        have changed, and queue them once they've stopped changing for 
+        'settleTime' seconds and they need processing.
+
+        Returns:
+            int: number of files queued.
+        """
+
+        now = time.monotonic()
+        listed = set()
+        settled = []
+
+        for entry in storage.list_directory():
+            if entry[:len(const.RAW_DATA_PREFIX)] != const.RAW_DATA_PREFIX or \
+                    not entry.endswith((const.RAW_DATA_FILE_TYPE,
+                                        const.RAW_DATA_BINARY_FILE_TYPE)):
+                continue
+
+            filePath = os.path.join(const.DATA_DIRECTORY, entry)
+            fileName = filePath[const.PATH_LENGTH_TO_DATA_DIR:]
+            storedPath = storage.stored_path(filePath)
+            try:
+                stat = os.stat(storedPath)
+            except (FileNotFoundError, TypeError): # deleted since it was listed
+                continue
+            listed.add(fileName)
+
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if self.__signatures.get(fileName) == signature: # nothing new
+                self.__changes.pop(fileName, None)
+                continue
+
+            # wait until the file stops changing
+            if fileName not in self.__changes or self.__changes[fileName][0] != signature:
+                self.__changes[fileName] = (signature, now)
+                continue
+            if now - self.__changes[fileName][1] < self.settleTime:
+                continue
+
+            settled.append((fileName, signature, self.__changes.pop(fileName)[1]))
+
+        # forget files that have been deleted
+        for fileName in list(self.__changes.keys()):
+            if fileName not in listed:
+                del self.__changes[fileName]
+        for fileName in list(self.__signatures.keys()):
+            if fileName not in listed:
+                del self.__signatures[fileName]
+
+        if len(settled) == 0:
+            return 0
+
+        # throws that raw data files have been split into
+        G = global_tracker.get_tracker(False)
+        segments = {}
+        for name in G.get_file_names():
+            sourceFileName, start, _ = functions.parse_segment_file_name(name)
+            if start != None:
+                segments.setdefault(sourceFileName, []).append(name)
+
+        count = 0
+        for fileName, signature, changed in settled:
+            self.__signatures[fileName] = signature
+            if self.__is_up_to_date(fileName, signature[0],
+                                    segments.get(fileName, [fileName])):
+                continue
+
+            # a file that is already queued keeps its place
+            if fileName not in self.__queue:
+                self.__queue[fileName] = (changed, now, segments.get(fileName, []))
+                count += 1
+
+        return count
+
+    def __submit(self):
+        """Private method to hand queued files to the pool, until every worker 
+        is busy. A file that is being processed already is left in the queue 
+        until it has finished, as it has changed since.
+
+        Returns:
+            int: number of files handed to the pool.
+        """
+
+        if self.__executor == None:
+            return 0
+
+        if len(self.__queue) == 0 or len(self.__running) >= self.workers:
+            return 0
+
+        running = set(fileName for fileName, _, _, _ in self.__running.values())
+        thresholds = (const.THROW_TIME_WARNING_THRESHOLD,
+                        const.ACCELEROMETER_WARNING_THRESHOLD,
+                        const.GYRO_WARNING_THRESHOLD)
+
+        # metrics with a column in the tracker
+        G = global_tracker.get_tracker(False)
+        metrics = []
+        for heading in processed_data.ProcessedData().metrics.registry.keys():
+            try:
+                G.get_column_number(heading)
+            except ValueError:
+                continue
+            metrics.append(heading)
+
+        count = 0
+        for fileName in list(self.__queue.keys()):
+            if len(self.__running) >= self.workers:
+                break
+            if fileName in running:
+                continue
+
+            changed, queued, segmentNames = self.__queue.pop(fileName)
+            future = self.__executor.submit(_process_file, fileName, segmentNames,
+                                            metrics, thresholds, self.integrationMethods)
+            self.__running[future] = (fileName, changed, queued, time.monotonic())
+            running.add(fileName)
+            count += 1
+
+        return count
+
+
+def _process_file(rawFileName, segmentNames, metrics, thresholds, integrationMethods=None):
+    """Health checks a raw data file, creates its processed data file, runs 
+    every calculation on it and calculates its metrics, without updating the 
+    tracker. Used by the processes of 'Watcher', so it must be a module level 
+    function.
+
+    Args:
+        rawFileName (str): name of the raw data file.
+        segmentNames (list[str]): names of the throws the raw data file has 
+            been split into. If it's empty, the whole file is processed.
+        metrics (list[str]): headings of the metrics to calculate, as listed 
+            in the registry.
+        thresholds (tuple[int]): warning thresholds for the time of throw, 
+            acceleration and angular velocity.
+        integrationMethods (dict[str, str], optional): integration method to 
+            use for each calculation (or column), keyed by its name. Defaults 
+            to None, which uses const.DEFAULT_INTEGRATION_METHOD.
+
+    Returns:
+        int: health status of the raw data file.
+        list[tuple]: line number and message of each failed test. 
+        dict[str, tuple]: name of the processed data file (or None if it 
+            couldn't be created) and the value of each metric, keyed by the 
+            name of each throw. 
+        dict[str, float]: time taken by each stage, in seconds.
+    """
+
+    latencies = {stage: 0.0 for stage in ["health check", "processing",
+                                            "calculations", "metrics"]}
+    results = {}
+
+    start = time.monotonic()
+    filePath = const.DATA_DIRECTORY + rawFileName[const.LENGTH_OF_DATA_DIR:]
+    healthStatus, errors, _ = raw_data._assess_file(filePath, thresholds)
+    latencies["health check"] = time.monotonic() - start
+
+    if healthStatus < const.passedWithWarnings:
+        return healthStatus, errors, results, latencies
+
+    P = processed_data.ProcessedData(True, integrationMethods=integrationMethods)
+    I = P.individual
+    M = P.metrics
+    calculations = list(I.calculations.registry.keys())
+
+    for fileName in segmentNames or [rawFileName]:
+        start = time.monotonic()
+        processedFileName = P.create_single_processed_data_file(fileName,
+                                                                updateTracker=False)
+        latencies["processing"] += time.monotonic() - start
+        if processedFileName == None:
+            results[fileName] = (None, {})
+            continue
+
+        start = time.monotonic()
+        I.set_file_name(processedFileName)
+        I.calculate(calculations)
+        latencies["calculations"] += time.monotonic() - start
+
+        start = time.monotonic()
+        values = M.calculate(metrics, fileName)
+        latencies["metrics"] += time.monotonic() - start
+
+        results[fileName] = (processedFileName, values)
+
+    return healthStatus, errors, results, latencies
@@ -0,0 +1,63 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+# the tests import the 'obj' package in the same way as 'main.py'
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from obj import const
+from obj import functions
+
+# raw data files recorded with the ball, which the tests copy
+SAMPLE_DATA_DIRECTORY = os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                        "..", "..", "..", "data"))
+
+@pytest.fixture
+def data_directory(tmp_path, monkeypatch):
+    """Points the data directory, and the tracker, at an empty folder for the 
+    length of a test. The tracker file is created empty, as it is in the 
+    repository.
+
+    Returns:
+        pathlib.Path: the data directory.
+    """
+
+    directory = tmp_path / "data"
+    directory.mkdir()
+    dataDirectory = str(directory) + os.sep
+
+    monkeypatch.setattr(const, "DATA_DIRECTORY", dataDirectory)
+    monkeypatch.setattr(const, "PATH_LENGTH_TO_DATA_DIR",
+                        len(dataDirectory) - const.LENGTH_OF_DATA_DIR)
+    monkeypatch.setattr(const, "TRACKER_FILEPATH",
+                        os.path.join(dataDirectory, const.TRACKER_FILENAME))
+    monkeypatch.setattr(const, "TRACKER_DATABASE_FILEPATH",
+                        os.path.join(dataDirectory, const.TRACKER_DATABASE_FILENAME))
+
+    # file names are kept relative to the project folder ('\data\RAW-...'), 
+    # and are found by adding the part after the last backslash to the data 
+    # directory - away from Windows that's the whole name, so '/data/' needs 
+    # to lead back to the data directory
+    if os.sep != "\\":
+        os.symlink(directory, directory / "data")
+
+    open(const.TRACKER_FILEPATH, "w").close()
+
+    return directory
+
+@pytest.fixture
+def sample_file(data_directory):
+    """Copies raw data files recorded with the ball into the data directory.
+
+    Returns:
+        function: copies the file with a given name, and returns the name it 
+            is known by in the tracker.
+    """
+
+    def copy(entry):
+        shutil.copy(os.path.join(SAMPLE_DATA_DIRECTORY, entry), data_directory / entry)
+        return functions.add_data_directory(entry)
+
+    return copy
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+import scipy.integrate
+
+from obj import functions
+
+def prefix_simpson(data, times, initialValue=0.0):
+    """Integrates the first 'i' samples for every 'i', one at a time, as was 
+    done before 'cumulative_simpson' with 
+    'scipy.integrate.simpson(data[:i], x=times[:i], even="last")'. With an odd 
+    number of intervals, "last" uses the trapezium rule on the first interval 
+    and Simpson's rule on the rest.
+    """
+
+    output = []
+    for i in range(1, len(times)+1):
+        if i == 1:
+            value = 0.0
+        elif (i-1) % 2 == 0:
+            value = scipy.integrate.simpson(data[:i], x=times[:i])
+        else:
+            value = (times[1]-times[0]) * (data[0]+data[1]) / 2
+            if i > 2:
+                value += scipy.integrate.simpson(data[1:i], x=times[1:i])
+        output.append(value+initialValue)
+    return np.array(output)
+
+
+@pytest.mark.parametrize("length", [1, 2, 3, 4, 5, 50, 51])
+def test_cumulative_simpson_matches_prefix_simpson(length):
+    rng = np.random.default_rng(length)
+    # unevenly spaced samples, as the ball records them
+    times = np.cumsum(rng.uniform(0.005, 0.015, length))
+    data = rng.normal(0, 10, length)
+
+    np.testing.assert_allclose(functions.cumulative_simpson(data, times, 2.5),
+                                prefix_simpson(data, times, 2.5), rtol=1e-10, atol=1e-12)
+
+def test_rotate_vectors_matches_generate_dcm():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(0, 10, (100, 3))
+    angles = rng.uniform(0, 2*np.pi, (100, 3))
+
+    dcm = functions.generate_dcm_stack(angles[:, 0], angles[:, 1], angles[:, 2])
+    expected = [vector.dot(functions.generate_dcm(*angle))
+                for vector, angle in zip(vectors, angles)]
+
+    np.testing.assert_allclose(functions.rotate_vectors(vectors, dcm), expected,
+                                rtol=1e-12, atol=1e-12)
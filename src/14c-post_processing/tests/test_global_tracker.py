@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from obj import const
+from obj import functions
+from obj import global_tracker
+from obj import processed_data
+from obj import raw_data
+
+def open_tracker(monkeypatch, backend, workers=1):
+    """Opens the tracker with the given backend."""
+
+    monkeypatch.setattr(const, "TRACKER_BACKEND", backend)
+    return global_tracker.get_tracker(True, workers)
+
+
+def test_export_over_csv_tracker_deletes_journal(data_directory, monkeypatch):
+    fileName = functions.add_data_directory("RAW-TEST1.csv")
+    journalFilePath = const.TRACKER_FILEPATH + const.TRACKER_JOURNAL_FILE_TYPE
+
+    G = open_tracker(monkeypatch, "csv")
+    G.add_file(fileName)
+    G.change_health_status(fileName, const.failed)
+
+    # the database is created from the CSV tracker file, then both change
+    open_tracker(monkeypatch, "sqlite")
+    open_tracker(monkeypatch, "csv").change_health_status(fileName, const.passed)
+    assert os.path.exists(journalFilePath)
+
+    G = open_tracker(monkeypatch, "sqlite")
+    G.change_health_status(fileName, const.passedWithWarnings)
+    assert G.export_csv() == const.TRACKER_FILEPATH
+
+    # the older change in the journal isn't replayed over the exported value
+    assert not os.path.exists(journalFilePath)
+    assert open_tracker(monkeypatch, "csv").get_health_status(fileName) == \
+            const.passedWithWarnings
+
+def test_journal_with_cut_off_last_record_is_replayed(data_directory, monkeypatch):
+    fileName = functions.add_data_directory("RAW-TEST1.csv")
+    journalFilePath = const.TRACKER_FILEPATH + const.TRACKER_JOURNAL_FILE_TYPE
+
+    G = open_tracker(monkeypatch, "csv")
+    G.add_file(fileName)
+    G.change_health_status(fileName, const.failed)
+    G.change_health_status(fileName, const.passed)
+
+    # the program stopped part way through writing the last change
+    with open(journalFilePath, "r+b") as f:
+        f.truncate(f.seek(0, os.SEEK_END) - 2)
+
+    # the changes written in full are replayed, and the cut off one isn't
+    G = open_tracker(monkeypatch, "csv")
+    assert G.get_health_status(fileName) == const.failed
+
+    # the next change isn't joined onto the cut off one
+    G.change_health_status(fileName, const.passedWithWarnings)
+    with open(journalFilePath) as f:
+        assert f.read().splitlines()[-1] == \
+                "{},health status,{}".format(fileName, const.passedWithWarnings)
+
+    # as another process would read them
+    monkeypatch.setattr(global_tracker, "_trackerCache", global_tracker._TrackerCache())
+    assert open_tracker(monkeypatch, "csv").get_health_status(fileName) == \
+            const.passedWithWarnings
+
+@pytest.mark.parametrize("backend", ["csv", "sqlite"])
+def test_metrics_calculated_in_parallel_match_serial(sample_file, monkeypatch, tmp_path,
+                                                        backend):
+    for entry in ["RAW-TEST1.csv", "RAW-TEST3.csv", "RAW-FREEFALL.csv"]:
+        sample_file(entry)
+    G = open_tracker(monkeypatch, backend)
+    raw_data.RawData(True, False, workers=1).health.check_all_files()
+    assert processed_data.ProcessedData(True, workers=1).create_all_processed_data_files() == 3
+
+    M = processed_data.ProcessedData().metrics
+    metrics = [M.total_time, M.spiral_rate]
+    tracker = []
+    for workers in [1, 3]:
+        G = open_tracker(monkeypatch, backend, workers)
+        G.add_metrics(metrics)
+        with open(G.export_csv(str(tmp_path / "{}.csv".format(workers)))) as f:
+            tracker.append(f.read())
+
+    assert tracker[0] == tracker[1]
+    assert len(tracker[0].strip().splitlines()) == 4
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from obj import functions
+from obj import processed_data
+from obj import storage
+from obj.throw import Throw
+
+VELOCITIES = ["vel (x)", "vel (y)", "vel (z)"]
+ACCELERATIONS = ["acc (x)", "acc (y)", "acc (z)"]
+
+def calculate_velocities(rawFileName, integrationMethods):
+    """Creates the processed data file of a raw data file and calculates the 
+    cartesian velocities, with the given integration methods.
+    """
+
+    P = processed_data.ProcessedData(True, integrationMethods=integrationMethods)
+    processedFileName = P.create_single_processed_data_file(rawFileName, updateTracker=False)
+
+    I = P.individual
+    I.set_file_name(processedFileName)
+    assert I.calculate(["cartesian velocities"]) == 1
+
+    return I.throw
+
+
+def test_integration_method_is_used_by_calculate(sample_file):
+    rawFileName = sample_file("RAW-TEST1.csv")
+
+    simpson = calculate_velocities(rawFileName, {"cartesian velocities": "simpson"})
+    simpson = {heading: simpson.get_column(heading) for heading in ACCELERATIONS + VELOCITIES}
+    trapezoid = calculate_velocities(rawFileName, {"cartesian velocities": "trapezoid"})
+
+    # the columns that are integrated differ, and nothing else does
+    for heading in ACCELERATIONS:
+        np.testing.assert_array_equal(trapezoid.get_column(heading), simpson[heading])
+    for heading in VELOCITIES:
+        assert not np.allclose(trapezoid.get_column(heading), simpson[heading])
+
+    times = trapezoid.get_column("time")
+    for velocity, acceleration in zip(VELOCITIES, ACCELERATIONS):
+        np.testing.assert_allclose(trapezoid.get_column(velocity),
+                                    functions.cumulative_trapezoid(
+                                        trapezoid.get_column(acceleration), times))
+        np.testing.assert_allclose(simpson[velocity],
+                                    functions.cumulative_simpson(simpson[acceleration], times))
+
+def test_integration_method_of_one_column_is_kept(sample_file):
+    rawFileName = sample_file("RAW-TEST1.csv")
+    default = calculate_velocities(rawFileName, None)
+    default = {heading: default.get_column(heading) for heading in VELOCITIES}
+
+    P = processed_data.ProcessedData(True)
+    I = P.individual
+    I.set_file_name(functions.raw_to_processed(rawFileName))
+    I.calculations.set_integration_method("vel (x)", "trapezoid")
+    assert I.calculate(["cartesian velocities"]) == 1
+
+    assert not np.allclose(I.throw.get_column("vel (x)"), default["vel (x)"])
+    np.testing.assert_array_equal(I.throw.get_column("vel (y)"), default["vel (y)"])
+    np.testing.assert_array_equal(I.throw.get_column("vel (z)"), default["vel (z)"])
+
+def test_unknown_integration_method_is_rejected():
+    P = processed_data.ProcessedData(integrationMethods={"cartesian velocities": "euler"})
+    with pytest.raises(ValueError):
+        P.individual
+
+def test_writing_binary_file_deletes_exported_csv(sample_file):
+    rawFileName = sample_file("RAW-TEST1.csv")
+    P = processed_data.ProcessedData(True)
+    processedFileName = P.create_single_processed_data_file(rawFileName, updateTracker=False)
+    assert P.export_processed_data_files() == 1
+    throw = Throw(processedFileName)
+    assert storage.exists(throw.file_path)
+
+    I = P.individual
+    I.set_file_name(processedFileName)
+    assert I.calculate(["cartesian velocities"]) == 1
+
+    # the exported file doesn't have the new columns
+    assert storage.exists(throw.binary_file_path)
+    assert not storage.exists(throw.file_path)
@@ -0,0 +1,79 @@
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+
+from obj import const
+from obj import records
+
+# the off-board system's records, which write the files read here
+spec = importlib.util.spec_from_file_location("offboard_records",
+            os.path.join(os.path.dirname(__file__), "..", "..",
+                            "14b-final_offboard_system", "records.py"))
+offboard_records = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(offboard_records)
+
+def random_lines(count, seed=0):
+    """Makes lines of raw data that can be stored exactly in a record."""
+
+    rng = np.random.default_rng(seed)
+    data = np.empty((count, 10))
+    data[:, 0] = np.cumsum(rng.integers(5, 15, count))
+    data[:, 1:4] = rng.integers(-15000, 15000, (count, 3)) / 100
+    data[:, 4:] = rng.integers(-30000, 30000, (count, 6)) / 16
+    return data
+
+
+def test_layout_matches_offboard_system():
+    assert records.RECORD_TYPE.itemsize == offboard_records.RECORD.size
+    assert const.RECORD_SYNC == offboard_records.SYNC
+    assert tuple(const.RECORD_SCALES) == offboard_records.SCALES
+
+def test_encode_matches_offboard_system():
+    data = random_lines(200)
+    expected = b"".join(offboard_records.encode(list(values), sequence)
+                        for sequence, values in enumerate(data, 65500))
+
+    assert records.encode(data, 65500) == expected
+
+def test_crc_matches_offboard_system():
+    recordBytes = np.frombuffer(os.urandom(const.RECORD_SIZE*100), dtype=np.uint8).reshape(-1, const.RECORD_SIZE)
+
+    expected = [offboard_records.crc(row.tobytes()) for row in recordBytes]
+    assert records.crc(recordBytes).tolist() == expected
+
+def test_decode_matches_offboard_system():
+    data = random_lines(200, seed=1)
+    encoded = b"".join(offboard_records.encode(list(values), sequence)
+                        for sequence, values in enumerate(data))
+
+    values, sequences, errors = records.decode(encoded)
+    expected = [offboard_records.decode(encoded[i:i+const.RECORD_SIZE])
+                for i in range(0, len(encoded), const.RECORD_SIZE)]
+
+    assert errors == []
+    assert sequences.tolist() == [sequence for sequence, _ in expected]
+    np.testing.assert_array_equal(values, [line for _, line in expected])
+    np.testing.assert_array_equal(values, data)
+
+@pytest.mark.parametrize("corruption", ["flipped byte", "extra bytes", "cut off"])
+def test_decode_resynchronises_after_corruption(corruption):
+    data = random_lines(10, seed=2)
+    encoded = bytearray(records.encode(data))
+
+    if corruption == "flipped byte":
+        encoded[3*const.RECORD_SIZE + 10] ^= 0xFF # record 4 fails its CRC
+        kept = [i for i in range(10) if i != 3]
+    elif corruption == "extra bytes":
+        encoded[3*const.RECORD_SIZE:3*const.RECORD_SIZE] = b"\x01\xaa\x55\x02" # including a false sync
+        kept = list(range(10))
+    else:
+        encoded = encoded[:-5]
+        kept = list(range(9))
+
+    values, sequences, errors = records.decode(bytes(encoded))
+
+    assert sequences.tolist() == kept
+    np.testing.assert_array_equal(values, data[kept])
+    assert len(errors) == 1
@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+from obj import const
+from obj import storage
+
+def test_failed_write_keeps_copy_in_other_codec(data_directory, monkeypatch):
+    filePath = str(data_directory / "PRO-TEST1.csv")
+    with storage.open_file(filePath, "w") as f:
+        f.write("time,delta time\n")
+
+    # a write with another codec that doesn't finish leaves the file as it was
+    monkeypatch.setattr(const, "DATA_COMPRESSION", "gzip")
+    with pytest.raises(RuntimeError):
+        with storage.open_file(filePath, "w") as f:
+            f.write("time")
+            raise RuntimeError("stopped part way through")
+
+    assert storage.stored_path(filePath) == filePath
+    with storage.open_file(filePath) as f:
+        assert f.read() == "time,delta time\n"
+    # and no temporary file is left behind
+    assert [entry for entry in os.listdir(data_directory) if "PRO-" in entry] == \
+            ["PRO-TEST1.csv"]
+
+def test_write_replaces_copy_in_other_codec(data_directory, monkeypatch):
+    filePath = str(data_directory / "PRO-TEST1.npz")
+    with storage.open_file(filePath, "wb") as f:
+        f.write(b"old")
+
+    monkeypatch.setattr(const, "DATA_COMPRESSION", "lzma")
+    with storage.open_file(filePath, "wb") as f:
+        f.write(b"new")
+
+    assert storage.stored_path(filePath) == filePath + ".xz"
+    assert not os.path.exists(filePath)
+    with storage.open_file(filePath, "rb") as f:
+        assert f.read() == b"new"
@@ -0,0 +1,110 @@
+import csv
+import os
+
+import numpy as np
+
+from obj import const
+from obj import functions
+from obj import global_tracker
+from obj import processed_data
+from obj import raw_data
+from obj import stream
+from obj.throw import Throw
+
+THRESHOLDS = (const.THROW_TIME_WARNING_THRESHOLD,
+                const.ACCELEROMETER_WARNING_THRESHOLD,
+                const.GYRO_WARNING_THRESHOLD)
+
+# a line for each test, and a few good lines between them
+BAD_LINES = [
+    "5,0.00,0.00,0.00,0.00,0.00,0.00,0.00,0.00,0.00",
+    "10,1.00,2.00,3.00,4.00,5.00,6.00,7.00,8.00,9.00",
+    "20,1.00,2.00,3.00",
+    "30,1.00,,3.00,4.00,5.00,6.00,7.00,8.00,9.00",
+    "40,1.00,2.00,x,4.00,5.00,6.00,7.00,8.00,9.00",
+    "50,1.00,2.00,3.00,nan,5.00,6.00,7.00,8.00,9.00",
+    "60,1.00,2.00,3.00,4.00,5.00,6.00,7.00,8.00,9.00",
+    "55,1.00,2.00,3.00,4.00,5.00,6.00,7.00,8.00,9.00",
+    "55,1.00,2.00,3.00,4.00,5.00,6.00,7.00,8.00,9.00",
+    "70,200.00,2.00,-151.00,4.00,5.00,6.00,7.00,8.00,9.00",
+    "80,1.00,2.00,3.00,4.00,-1999.00,6.00,7.00,8.00,9.00",
+    "30000,1.00,2.00,3.00,4.00,5.00,6.00,7.00,8.00,9.00",
+]
+
+def stream_file(filePath):
+    """Feeds a raw data file to a StreamingThrow line by line, as it would be 
+    received.
+    """
+
+    S = stream.StreamingThrow(filePath)
+    with open(filePath) as f:
+        for line in f.read().splitlines():
+            S.add_line(line)
+    return S
+
+def read_tracker(path):
+    """Exports the tracker, and reads it back as rows."""
+
+    G = global_tracker.get_tracker()
+    G.export_csv(path)
+    with open(path, newline="") as f:
+        return [[cell.strip() for cell in row] for row in csv.reader(f) if len(row) > 0]
+
+def reset(directory, keep):
+    """Deletes everything from the data directory but the given raw data 
+    file, and empties the tracker.
+    """
+
+    for entry in os.listdir(directory):
+        if entry not in [keep, const.TRACKER_FILENAME, "data"]:
+            os.remove(directory / entry)
+    open(directory / const.TRACKER_FILENAME, "w").close()
+
+
+def test_stream_health_check_matches_batch(data_directory):
+    filePath = data_directory / "RAW-BAD.csv"
+    filePath.write_text("\n".join(BAD_LINES) + "\n")
+
+    healthStatus, errors, warnings = raw_data._assess_file(str(filePath), THRESHOLDS)
+    S = stream_file(str(filePath))
+
+    assert healthStatus == const.failed
+    assert S.health_status == healthStatus
+    assert sorted((int(n), e) for n, e in S.errors) == errors
+    assert sorted((int(n), w) for n, w in S.warnings) == warnings
+    # every kind of error and warning is covered
+    assert len(errors) == 6 and len(warnings) == 4
+
+def test_stream_matches_batch(sample_file, data_directory, tmp_path):
+    M = processed_data.ProcessedData().metrics
+    metrics = [M.total_time, M.spiral_rate]
+    rawFileName = sample_file("RAW-TEST1.csv")
+    processedFileName = functions.raw_to_processed(rawFileName)
+
+    # process the file as it's received, with the metrics already in the tracker
+    global_tracker.get_tracker().add_metrics(metrics)
+    S = stream_file(str(data_directory / "RAW-TEST1.csv"))
+    assert S.finish() == processedFileName
+    streamed = Throw(processedFileName).load()
+    streamedRows = read_tracker(tmp_path / "streamed.csv")
+
+    # process it again through the menus of 'main.py'
+    reset(data_directory, "RAW-TEST1.csv")
+    raw_data.RawData(True, False, workers=1).health.check_all_files()
+    P = processed_data.ProcessedData(True, workers=1)
+    assert P.create_all_processed_data_files() == 1
+    I = P.individual
+    I.set_file_name(processedFileName)
+    assert I.calculate(list(I.calculations.registry.keys())) == 1
+    global_tracker.get_tracker().add_metrics(metrics)
+    batch = Throw(processedFileName).load()
+    batchRows = read_tracker(tmp_path / "batch.csv")
+
+    assert streamed.headers == batch.headers
+    for heading in batch.headers:
+        np.testing.assert_array_equal(streamed.get_column(heading), batch.get_column(heading),
+                                        err_msg=heading)
+    assert streamed.metadata == batch.metadata
+    assert streamedRows == batchRows
+    assert streamedRows[1][:3] == [rawFileName, str(const.passed), processedFileName]
+    assert len(streamedRows[1]) == 5
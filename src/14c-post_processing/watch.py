@@ -0,0 +1,71 @@
+from obj import const
+from obj import watcher
+import argparse
+
+def parse_integration_method(value):
+    """Splits a choice of integration method given on the command line, in 
+    the form 'calculation=method'.
+
+    Args:
+        value (str): the choice, e.g. "cartesian velocities=trapezoid".
+
+    Raises:
+        argparse.ArgumentTypeError: raised if the choice isn't in that form, 
+            or the method is not recognised.
+
+    Returns:
+        tuple: name of the calculation (or column) and the method.
+    """
+
+    name, separator, method = value.rpartition("=")
+    if separator == "" or name.strip() == "":
+        raise argparse.ArgumentTypeError("expected CALCULATION=METHOD, got '{}'".format(value))
+    if method.strip() not in const.INTEGRATION_METHODS:
+        raise argparse.ArgumentTypeError("unknown integration method '{}' (choose from {})"
+                                            .format(method, ", ".join(const.INTEGRATION_METHODS)))
+    return name.strip(), method.strip()
+
+def main():
+    """Watches the data directory, and processes each new or changed raw data 
+    file as soon as it has been written, until stopped with ctrl+C.
+
+    Returns:
+        int: number of files processed.
+    """
+
+    parser = argparse.ArgumentParser(
+                description="Health check and process new raw data files as they appear "
+                            "in the data directory")
+    parser.add_argument("--workers", type=int, default=const.DEFAULT_WORKERS,
+                        help="number of files processed at once")
+    parser.add_argument("--poll-interval", type=float, default=const.WATCH_POLL_INTERVAL,
+                        help="seconds between scans of the data directory")
+    parser.add_argument("--settle-time", type=float, default=const.WATCH_SETTLE_TIME,
+                        help="seconds a file must be unchanged for before it's processed")
+    parser.add_argument("--report-interval", type=float, default=None,
+                        help="seconds between printing the queue depth and time taken by "
+                             "each stage (default: whenever a file finishes)")
+    parser.add_argument("--integration-method", type=parse_integration_method,
+                        action="append", default=[], metavar="CALCULATION=METHOD",
+                        help="integration method for a calculation or column, e.g. "
+                             "'cartesian velocities=trapezoid' (default: {}); can be "
+                             "given more than once".format(const.DEFAULT_INTEGRATION_METHOD))
+    parser.add_argument("--once", action="store_true",
+                        help="stop once every file has been processed, rather than "
+                             "watching for more")
+    args = parser.parse_args()
+
+    W = watcher.Watcher(args.workers, args.poll_interval, args.settle_time,
+                        dict(args.integration_method))
+    print("Watching", const.DATA_DIRECTORY)
+
+    try:
+        return W.run(args.report_interval, args.once)
+    except KeyboardInterrupt:
+        print("KeyboardInterrupt has been caught. Stopped watching.")
+        print(W.status())
+        return W.processed
+
+
+if __name__ == "__main__":
+    main()